@@ -15,10 +15,10 @@ from users.models import User
 config = context.config
 
 # overwrite the .ini file sqlalchemy.url path
-# with path constructed from settigns
+# with path constructed from settigns, unless caller provided one
 config.set_main_option(
     'sqlalchemy.url',
-    '{engine}://{username}:{password}@{host}:{port}/{db_name}'.format(
+    config.attributes.get('url') or '{engine}://{username}:{password}@{host}:{port}/{db_name}'.format(
         **POSTGRESQL
     )
 )
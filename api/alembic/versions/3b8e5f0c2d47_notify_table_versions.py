@@ -0,0 +1,49 @@
+"""notify_table_versions
+
+Revision ID: 3b8e5f0c2d47
+Revises: 7f2c9d4e1a86
+Create Date: 2026-10-18 23:48:05.207316
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e5f0c2d47'
+down_revision = '7f2c9d4e1a86'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Notification is delivered on commit, payload is "<table name> <version>", see `core.result_cache`
+    op.execute("""
+        CREATE OR REPLACE FUNCTION table_versions_bump() RETURNS trigger AS $$
+        DECLARE
+            new_version BIGINT;
+        BEGIN
+            INSERT INTO table_versions (table_name, version, updated_at)
+            VALUES (TG_TABLE_NAME, 1, timezone('utc', now()))
+            ON CONFLICT (table_name) DO UPDATE
+            SET version = table_versions.version + 1, updated_at = EXCLUDED.updated_at
+            RETURNING version INTO new_version;
+
+            PERFORM pg_notify('table_versions', TG_TABLE_NAME || ' ' || new_version);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade():
+    op.execute("""
+        CREATE OR REPLACE FUNCTION table_versions_bump() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_versions (table_name, version, updated_at)
+            VALUES (TG_TABLE_NAME, 1, timezone('utc', now()))
+            ON CONFLICT (table_name) DO UPDATE
+            SET version = table_versions.version + 1, updated_at = EXCLUDED.updated_at;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
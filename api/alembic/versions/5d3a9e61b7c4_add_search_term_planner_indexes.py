@@ -0,0 +1,27 @@
+"""add_search_term_planner_indexes
+
+Revision ID: 5d3a9e61b7c4
+Revises: e8b27c5a1f03
+Create Date: 2026-10-18 21:17:45.230961
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5d3a9e61b7c4'
+down_revision = 'e8b27c5a1f03'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # IDs are searched by equality served by primary key
+    op.drop_index('ix_users_id_trgm', table_name='users')
+    op.drop_index('ix_organisations_id_trgm', table_name='organisations')
+    op.execute('CREATE INDEX ix_users_lower_email_pattern ON users (lower(email) text_pattern_ops)')
+
+
+def downgrade():
+    op.drop_index('ix_users_lower_email_pattern', table_name='users')
+    op.execute('CREATE INDEX ix_organisations_id_trgm ON organisations USING gin (CAST(id AS VARCHAR) gin_trgm_ops)')
+    op.execute('CREATE INDEX ix_users_id_trgm ON users USING gin (CAST(id AS VARCHAR) gin_trgm_ops)')
@@ -0,0 +1,27 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 6ae5df4585ce
+Revises: 2100cccd5a57
+Create Date: 2026-10-18 19:55:12.104512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6ae5df4585ce'
+down_revision = '2100cccd5a57'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_organisations_lower_name_id', 'organisations', [sa.text('lower(name)'), 'id'], unique=False)
+    op.create_index('ix_users_lower_first_name_id', 'users', [sa.text('lower(first_name)'), 'id'], unique=False)
+    op.create_index('ix_users_lower_last_name_id', 'users', [sa.text('lower(last_name)'), 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_lower_last_name_id', table_name='users')
+    op.drop_index('ix_users_lower_first_name_id', table_name='users')
+    op.drop_index('ix_organisations_lower_name_id', table_name='organisations')
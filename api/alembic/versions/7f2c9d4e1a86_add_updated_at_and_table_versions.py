@@ -0,0 +1,67 @@
+"""add_updated_at_and_table_versions
+
+Revision ID: 7f2c9d4e1a86
+Revises: 5d3a9e61b7c4
+Create Date: 2026-10-18 23:12:40.518093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f2c9d4e1a86'
+down_revision = '5d3a9e61b7c4'
+branch_labels = None
+depends_on = None
+
+# Tables with version counter, see `core.db.versions`
+VERSIONED_TABLES = ('organisations', 'users')
+
+
+def upgrade():
+    for table_name in VERSIONED_TABLES:
+        op.add_column(table_name, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE {table_name} SET updated_at = coalesce(created_at, timezone('utc', now()))")
+
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(length=63), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name', name=op.f('pk_table_versions'))
+    )
+
+    op.execute("""
+        CREATE FUNCTION table_versions_bump() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_versions (table_name, version, updated_at)
+            VALUES (TG_TABLE_NAME, 1, timezone('utc', now()))
+            ON CONFLICT (table_name) DO UPDATE
+            SET version = table_versions.version + 1, updated_at = EXCLUDED.updated_at;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    for table_name in VERSIONED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER {table_name}_table_versions_bump
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table_name}
+            FOR EACH STATEMENT EXECUTE PROCEDURE table_versions_bump()
+        """)
+        op.execute(
+            f"INSERT INTO table_versions (table_name, version, updated_at) "
+            f"VALUES ('{table_name}', 1, timezone('utc', now()))"
+        )
+
+
+def downgrade():
+    for table_name in VERSIONED_TABLES:
+        op.execute(f'DROP TRIGGER {table_name}_table_versions_bump ON {table_name}')
+
+    op.execute('DROP FUNCTION table_versions_bump()')
+    op.drop_table('table_versions')
+
+    for table_name in VERSIONED_TABLES:
+        op.drop_column(table_name, 'updated_at')
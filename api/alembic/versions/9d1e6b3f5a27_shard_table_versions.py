@@ -0,0 +1,79 @@
+"""shard_table_versions
+
+Revision ID: 9d1e6b3f5a27
+Revises: 3b8e5f0c2d47
+Create Date: 2026-10-19 09:41:17.305912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d1e6b3f5a27'
+down_revision = '3b8e5f0c2d47'
+branch_labels = None
+depends_on = None
+
+# Rows of version counter per table, see `core.db.versions`
+SHARDS = 64
+
+
+def upgrade():
+    op.add_column('table_versions', sa.Column('shard', sa.SmallInteger(), nullable=False, server_default='0'))
+    op.alter_column('table_versions', 'shard', server_default=None)
+    op.drop_constraint('pk_table_versions', 'table_versions', type_='primary')
+    op.create_primary_key('pk_table_versions', 'table_versions', ['table_name', 'shard'])
+
+    # A transaction always bumps the shard of its backend, so concurrent writers lock different rows and a single
+    # transaction never waits for its own rows. Notification payload is "<table name> <shard> <version>".
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION table_versions_bump() RETURNS trigger AS $$
+        DECLARE
+            shard_number SMALLINT := pg_backend_pid() % {SHARDS};
+            new_version BIGINT;
+        BEGIN
+            INSERT INTO table_versions (table_name, shard, version, updated_at)
+            VALUES (TG_TABLE_NAME, shard_number, 1, timezone('utc', now()))
+            ON CONFLICT (table_name, shard) DO UPDATE
+            SET version = table_versions.version + 1, updated_at = EXCLUDED.updated_at
+            RETURNING version INTO new_version;
+
+            PERFORM pg_notify('table_versions', TG_TABLE_NAME || ' ' || shard_number || ' ' || new_version);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade():
+    op.execute("""
+        CREATE OR REPLACE FUNCTION table_versions_bump() RETURNS trigger AS $$
+        DECLARE
+            new_version BIGINT;
+        BEGIN
+            INSERT INTO table_versions (table_name, version, updated_at)
+            VALUES (TG_TABLE_NAME, 1, timezone('utc', now()))
+            ON CONFLICT (table_name) DO UPDATE
+            SET version = table_versions.version + 1, updated_at = EXCLUDED.updated_at
+            RETURNING version INTO new_version;
+
+            PERFORM pg_notify('table_versions', TG_TABLE_NAME || ' ' || new_version);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Shards are merged into a single row, versions keep growing
+    op.execute("""
+        CREATE TEMPORARY TABLE merged_table_versions AS
+        SELECT table_name, sum(version)::BIGINT AS version, max(updated_at) AS updated_at
+        FROM table_versions
+        GROUP BY table_name
+    """)
+    op.execute('DELETE FROM table_versions')
+    op.drop_constraint('pk_table_versions', 'table_versions', type_='primary')
+    op.drop_column('table_versions', 'shard')
+    op.create_primary_key('pk_table_versions', 'table_versions', ['table_name'])
+    op.execute('INSERT INTO table_versions SELECT table_name, version, updated_at FROM merged_table_versions')
+    op.execute('DROP TABLE merged_table_versions')
@@ -0,0 +1,33 @@
+"""add_trigram_search_indexes
+
+Revision ID: c41f0b7d92ae
+Revises: 6ae5df4585ce
+Create Date: 2026-10-18 20:24:37.512093
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f0b7d92ae'
+down_revision = '6ae5df4585ce'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE INDEX ix_organisations_name_trgm ON organisations USING gin (name gin_trgm_ops)')
+    op.execute('CREATE INDEX ix_organisations_id_trgm ON organisations USING gin (CAST(id AS VARCHAR) gin_trgm_ops)')
+    op.execute('CREATE INDEX ix_users_first_name_trgm ON users USING gin (first_name gin_trgm_ops)')
+    op.execute('CREATE INDEX ix_users_last_name_trgm ON users USING gin (last_name gin_trgm_ops)')
+    op.execute('CREATE INDEX ix_users_email_trgm ON users USING gin (email gin_trgm_ops)')
+    op.execute('CREATE INDEX ix_users_id_trgm ON users USING gin (CAST(id AS VARCHAR) gin_trgm_ops)')
+
+
+def downgrade():
+    op.drop_index('ix_users_id_trgm', table_name='users')
+    op.drop_index('ix_users_email_trgm', table_name='users')
+    op.drop_index('ix_users_last_name_trgm', table_name='users')
+    op.drop_index('ix_users_first_name_trgm', table_name='users')
+    op.drop_index('ix_organisations_id_trgm', table_name='organisations')
+    op.drop_index('ix_organisations_name_trgm', table_name='organisations')
@@ -0,0 +1,73 @@
+"""add_search_vector_columns
+
+Revision ID: e8b27c5a1f03
+Revises: c41f0b7d92ae
+Create Date: 2026-10-18 20:51:03.887214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b27c5a1f03'
+down_revision = 'c41f0b7d92ae'
+branch_labels = None
+depends_on = None
+
+# Configuration has to match `core.search.FULLTEXT_CONFIG`
+USERS_SEARCH_VECTOR = """
+    setweight(to_tsvector('simple', coalesce({row}first_name, '') || ' ' || coalesce({row}last_name, '')), 'A') ||
+    setweight(
+        to_tsvector('simple', regexp_replace(split_part(coalesce({row}email, ''), '@', 1), '[._+-]+', ' ', 'g')),
+        'B'
+    )
+"""
+ORGANISATIONS_SEARCH_VECTOR = "setweight(to_tsvector('simple', coalesce({row}name, '')), 'A')"
+
+
+def create_search_vector_trigger(table_name, expression, columns):
+    op.execute(f"""
+        CREATE FUNCTION {table_name}_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {expression.format(row='NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"""
+        CREATE TRIGGER {table_name}_search_vector_update
+        BEFORE INSERT OR UPDATE OF {', '.join(columns)} ON {table_name}
+        FOR EACH ROW EXECUTE PROCEDURE {table_name}_search_vector_update()
+    """)
+    op.execute(f'UPDATE {table_name} SET search_vector = {expression.format(row="")}')
+
+
+def drop_search_vector_trigger(table_name):
+    op.execute(f'DROP TRIGGER {table_name}_search_vector_update ON {table_name}')
+    op.execute(f'DROP FUNCTION {table_name}_search_vector_update()')
+
+
+def upgrade():
+    op.add_column('organisations', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.add_column('users', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    create_search_vector_trigger('organisations', ORGANISATIONS_SEARCH_VECTOR, ('name', ))
+    create_search_vector_trigger('users', USERS_SEARCH_VECTOR, ('first_name', 'last_name', 'email'))
+
+    op.create_index(
+        'ix_organisations_search_vector', 'organisations', ['search_vector'], unique=False, postgresql_using='gin'
+    )
+    op.create_index('ix_users_search_vector', 'users', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_users_search_vector', table_name='users')
+    op.drop_index('ix_organisations_search_vector', table_name='organisations')
+
+    drop_search_vector_trigger('users')
+    drop_search_vector_trigger('organisations')
+
+    op.drop_column('users', 'search_vector')
+    op.drop_column('organisations', 'search_vector')
@@ -1,26 +1,48 @@
 import falcon
 
+from core.db.replicas import replica_router
 from core.db.session import Session
+from core.export import ExportResource
+from core.media import JSONHandler
+from core.metrics import MetricsResource
+from core.middleware.conditional import ConditionalGetMiddleware
 from core.middleware.db import SQLAlchemySessionManager
+from core.middleware.metrics import MetricsMiddleware
+from core.middleware.query_budget import QueryBudgetMiddleware
 from core.middleware.require_json import RequireJSON
 from core.middleware.serializers import SerializerMiddleware
+from core.middleware.slow_queries import SlowQueryLogMiddleware
+from core.middleware.timing import ServerTimingMiddleware
 from core.middleware.version import VersionMiddleware
 from core.serializers.errors import error_serializer
 
 from organisations.api import OrganisationResource, OrganisationCollectionResource
-from users.api import UserResource, UserCollectionResource
+from users.api import UserBulkResource, UserResource, UserCollectionResource
 
 
 app = falcon.API(middleware=[
-    RequireJSON(),
+    MetricsMiddleware(),
+    ServerTimingMiddleware(),
+    SlowQueryLogMiddleware(),
+    QueryBudgetMiddleware(),
+    RequireJSON(exempt_paths=('/metrics', )),
     VersionMiddleware(),
-    SQLAlchemySessionManager(Session),
+    SQLAlchemySessionManager(Session, replica_router),
+    ConditionalGetMiddleware(),
     SerializerMiddleware(),
 ])
 
+json_handler = JSONHandler()
+app.req_options.media_handlers.update({falcon.MEDIA_JSON: json_handler})
+app.resp_options.media_handlers.update({falcon.MEDIA_JSON: json_handler})
+
 app.set_error_serializer(error_serializer)
 
+app.add_route('/metrics', MetricsResource())
 app.add_route('/{api_version}/organisations/', OrganisationCollectionResource())
+app.add_route('/{api_version}/organisations/export', ExportResource(OrganisationCollectionResource(), Session))
 app.add_route('/{api_version}/organisations/{object_id}', OrganisationResource())
 app.add_route('/{api_version}/users/', UserCollectionResource())
+app.add_route('/{api_version}/users/bulk', UserBulkResource())
+app.add_route('/{api_version}/users/export', ExportResource(UserCollectionResource(), Session))
 app.add_route('/{api_version}/users/{object_id}', UserResource())
@@ -0,0 +1,139 @@
+"""
+Generate dataset for load benchmarks, organisations and users with realistic distributions of names, emails,
+states and organisation sizes are loaded to the database configured in settings and committed.
+
+Rows are generated by PostgreSQL itself in batches, secondary indexes of users are dropped during the load and
+created again at the end, which is much faster than maintaining them row by row.
+
+    python -m benchmarks.dataset --organisations 1000 --users 5000000 --truncate
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+
+from core.db.engine import engine
+
+
+# Popular names come first, skewed random index picks them more often
+FIRST_NAMES = (
+    'James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'William', 'Elizabeth',
+    'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Charles', 'Karen',
+    'Anna', 'Piotr', 'Katarzyna', 'Krzysztof', 'Małgorzata', 'Hans', 'Holly', 'Théo', 'Zoë', 'Argyle',
+)
+LAST_NAMES = (
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+    'Nowak', 'Kowalski', 'Wiśniewski', 'Müller', 'Schmidt', 'McClane', 'Gennero', 'Gruber', "O'Brien", 'Takagi',
+)
+EMAIL_DOMAINS = ('gmail.com', 'yahoo.com', 'outlook.com', 'example.com', 'company.org', 'wp.pl', 'gmx.de')
+
+LOAD_ORGANISATIONS = text("""
+    INSERT INTO organisations (name, status, enable_user_login, created_at, updated_at)
+    SELECT
+        'Organisation ' || i || ' ' || (:last_names)[1 + floor(random() * array_length(:last_names, 1))::int],
+        CASE WHEN random() < 0.95 THEN 0 ELSE 1 END,
+        random() < 0.5,
+        now(),
+        now()
+    FROM generate_series(1, :size) AS i
+""")
+
+# Users of an organisation are skewed as well, a few organisations are large and most of them are small.
+# Emails are unique thanks to the row number.
+LOAD_USERS = text("""
+    WITH organisations AS (
+        SELECT array_agg(id ORDER BY id) AS ids FROM organisations
+    ), names AS (
+        SELECT
+            i,
+            (:first_names)[1 + floor(power(random(), 2) * array_length(:first_names, 1))::int] AS first_name,
+            (:last_names)[1 + floor(power(random(), 2) * array_length(:last_names, 1))::int] AS last_name,
+            (:domains)[1 + floor(power(random(), 2) * array_length(:domains, 1))::int] AS domain,
+            random() AS state
+        FROM generate_series(:start, :stop - 1) AS i
+    )
+    INSERT INTO users (first_name, last_name, email, organisation_id, state, created_at, updated_at)
+    SELECT
+        first_name,
+        last_name,
+        lower(translate(first_name || '.' || last_name, ' ''', '')) || i || '@' || domain,
+        ids[1 + floor(power(random(), 3) * array_length(ids, 1))::int],
+        CASE WHEN state < 0.9 THEN 0 WHEN state < 0.96 THEN 1 WHEN state < 0.99 THEN 2 ELSE 3 END,
+        now() - random() * interval '3 years',
+        now()
+    FROM names, organisations
+""")
+
+# Indexes backing constraints, e.g. the primary key, are kept
+USERS_INDEXES = text("""
+    SELECT index_class.relname, pg_get_indexdef(pg_index.indexrelid)
+    FROM pg_index
+    JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid
+    WHERE pg_index.indrelid = 'users'::regclass
+        AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE pg_constraint.conindid = pg_index.indexrelid)
+""")
+
+
+def load_users(connection, size, batch_size):
+    """
+    Load users in batches, every batch is committed.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): DB connection
+        size (int): Number of users
+        batch_size (int): Number of users inserted by a single statement
+    """
+    for start in range(0, size, batch_size):
+        stop = min(start + batch_size, size)
+        with connection.begin():
+            connection.execute(
+                LOAD_USERS, first_names=list(FIRST_NAMES), last_names=list(LAST_NAMES), domains=list(EMAIL_DOMAINS),
+                start=start, stop=stop,
+            )
+        print(f'{stop:>10} users loaded')
+
+
+def run(organisations, users, batch_size, truncate, keep_indexes):
+    start = time.perf_counter()
+
+    with engine.connect() as connection:
+        # Dataset can be generated again if the server crashes, durability of every commit is not needed
+        connection.execute('SET synchronous_commit = off')
+
+        with connection.begin():
+            if truncate:
+                connection.execute('TRUNCATE users, organisations RESTART IDENTITY CASCADE')
+            connection.execute(LOAD_ORGANISATIONS, last_names=list(LAST_NAMES), size=organisations)
+        print(f'{organisations:>10} organisations loaded')
+
+        indexes = [] if keep_indexes else connection.execute(USERS_INDEXES).fetchall()
+        with connection.begin():
+            for index_name, _ in indexes:
+                connection.execute(f'DROP INDEX {index_name}')
+
+        load_users(connection, users, batch_size)
+
+        for index_name, definition in indexes:
+            index_start = time.perf_counter()
+            with connection.begin():
+                connection.execute(definition)
+            print(f'{index_name} created in {time.perf_counter() - index_start:.1f} s')
+
+        with connection.begin():
+            connection.execute('ANALYZE organisations')
+            connection.execute('ANALYZE users')
+
+    print(f'Dataset generated in {time.perf_counter() - start:.1f} s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--organisations', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=500000)
+    parser.add_argument('--truncate', action='store_true', help='remove existing users and organisations first')
+    parser.add_argument('--keep-indexes', action='store_true', help='maintain users indexes during the load')
+    arguments = parser.parse_args()
+
+    run(arguments.organisations, arguments.users, arguments.batch_size, arguments.truncate, arguments.keep_indexes)
@@ -0,0 +1,103 @@
+"""
+Throughput of JSON media handlers on representative users pages, in megabytes of JSON per second.
+
+Pages are built in memory like `UserCollectionResource.build_response` builds them, no database is needed.
+
+    python -m benchmarks.json_media --sizes 100 1000 --repeat 50
+"""
+import argparse
+import io
+import random
+import statistics
+import time
+
+from falcon.media import JSONHandler as DefaultJSONHandler
+
+from core.media import JSONHandler, get_json_library
+
+
+FIRST_NAMES = ('John', 'Holly', 'Hans', 'Karl', 'Al', 'Argyle', 'Ellis', 'Théo')
+LAST_NAMES = ('McClane', 'Gennero', 'Gruber', 'Vreski', 'Powell', 'Takagi', 'Müller')
+
+
+def build_page(size, version):
+    """
+    Build users page.
+
+    Args:
+        size (int): Number of users
+        version (float): API version
+
+    Returns:
+        (dict): Response media
+    """
+    data = []
+    for user_id in range(1, size + 1):
+        first_name, last_name = random.choice(FIRST_NAMES), random.choice(LAST_NAMES)
+        user = {
+            'id': user_id,
+            'name': f'{first_name} {last_name}',
+            'email': f'{first_name.lower()}{user_id}@example.com',
+        }
+
+        if version > 1:
+            user['state_name'] = 'ENABLED'
+
+        data.append(user)
+
+    return {'has_more': True, 'total': size * 100, 'total_strategy': 'exact', 'data': data}
+
+
+def measure(function, repeat):
+    """
+    Measure median duration of a function call.
+
+    Args:
+        function (callable): Measured function
+        repeat (int): Number of measured runs
+
+    Returns:
+        (float): Median duration in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+
+def run(sizes, repeat):
+    handlers = {
+        'falcon': DefaultJSONHandler(),
+        'json': JSONHandler(*get_json_library('json')),
+        'orjson': JSONHandler(*get_json_library('orjson')),
+    }
+
+    print(f'{"users":>6} {"version":>7} {"bytes":>9} {"handler":>8} {"dumps [MB/s]":>13} {"loads [MB/s]":>13}')
+
+    for size in sizes:
+        for version in (1.0, 2.0):
+            page = build_page(size, version)
+
+            for name, handler in handlers.items():
+                body = handler.serialize(page, 'application/json')
+                megabytes = len(body) / 10 ** 6
+
+                dumps = measure(lambda: handler.serialize(page, 'application/json'), repeat)
+                loads = measure(lambda: handler.deserialize(io.BytesIO(body), 'application/json', len(body)), repeat)
+
+                print(
+                    f'{size:>6} {version:>7} {len(body):>9} {name:>8} '
+                    f'{megabytes / dumps:>13.1f} {megabytes / loads:>13.1f}'
+                )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    arguments = parser.parse_args()
+
+    run(arguments.sizes, arguments.repeat)
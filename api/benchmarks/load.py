@@ -0,0 +1,378 @@
+"""
+Replay a weighted mix of list, search, sort, detail, POST and PATCH calls against a running API at fixed
+concurrency, and report throughput and p50/p95/p99 latency per endpoint and API version.
+
+Every client thread keeps one connection alive and sends the next request as soon as the previous one is
+answered. Requests of the warmup period are not reported. IDs of users and organisations are read from the
+database configured in settings, which should be the one served by the API, e.g. generated by
+`benchmarks.dataset`. POST and PATCH calls change the data, generate the dataset again for comparable runs.
+
+    gunicorn -c gunicorn_config.py --bind=0.0.0.0:8081 app:app
+    python -m benchmarks.load --concurrency 16 --duration 60 --output results/baseline.json
+"""
+import argparse
+import datetime
+import http.client
+import math
+import os
+import random
+import subprocess
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import defaultdict
+
+from sqlalchemy import text
+
+from benchmarks.dataset import LAST_NAMES
+from core.db.engine import engine
+from core.media import dumps, loads
+from users.api import UserCollectionResource
+
+
+DEFAULT_MIX = ('list=30', 'search=20', 'sort=10', 'detail=25', 'post=5', 'patch=10')
+
+PERCENTILES = (50, 95, 99)
+
+# Keys of `sorting` mapped by users API, ascending and descending, other ones silently fall back to ID order
+USER_SORTINGS = tuple(
+    f'{direction}{key}' for key in UserCollectionResource.sorting_mapper for direction in ('', '-')
+)
+
+ID_RANGES = text("""
+    SELECT
+        (SELECT min(id) FROM users), (SELECT max(id) FROM users),
+        (SELECT min(id) FROM organisations), (SELECT max(id) FROM organisations)
+""")
+
+
+class Workload:
+    """
+    Requests of the mix, every operation returns method, path and body of a random request.
+    """
+
+    def __init__(self, user_ids, organisation_ids, run_id):
+        """
+        Args:
+            user_ids (tuple): Minimum and maximum user ID
+            organisation_ids (tuple): Minimum and maximum organisation ID
+            run_id (str): Unique ID of the run, makes emails of created users unique
+        """
+        self.user_ids = user_ids
+        self.organisation_ids = organisation_ids
+        self.run_id = run_id
+
+    def list(self, version, rng, number):
+        return 'GET', f'/{version}/users?size=20&page={rng.randint(0, 50)}', None
+
+    def search(self, version, rng, number):
+        term = rng.choice(LAST_NAMES)[:rng.randint(3, 6)].lower()
+        return 'GET', f'/{version}/users?size=20&search={urllib.parse.quote(term)}', None
+
+    def sort(self, version, rng, number):
+        return 'GET', f'/{version}/users?size=20&sorting={rng.choice(USER_SORTINGS)}', None
+
+    def detail(self, version, rng, number):
+        return 'GET', f'/{version}/users/{rng.randint(*self.user_ids)}', None
+
+    def post(self, version, rng, number):
+        body = {
+            'first_name': 'Load',
+            'last_name': rng.choice(LAST_NAMES),
+            'email': f'load.{self.run_id}.{number}@example.com',
+            'organisation_id': rng.randint(*self.organisation_ids),
+        }
+        return 'POST', f'/{version}/users', body
+
+    def patch(self, version, rng, number):
+        body = {
+            'first_name': 'Patched',
+            'last_name': rng.choice(LAST_NAMES),
+            'organisation_id': rng.randint(*self.organisation_ids),
+        }
+        return 'PATCH', f'/{version}/users/{rng.randint(*self.user_ids)}', body
+
+
+def parse_mix(mix):
+    """
+    Parse weights of operations.
+
+    Args:
+        mix (list): Operations with weights, e.g. ['list=30', 'detail=70']
+
+    Returns:
+        (tuple): Operation names and their weights
+
+    Raises:
+        ValueError: If an operation is unknown or weight is not a positive integer
+    """
+    operations, weights = [], []
+    for item in mix:
+        operation, _, weight = item.partition('=')
+        if not hasattr(Workload, operation) or not weight.isdigit() or not int(weight):
+            raise ValueError(f'Invalid mix item {item}, expected e.g. list=30')
+
+        operations.append(operation)
+        weights.append(int(weight))
+
+    return operations, weights
+
+
+def get_id_ranges():
+    """
+    Get ranges of user and organisation IDs in the database.
+
+    Returns:
+        (tuple): Minimum and maximum user IDs, minimum and maximum organisation IDs
+
+    Raises:
+        RuntimeError: If there are no users or organisations
+    """
+    with engine.connect() as connection:
+        min_user, max_user, min_organisation, max_organisation = connection.execute(ID_RANGES).fetchone()
+
+    if min_user is None or min_organisation is None:
+        raise RuntimeError('Database has no users or organisations, run benchmarks.dataset first')
+
+    return (min_user, max_user), (min_organisation, max_organisation)
+
+
+def percentile(values, rank):
+    """
+    Get percentile of sorted values by nearest rank method.
+
+    Args:
+        values (list): Sorted values
+        rank (float): Percentile, e.g. 95
+
+    Returns:
+        (float): Percentile value
+    """
+    return values[max(math.ceil(rank / 100 * len(values)), 1) - 1]
+
+
+class Client(threading.Thread):
+    """
+    Thread sending requests over one keep-alive connection until the end of the run.
+    """
+
+    def __init__(self, number, url, workload, operations, weights, versions, warmup_end, end, seed):
+        super().__init__(name=f'load-client-{number}', daemon=True)
+        self.number = number
+        self.url = url
+        self.workload = workload
+        self.operations = operations
+        self.weights = weights
+        self.versions = versions
+        self.warmup_end = warmup_end
+        self.end = end
+        self.rng = random.Random(f'{seed}-{number}')
+
+        # (operation, version, duration, status), status is None when request failed without response
+        self.samples = []
+        self.connection = None
+
+    def connect(self):
+        connection_class = http.client.HTTPSConnection if self.url.scheme == 'https' else http.client.HTTPConnection
+        self.connection = connection_class(self.url.hostname, self.url.port, timeout=30)
+
+    def send(self, method, path, body):
+        """
+        Send request and read the whole response.
+
+        Args:
+            method (str): HTTP method
+            path (str): Path with query string
+            body (dict|None): JSON body
+
+        Returns:
+            (int): Response status
+        """
+        if self.connection is None:
+            self.connect()
+
+        try:
+            self.connection.request(
+                method, path, body=None if body is None else dumps(body),
+                headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
+            )
+            response = self.connection.getresponse()
+            response.read()
+            return response.status
+        except Exception:  # noqa
+            self.connection.close()
+            self.connection = None
+            raise
+
+    def run(self):
+        number = 0
+        while True:
+            start = time.perf_counter()
+            if start >= self.end:
+                return
+
+            operation = self.rng.choices(self.operations, self.weights)[0]
+            version = self.rng.choice(self.versions)
+            method, path, body = getattr(self.workload, operation)(version, self.rng, f'{self.number}-{number}')
+            number += 1
+
+            try:
+                status = self.send(method, path, body)
+            except Exception:  # noqa
+                status = None
+
+            if start >= self.warmup_end:
+                self.samples.append((operation, version, time.perf_counter() - start, status))
+
+
+def summarize(samples, duration):
+    """
+    Summarize samples of a group of requests.
+
+    Args:
+        samples (list): Durations in seconds and statuses
+        duration (float): Measured period in seconds
+
+    Returns:
+        (dict): Number of requests, errors (5xx or no response), client errors (4xx), throughput in requests per
+            second and latency percentiles in milliseconds
+    """
+    durations = sorted(sample_duration * 1000 for sample_duration, _ in samples)
+    statuses = [status for _, status in samples]
+
+    summary = {
+        'requests': len(samples),
+        'errors': sum(1 for status in statuses if status is None or status >= 500),
+        'client_errors': sum(1 for status in statuses if status is not None and 400 <= status < 500),
+        'throughput': round(len(samples) / duration, 2),
+    }
+    for rank in PERCENTILES:
+        summary[f'p{rank}'] = round(percentile(durations, rank), 2)
+    summary['max'] = round(durations[-1], 2)
+
+    return summary
+
+
+def build_report(samples, duration):
+    """
+    Group samples by endpoint and API version, 'all' groups cover every endpoint of a version and every request.
+
+    Args:
+        samples (list): Operation, version, duration in seconds and status of every request
+        duration (float): Measured period in seconds
+
+    Returns:
+        (list): Summaries sorted by endpoint and version
+    """
+    groups = defaultdict(list)
+    for operation, version, sample_duration, status in samples:
+        for key in ((operation, version), ('all', version), ('all', 'all')):
+            groups[key].append((sample_duration, status))
+
+    return [
+        dict(endpoint=endpoint, version=version, **summarize(groups[endpoint, version], duration))
+        for endpoint, version in sorted(groups, key=lambda key: (key[0] == 'all', key))
+    ]
+
+
+def get_git_commit():
+    try:
+        return subprocess.check_output(
+            ('git', 'rev-parse', '--short', 'HEAD'), cwd=os.path.dirname(__file__), stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results):
+    print(
+        f'{"endpoint":>10} {"version":>8} {"requests":>9} {"errors":>7} {"4xx":>6} {"req/s":>9} '
+        f'{"p50 [ms]":>9} {"p95 [ms]":>9} {"p99 [ms]":>9} {"max [ms]":>9}'
+    )
+    for result in results:
+        print(
+            f'{result["endpoint"]:>10} {result["version"]:>8} {result["requests"]:>9} {result["errors"]:>7} '
+            f'{result["client_errors"]:>6} {result["throughput"]:>9.1f} {result["p50"]:>9.2f} '
+            f'{result["p95"]:>9.2f} {result["p99"]:>9.2f} {result["max"]:>9.2f}'
+        )
+
+
+def run(url, concurrency, duration, warmup, versions, mix, seed, output):
+    operations, weights = parse_mix(mix)
+    user_ids, organisation_ids = get_id_ranges()
+    workload = Workload(user_ids, organisation_ids, uuid.uuid4().hex[:8])
+
+    start = time.perf_counter()
+    clients = [
+        Client(
+            number, urllib.parse.urlsplit(url), workload, operations, weights, versions,
+            warmup_end=start + warmup, end=start + warmup + duration, seed=seed,
+        )
+        for number in range(concurrency)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+
+    samples = [sample for client in clients for sample in client.samples]
+    if not samples:
+        raise RuntimeError('No request finished in the measured period')
+
+    report = {
+        'metadata': {
+            'time': datetime.datetime.utcnow().isoformat(),
+            'commit': get_git_commit(),
+            'url': url,
+            'concurrency': concurrency,
+            'duration': duration,
+            'warmup': warmup,
+            'versions': versions,
+            'mix': dict(zip(operations, weights)),
+            'seed': seed,
+            'users': user_ids,
+            'organisations': organisation_ids,
+        },
+        'results': build_report(samples, duration),
+    }
+    print_report(report['results'])
+
+    if output:
+        if os.path.dirname(output):
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, 'wb') as file:
+            file.write(dumps(report))
+        print(f'Report saved to {output}')
+
+
+def load_report(path):
+    """
+    Load report saved by a run.
+
+    Args:
+        path (str): Path of the report
+
+    Returns:
+        (dict): Report with metadata and results
+    """
+    with open(path, 'rb') as file:
+        return loads(file.read())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8081', help='base URL of the API')
+    parser.add_argument('--concurrency', type=int, default=8, help='number of clients sending requests')
+    parser.add_argument('--duration', type=float, default=30, help='measured period in seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='seconds before the measured period')
+    parser.add_argument('--versions', nargs='+', default=['v1', 'v2'])
+    parser.add_argument('--mix', nargs='+', default=list(DEFAULT_MIX), help='weights of operations')
+    parser.add_argument('--seed', type=int, default=0, help='seed of random requests')
+    parser.add_argument('--output', help='path of JSON report')
+    arguments = parser.parse_args()
+
+    run(
+        arguments.url, arguments.concurrency, arguments.duration, arguments.warmup, arguments.versions,
+        arguments.mix, arguments.seed, arguments.output,
+    )
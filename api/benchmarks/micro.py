@@ -0,0 +1,315 @@
+"""
+In-process microbenchmarks of per-request Python overhead: the middleware chain, query string parsing,
+conversion of objects to dicts and error serialization. Requests are simulated by `falcon.testing` with a stubbed
+session, so no database or server is needed.
+
+Results are compared with baselines stored in `benchmarks/baselines/micro.json`, a benchmark which got slower by
+more than its threshold fails the run with status 1. Baselines depend on the machine, store them on the machine
+which compares results, e.g. before a change.
+
+    python -m benchmarks.micro --save
+    python -m benchmarks.micro
+    python -m benchmarks.micro --only middleware_get use_args_user_get
+    python -m benchmarks.micro --list
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import timeit
+from collections import OrderedDict, namedtuple
+
+import falcon
+from falcon import testing
+from webargs.falconparser import use_args
+
+from benchmarks.dataset import FIRST_NAMES, LAST_NAMES
+from benchmarks.load import get_git_commit, load_report
+from core.errors import HTTPError
+from core.media import JSONHandler, dumps
+from core.middleware.db import SQLAlchemySessionManager
+from core.middleware.require_json import RequireJSON
+from core.middleware.serializers import SerializerMiddleware
+from core.middleware.version import VersionMiddleware
+from core.serializers.compiled import compile_schema
+from core.serializers.errors import error_serializer
+from organisations.serializers import OrganisationPatchRequestSchema
+from users.api import UserCollectionResource
+from users.models import User
+from users.serializers import UserGetRequestSchema
+
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'micro.json')
+
+HEADERS = {'Content-Type': 'application/json'}
+
+USER_LIST_QUERY = 'size=20&page=3&search=smith&sorting=-last_name'
+
+
+class Benchmark(namedtuple('Benchmark', ('name', 'description', 'build', 'threshold'))):
+    """
+    Microbenchmark definition.
+
+    Attributes:
+        name (str): Unique name, key of stored baseline
+        description (str): What is measured
+        build (callable): Returns function measured by calling it without arguments
+        threshold (float): Allowed slowdown against baseline in microseconds per call
+    """
+
+
+class StubSession:
+    """
+    Session which never connects to database, resources of microbenchmarks do not query it.
+    """
+
+    bind = None
+
+    def __init__(self, bind=None, info=None):
+        self.info = info or {}
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class BenchmarkResource:
+    """
+    Resource validating bodies with a real request schema, doing nothing else.
+    """
+
+    serializers = {
+        'patch': compile_schema(OrganisationPatchRequestSchema),
+    }
+
+    def on_get(self, req, resp, object_id):
+        resp.media = {'id': int(object_id)}
+
+    def on_patch(self, req, resp, object_id):
+        resp.media = req.context['serializer']
+
+
+def create_app():
+    """
+    Create app with middleware chain of the API that handles requests, see `app.py`.
+
+    Returns:
+        (falcon.API): App routing `/{api_version}/benchmark/{object_id}` to BenchmarkResource
+    """
+    app = falcon.API(middleware=[
+        RequireJSON(),
+        VersionMiddleware(),
+        SQLAlchemySessionManager(StubSession),
+        SerializerMiddleware(),
+    ])
+
+    json_handler = JSONHandler()
+    app.req_options.media_handlers.update({falcon.MEDIA_JSON: json_handler})
+    app.resp_options.media_handlers.update({falcon.MEDIA_JSON: json_handler})
+    app.set_error_serializer(error_serializer)
+
+    app.add_route('/{api_version}/benchmark/{object_id}', BenchmarkResource())
+    return app
+
+
+def build_request(client, method, path, status, **kwargs):
+    """
+    Build simulated request, it is sent once to check it is handled as expected.
+
+    Args:
+        client (falcon.testing.TestClient): Client of app created by `create_app`
+        method (str): HTTP method
+        path (str): Requested path
+        status (int): Expected response status
+        **kwargs: Arguments of `simulate_request`, e.g. body
+
+    Returns:
+        (callable): Function sending the request
+
+    Raises:
+        AssertionError: If response status is not expected
+    """
+    def request():
+        return client.simulate_request(method, path, headers=HEADERS, **kwargs)
+
+    result = request()
+    assert result.status_code == status, f'{method} {path} returned {result.status}: {result.text}'
+
+    return request
+
+
+def build_middleware_get():
+    return build_request(testing.TestClient(create_app()), 'GET', '/v2/benchmark/1', 200)
+
+
+def build_middleware_patch():
+    body = dumps({'name': 'Nakatomi Trading Corp.', 'status': 0})
+    return build_request(testing.TestClient(create_app()), 'PATCH', '/v2/benchmark/1', 200, body=body)
+
+
+def build_middleware_patch_invalid():
+    body = dumps({'name': 'N' * 129, 'status': 7, 'unknown': True})
+    return build_request(testing.TestClient(create_app()), 'PATCH', '/v2/benchmark/1', 422, body=body)
+
+
+def build_use_args_user_get():
+    @use_args(compile_schema(UserGetRequestSchema), location='query')
+    def on_get(resource, req, resp, params):
+        return params
+
+    req = falcon.Request(testing.create_environ(query_string=USER_LIST_QUERY, headers=HEADERS))
+    resp = falcon.Response()
+    return lambda: on_get(None, req, resp)
+
+
+def build_users(size):
+    """
+    Build transient users, they are never added to a session.
+
+    Args:
+        size (int): Number of users
+
+    Returns:
+        (list): User instances
+    """
+    return [
+        User(
+            id=user_id,
+            first_name=FIRST_NAMES[user_id % len(FIRST_NAMES)],
+            last_name=LAST_NAMES[user_id % len(LAST_NAMES)],
+            email=f'user{user_id}@example.com',
+            state=user_id % 4,
+        )
+        for user_id in range(1, size + 1)
+    ]
+
+
+def build_convert_object_to_dict():
+    users = build_users(1000)
+    keys = UserCollectionResource.get_response_keys(2)
+    return lambda: [user.convert_object_to_dict(keys) for user in users]
+
+
+def build_response_serializer():
+    users = build_users(1000)
+    return lambda: UserCollectionResource.get_response_serializer(2).convert_objects(users)
+
+
+def build_convert_rows_to_dicts():
+    projection = UserCollectionResource().get_projection(2)
+    rows = [
+        tuple(getattr(user, column.key) for column in projection.bundle.exprs) for user in build_users(1000)
+    ]
+    return lambda: projection.convert_rows_to_dicts(rows)
+
+
+def build_error_serializer():
+    req = falcon.Request(testing.create_environ(headers=HEADERS))
+    resp = falcon.Response()
+    exception = HTTPError(
+        status=falcon.HTTP_422,
+        errors={'name': ['Longer than maximum length 128.'], 'status': ['Must be one of: 0, 1.']},
+    )
+    return lambda: error_serializer(req, resp, exception)
+
+
+BENCHMARKS = OrderedDict((benchmark.name, benchmark) for benchmark in (
+    Benchmark('middleware_get', 'GET through RequireJSON, Version, session and serializer middleware',
+              build_middleware_get, 50),
+    Benchmark('middleware_patch', 'PATCH with body validated by SerializerMiddleware',
+              build_middleware_patch, 50),
+    Benchmark('middleware_patch_invalid', 'PATCH with invalid body, 422 serialized by error_serializer',
+              build_middleware_patch_invalid, 50),
+    Benchmark('use_args_user_get', 'use_args parsing of UserGetRequestSchema query string',
+              build_use_args_user_get, 50),
+    Benchmark('convert_object_to_dict', 'convert_object_to_dict of 1000 users, v2 keys',
+              build_convert_object_to_dict, 200),
+    Benchmark('response_serializer', 'Registered response serializer of 1000 users, v2 keys',
+              build_response_serializer, 200),
+    Benchmark('convert_rows_to_dicts', 'Projection.convert_rows_to_dicts of 1000 users rows, v2 keys',
+              build_convert_rows_to_dicts, 200),
+    Benchmark('error_serializer', 'error_serializer of 422 with validation messages',
+              build_error_serializer, 10),
+))
+
+
+def measure(function, repeat):
+    """
+    Measure duration of a call, the fastest of `repeat` runs is taken since slower ones are disturbed by other
+    processes rather than by the code.
+
+    Args:
+        function (callable): Measured function
+        repeat (int): Number of runs, every run calls the function as many times as fits into 0.2 s
+
+    Returns:
+        (float): Duration of a call in microseconds
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+
+    return min(timer.repeat(repeat, number)) / number * 1e6
+
+
+def run(names, repeat, save):
+    baselines = load_report(BASELINES_PATH)['results'] if os.path.exists(BASELINES_PATH) else {}
+    results = OrderedDict()
+    regressions = []
+
+    print(f'{"benchmark":>26} {"baseline [µs]":>14} {"current [µs]":>13} {"change [µs]":>12} {"threshold":>10}')
+    for name in names:
+        benchmark = BENCHMARKS[name]
+        results[name] = round(measure(benchmark.build(), repeat), 2)
+
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f'{name:>26} {"n/a":>14} {results[name]:>13.2f}')
+            continue
+
+        change = results[name] - baseline
+        print(f'{name:>26} {baseline:>14.2f} {results[name]:>13.2f} {change:>+12.2f} {benchmark.threshold:>10}')
+        if change > benchmark.threshold:
+            regressions.append(name)
+
+    if save:
+        report = {
+            'metadata': {
+                'time': datetime.datetime.utcnow().isoformat(),
+                'commit': get_git_commit(),
+                'python': platform.python_version(),
+            },
+            'results': {**baselines, **results},
+        }
+        os.makedirs(os.path.dirname(BASELINES_PATH), exist_ok=True)
+        # Indented, so changes of baselines are readable in diffs
+        with open(BASELINES_PATH, 'w') as file:
+            json.dump(report, file, indent=2)
+            file.write('\n')
+        print(f'Baselines saved to {BASELINES_PATH}')
+        return 0
+
+    if regressions:
+        print(f'Slower than baseline by more than threshold: {", ".join(regressions)}')
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=5, help='number of measured runs of every benchmark')
+    parser.add_argument('--save', action='store_true', help='store results as baselines')
+    parser.add_argument('--list', action='store_true', help='describe benchmarks and exit')
+    arguments = parser.parse_args()
+
+    if arguments.list:
+        for benchmark in BENCHMARKS.values():
+            print(f'{benchmark.name:>26}  {benchmark.description}, threshold {benchmark.threshold} µs')
+        sys.exit(0)
+
+    sys.exit(run(arguments.only, arguments.repeat, arguments.save))
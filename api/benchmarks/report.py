@@ -0,0 +1,103 @@
+"""
+Compare throughput and latency percentiles of two runs of `benchmarks.load`, per endpoint and API version.
+
+Exits with status 1 when p95 latency of any group of the candidate run is worse than `--max-regression` percent,
+so the comparison can gate a change.
+
+    python -m benchmarks.report results/baseline.json results/candidate.json --max-regression 10
+"""
+import argparse
+import sys
+
+from benchmarks.load import load_report
+
+
+COMPARED = ('throughput', 'p50', 'p95', 'p99')
+
+
+def get_change(baseline, candidate):
+    """
+    Get relative change of a value.
+
+    Args:
+        baseline (float): Value of the baseline run
+        candidate (float): Value of the candidate run
+
+    Returns:
+        (float|None): Change in percent, None if baseline value is zero
+    """
+    if not baseline:
+        return None
+
+    return (candidate - baseline) / baseline * 100
+
+
+def compare(baseline, candidate):
+    """
+    Pair results of both runs by endpoint and version, groups missing in either run are skipped.
+
+    Args:
+        baseline (dict): Report of the baseline run
+        candidate (dict): Report of the candidate run
+
+    Returns:
+        (list): Endpoint, version and (baseline, candidate, change) of every compared value
+    """
+    baseline_results = {(result['endpoint'], result['version']): result for result in baseline['results']}
+    rows = []
+
+    for result in candidate['results']:
+        key = (result['endpoint'], result['version'])
+        if key not in baseline_results:
+            continue
+
+        values = {
+            name: (baseline_results[key][name], result[name], get_change(baseline_results[key][name], result[name]))
+            for name in COMPARED
+        }
+        rows.append((*key, values))
+
+    return rows
+
+
+def format_change(change):
+    return f'{"n/a":>8}' if change is None else f'{change:>+7.1f}%'
+
+
+def run(baseline_path, candidate_path, max_regression):
+    baseline, candidate = load_report(baseline_path), load_report(candidate_path)
+    print(f'baseline:  {baseline["metadata"]["commit"]} {baseline["metadata"]["time"]}')
+    print(f'candidate: {candidate["metadata"]["commit"]} {candidate["metadata"]["time"]}')
+    for name in ('concurrency', 'duration', 'versions', 'mix'):
+        if baseline['metadata'][name] != candidate['metadata'][name]:
+            print(f'warning: runs differ in {name}, {baseline["metadata"][name]} != {candidate["metadata"][name]}')
+    print(
+        f'{"endpoint":>10} {"version":>8} {"req/s":>9} {"change":>8} {"p50 [ms]":>9} {"change":>8} '
+        f'{"p95 [ms]":>9} {"change":>8} {"p99 [ms]":>9} {"change":>8}'
+    )
+
+    regressions = []
+    for endpoint, version, values in compare(baseline, candidate):
+        print(f'{endpoint:>10} {version:>8}', ' '.join(
+            f'{values[name][1]:>9.2f} {format_change(values[name][2])}' for name in COMPARED
+        ))
+
+        p95_change = values['p95'][2]
+        if max_regression is not None and p95_change is not None and p95_change > max_regression:
+            regressions.append(f'{endpoint} {version}')
+
+    if regressions:
+        print(f'p95 latency regressed more than {max_regression}%: {", ".join(regressions)}')
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline', help='report of the baseline run')
+    parser.add_argument('candidate', help='report of the candidate run')
+    parser.add_argument('--max-regression', type=float, help='allowed p95 latency increase in percent')
+    arguments = parser.parse_args()
+
+    sys.exit(run(arguments.baseline, arguments.candidate, arguments.max_regression))
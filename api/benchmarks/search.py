@@ -0,0 +1,103 @@
+"""
+Search latency against table size, with and without search indexes.
+
+Synthetic users are loaded inside a transaction which is rolled back at the end, so the benchmark can be run
+against a migrated development database without leaving any data behind.
+
+    python -m benchmarks.search --sizes 10000 100000 1000000
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.db.engine import engine
+from users.api import UserCollectionResource
+
+
+SEARCH_INDEXES = (
+    'ix_users_first_name_trgm',
+    'ix_users_last_name_trgm',
+    'ix_users_email_trgm',
+    'ix_users_lower_email_pattern',
+)
+
+SEARCH_TERMS = ('holly', 'a1b2', 'user4f3e', 'user4f3e@', '4242')
+
+LOAD_USERS = text("""
+    INSERT INTO users (first_name, last_name, email, organisation_id, state, created_at)
+    SELECT
+        (ARRAY['John', 'Holly', 'Hans', 'Karl', 'Al', 'Argyle', 'Ellis', 'Theo'])[1 + i % 8],
+        initcap(substr(md5(i::text), 1, 10)),
+        'user' || substr(md5(i::text), 11, 8) || '@example.com',
+        :organisation_id,
+        0,
+        now()
+    FROM generate_series(1, :size) AS i
+""")
+
+
+def measure(db_session, search_term, repeat):
+    """
+    Measure median latency of users collection search.
+
+    Args:
+        db_session (Session): DB Session object
+        search_term (str): Search term
+        repeat (int): Number of measured runs
+
+    Returns:
+        (float): Median latency in milliseconds
+    """
+    resource = UserCollectionResource()
+    params = {'search': [search_term], 'size': 10, 'page': 0}
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        resource.get_objects(db_session, params)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def run(sizes, repeat):
+    print(f'{"users":>10} {"term":>10} {"before [ms]":>12} {"after [ms]":>12} {"speedup":>8}')
+
+    for size in sizes:
+        with engine.connect() as connection:
+            transaction = connection.begin()
+            db_session = Session(bind=connection)
+
+            organisation_id = connection.execute(
+                text("INSERT INTO organisations (name, status) VALUES ('Benchmark', 0) RETURNING id")
+            ).scalar()
+            connection.execute(LOAD_USERS, organisation_id=organisation_id, size=size)
+            connection.execute('ANALYZE users')
+
+            after = {term: measure(db_session, term, repeat) for term in SEARCH_TERMS}
+
+            for index_name in SEARCH_INDEXES:
+                connection.execute(f'DROP INDEX {index_name}')
+
+            before = {term: measure(db_session, term, repeat) for term in SEARCH_TERMS}
+
+            db_session.close()
+            transaction.rollback()
+
+        for term in SEARCH_TERMS:
+            print(
+                f'{size:>10} {term:>10} {before[term]:>12.2f} {after[term]:>12.2f} '
+                f'{before[term] / after[term]:>7.1f}x'
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=5)
+    arguments = parser.parse_args()
+
+    run(arguments.sizes, arguments.repeat)
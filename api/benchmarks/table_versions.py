@@ -0,0 +1,123 @@
+"""
+Throughput of concurrent write transactions on users, with and without `table_versions_bump` trigger.
+
+Every client updates a random user and keeps its transaction open for `--hold` milliseconds, like a request doing
+more work before commit. Updated users are left as they are, only their `updated_at` changes.
+
+    python -m benchmarks.table_versions --concurrency 1 16 --duration 10
+"""
+import argparse
+import random
+import threading
+import time
+
+import psycopg2
+
+from core.db.engine import engine
+
+
+TRIGGER = 'users_table_versions_bump'
+
+
+def connect():
+    return psycopg2.connect(**engine.url.translate_connect_args(username='user', database='dbname'))
+
+
+def write(max_id, hold, deadline, counts):
+    """
+    Run write transactions until deadline.
+
+    Args:
+        max_id (int): Highest user ID
+        hold (float): Time between update and commit in seconds
+        deadline (float): `time.monotonic` value to stop at
+        counts (list): Number of committed transactions is appended to it
+    """
+    connection = connect()
+    committed = 0
+
+    try:
+        with connection.cursor() as cursor:
+            while time.monotonic() < deadline:
+                cursor.execute(
+                    "UPDATE users SET updated_at = timezone('utc', now()) WHERE id = %s", (random.randint(1, max_id), )
+                )
+                time.sleep(hold)
+                connection.commit()
+                committed += 1
+    finally:
+        connection.close()
+
+    counts.append(committed)
+
+
+def measure(concurrency, duration, hold, max_id):
+    """
+    Measure throughput of write transactions.
+
+    Args:
+        concurrency (int): Number of concurrent clients
+        duration (float): Duration in seconds
+        hold (float): Time between update and commit in seconds
+        max_id (int): Highest user ID
+
+    Returns:
+        (float): Committed transactions per second
+    """
+    counts = []
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=write, args=(max_id, hold, deadline, counts)) for _ in range(concurrency)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return sum(counts) / duration
+
+
+def set_trigger(enabled):
+    connection = connect()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE users {"ENABLE" if enabled else "DISABLE"} TRIGGER {TRIGGER}')
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def run(concurrency_levels, duration, hold):
+    connection = connect()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT max(id) FROM users')
+            max_id = cursor.fetchone()[0]
+    finally:
+        connection.close()
+
+    if not max_id:
+        raise SystemExit('No users, create them with `python -m benchmarks.dataset` first')
+
+    print(f'{"clients":>8} {"trigger [tx/s]":>15} {"no trigger [tx/s]":>18} {"ratio":>6}')
+    for concurrency in concurrency_levels:
+        with_trigger = measure(concurrency, duration, hold, max_id)
+
+        set_trigger(False)
+        try:
+            without_trigger = measure(concurrency, duration, hold, max_id)
+        finally:
+            set_trigger(True)
+
+        print(f'{concurrency:>8} {with_trigger:>15.0f} {without_trigger:>18.0f} {with_trigger / without_trigger:>6.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16])
+    parser.add_argument('--duration', type=float, default=10, help='seconds per measurement')
+    parser.add_argument('--hold', type=float, default=2, help='milliseconds between update and commit')
+    arguments = parser.parse_args()
+
+    run(arguments.concurrency, arguments.duration, arguments.hold / 1000)
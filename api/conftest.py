@@ -1,9 +1,17 @@
-from pytest import fixture
-from sqlalchemy_utils import database_exists, create_database, drop_database
+from settings import SERVING
 
-from core.db.create_tables import create_all_tables
-from core.db.engine import engine
-from core.db.session import Session
+if SERVING['worker_class'] == 'gevent':
+    # Same suite runs against gevent serving mode, patching has to precede imports opening connections
+    from core.green import patch
+
+    patch()
+
+from pytest import fixture  # noqa: E402
+from sqlalchemy_utils import database_exists, create_database, drop_database  # noqa: E402
+
+from core.db.create_tables import create_all_tables  # noqa: E402
+from core.db.engine import engine  # noqa: E402
+from core.db.session import Session  # noqa: E402
 
 
 @fixture(scope='session', autouse=True)
@@ -1,9 +1,47 @@
-from sqlalchemy import asc, desc
+import json
+import re
+
+import falcon
+
+from sqlalchemy import and_, asc, cast, desc, func, or_, text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import NullType
+
+from core.db.versions import get_table_version
+from core.enums import CountStrategy, PaginationMode, SearchMode, SearchTerm
+from core.media import dumps
+from core.projection import Projection
+from core.responses import LIST, response_serializers
+from core.result_cache import normalize_params, result_cache
+from core.search import (
+    fulltext_search_filter,
+    fulltext_search_query,
+    fulltext_search_rank,
+    search_field_filter
+)
+from core.utils import decode_cursor, encode_cursor
+from settings import RESPONSES
+
+
+NUMBER_TERM_REGEX = re.compile(r'[0-9]+')
+EMAIL_TERM_REGEX = re.compile(r'[^@\s]+@\S*')
 
 
 class BaseSortingAPI:
     model = None
     sorting_mapper = None
+    search_fields = ()
+    search_vector = None
+    count_strategy = CountStrategy.EXACT.value
+    count_estimate_threshold = 10000
+    # Response keys by API version which declared them, registered by `core.responses.serialize_responses`
+    response_fields = None
+    # Column expressions by response key, enables projection read path, see `core.projection.Projection`
+    projection_columns = None
+    # Response fields derived from projection columns, ComputedField by response key
+    computed_fields = {}
+    # Build response body in database, requires `projection_columns` and SQL expressions of computed fields
+    database_json = RESPONSES['database_json']
 
     def __init__(self):
         name = self.__class__.__name__
@@ -13,60 +51,564 @@ class BaseSortingAPI:
         if self.sorting_mapper is None:
             raise ValueError(f'Sorting mapper on {name} is not defined')
 
-    def get_objects(self, db_session, params):
+        if self.response_fields is None:
+            raise ValueError(f'Response fields on {name} are not defined')
+
+        if not response_serializers.is_registered(self.__class__, LIST):
+            raise ValueError(f'Response fields on {name} are not registered by `serialize_responses`')
+
+        self.projections = {}
+
+    @classmethod
+    def get_response_serializer(cls, version):
+        """
+        Get serializer of objects returned by collection endpoints.
+
+        Args:
+            version (str|None): Current API version
+
+        Returns:
+            (core.responses.ResponseSerializer): Serializer registered for the version
+        """
+        return response_serializers.get(cls, version, LIST)
+
+    @classmethod
+    def get_response_keys(cls, version):
+        """
+        Get attribute names of objects returned by collection endpoints.
+
+        Args:
+            version (str|None): Current API version
+
+        Returns:
+            (tuple): Attribute names
+        """
+        return cls.get_response_serializer(version).keys
+
+    def get_projection(self, version, as_json=False):
+        """
+        Get projection of response keys of given API version, projections are built once per set of keys.
+
+        Args:
+            version (str|None): Current API version
+            as_json (bool): Indicates whether to get projection selecting rows serialized to JSON
+
+        Returns:
+            (core.projection.Projection|None): Projection or None if resource does not define `projection_columns`
+        """
+        if self.projection_columns is None:
+            return None
+
+        keys = self.get_response_keys(version)
+        if (keys, as_json) not in self.projections:
+            self.projections[keys, as_json] = Projection(
+                self.model.__tablename__, keys, self.projection_columns, self.computed_fields, as_json
+            )
+
+        return self.projections[keys, as_json]
+
+    def convert_objects_to_dicts(self, objects, version):
+        """
+        Create dicts with response keys of objects returned by `get_objects`.
+
+        Args:
+            objects (list): Model instances or projection rows
+            version (str|None): Current API version
+
+        Returns:
+            (list): Objects data as dicts
+        """
+        projection = self.get_projection(version)
+        if projection is not None:
+            return projection.convert_rows_to_dicts(objects)
+
+        return self.get_response_serializer(version).convert_objects(objects)
+
+    def get_list_query_budget(self, req):
+        """
+        Get query budget of listing, `query_budgets` value of GET. Freshness check and page query counting
+        objects along with them take 2 statements, counting separately adds one in cursor mode and for pages
+        after the first one (they may be out of range), estimation adds the estimate and exact count of small
+        results.
+
+        Args:
+            req (falcon.request.Request): Request object
+
+        Returns:
+            (int): Maximum number of SQL statements
+        """
+        count_strategy = req.get_param('count') or self.count_strategy
+
+        if count_strategy == CountStrategy.NONE.value:
+            return 2
+
+        if count_strategy == CountStrategy.ESTIMATED.value:
+            return 4
+
+        cursor_mode = req.get_param('cursor') or req.get_param('pagination') == PaginationMode.CURSOR.value
+        return 3 if cursor_mode or req.get_param('page', default='0') != '0' else 2
+
+    def get_freshness(self, db_session, params):
+        """
+        Get freshness of collection for `ConditionalGetMiddleware`, it is the version counter of model table.
+
+        Args:
+            db_session (Session): DB Session object
+            params (dict): Query parameters
+
+        Returns:
+            (tuple): Freshness token, time of the last change
+        """
+        version, updated_at = get_table_version(db_session, self.model.__tablename__)
+
+        return (version, ), updated_at
+
+    @staticmethod
+    def build_json_response(pagination, rows):
+        """
+        Build response body from pagination data and rows of JSON projection, objects are not decoded.
+
+        Args:
+            pagination (dict): Pagination data, e.g. total number of objects and next page cursor
+            rows (list): Rows of JSON projection
+
+        Returns:
+            (bytes): Response body
+        """
+        return dumps(pagination)[:-1] + b',"data":' + Projection.convert_rows_to_json(rows).encode() + b'}'
+
+    def get_objects(self, db_session, params, projection=None):
+        """
+        Retrieve objects of given model base on provided parameters, results of projection queries are shared
+        by identical requests through `core.result_cache.result_cache` when it is enabled. Results read from
+        a replica are not stored, since they may predate the table version known from the primary.
+
+        Args:
+            db_session (Session): DB Session object
+            params (dict): Query parameters
+            projection (core.projection.Projection|None): Projection to select instead of model instances
+
+        Returns:
+            (tuple): List of filtered, sorted and paginated objects of defined model (rows of projection if it is
+                given), pagination data, see `fetch_objects`
+        """
+        key = None
+        if projection is not None and result_cache.enabled:
+            key = result_cache.get_key(
+                self.model.__tablename__,
+                (self.__class__.__name__, projection.keys, projection.as_json, normalize_params(params))
+            )
+
+        if key is None:
+            return self.fetch_objects(db_session, params, projection)
+
+        result = result_cache.get(key)
+        if result is None:
+            objects, pagination = self.fetch_objects(db_session, params, projection)
+            result = [tuple(row) for row in objects], pagination
+            if not db_session.info.get('replica'):
+                result_cache.set(key, result)
+
+        objects, pagination = result
+        return objects, dict(pagination)
+
+    def fetch_objects(self, db_session, params, projection=None):
         """
-        Retrieve objects of given model base on provided parameters
+        Query objects of given model base on provided parameters
 
         Args:
             db_session (Session): DB Session object
             params (dict): Query parameters
+            projection (core.projection.Projection|None): Projection to select instead of model instances
 
         Returns:
-            (tuple): List of filtered, sorted and paginated objects of defined model, total number of all objects
+            (tuple): List of filtered, sorted and paginated objects of defined model (rows of projection if it is
+                given), pagination data (`has_more` flag, `total` number of objects with `total_strategy` which
+                produced it and, in cursor mode, `next_cursor`)
         """
         page = params.get('page')
         size = params.get('size')
         sorting = params.get('sorting')
+        cursor = params.get('cursor')
+        count_strategy = params.get('count') or self.count_strategy
 
         filters = self.build_query_filters(params)
-        sorting_value = self.get_sorting_parameter(sorting)
+        ranking = self.build_search_ranking(params)
         objects = db_session.query(
-            self.model
+            self.get_query_entity(projection)
         ).filter(
             *filters
+        )
+
+        if cursor or params.get('pagination') == PaginationMode.CURSOR.value:
+            paginated_objects, next_cursor = self.paginate_by_cursor(
+                query=objects,
+                size=size,
+                sorting=sorting,
+                cursor=cursor,
+                ranking=ranking
+            )
+            total = None
+            pagination = {'has_more': next_cursor is not None, 'next_cursor': next_cursor}
+        else:
+            paginated_objects, total, has_more = self.paginate_by_offset(
+                query=objects,
+                size=size,
+                page=page,
+                sorting=sorting,
+                count_strategy=count_strategy,
+                ranking=ranking
+            )
+            pagination = {'has_more': has_more}
+
+        if count_strategy == CountStrategy.NONE.value:
+            return paginated_objects, pagination
+
+        if total is None:
+            count_strategy, total = self.count_objects(db_session, objects, count_strategy)
+        else:
+            count_strategy = CountStrategy.EXACT.value
+
+        pagination.update(total=total, total_strategy=count_strategy)
+
+        return paginated_objects, pagination
+
+    def build_query_filters(self, params):
+        """
+        Build filters list based on provided query parameters.
+
+        In substring search mode every search term has to match at least one of `search_fields`,
+        in full text search mode every word of search terms has to be found in `search_vector`.
+
+        Args:
+            params (dict): Query params
+
+        Raises:
+            falcon.HTTPBadRequest: If full text search is requested and resource has no `search_vector`
+
+        Returns:
+            (list): List of filters to be applied
+        """
+        search_terms = params.get('search')
+
+        if not search_terms:
+            return []
+
+        if params.get('search_mode') == SearchMode.FULLTEXT.value:
+            if self.search_vector is None:
+                raise falcon.HTTPBadRequest('Full text search is not supported')
+
+            query = fulltext_search_query(search_terms)
+            return [] if query is None else [fulltext_search_filter(self.search_vector, query)]
+
+        return [self.build_search_term_filter(search_term.strip()) for search_term in search_terms]
+
+    @staticmethod
+    def classify_search_term(search_term):
+        """
+        Recognize kind of search term.
+
+        Args:
+            search_term (str): Search term
+
+        Returns:
+            (SearchTerm): NUMBER for digits only, EMAIL for terms shaped like an email (or its prefix), TEXT otherwise
+        """
+        if NUMBER_TERM_REGEX.fullmatch(search_term):
+            return SearchTerm.NUMBER
+
+        if EMAIL_TERM_REGEX.fullmatch(search_term):
+            return SearchTerm.EMAIL
+
+        return SearchTerm.TEXT
+
+    def build_search_term_filter(self, search_term):
+        """
+        Build filter for a single search term using only `search_fields` declared for its kind.
+
+        Terms of a kind which no field is declared for are searched as TEXT.
+
+        Args:
+            search_term (str): Search term
+
+        Returns:
+            (sqlalchemy.sql.elements.BooleanClauseList): Filter to be applied
+        """
+        term_kind = self.classify_search_term(search_term)
+        fields = [field for field in self.search_fields if term_kind in field.terms]
+
+        if not fields:
+            fields = [field for field in self.search_fields if SearchTerm.TEXT in field.terms]
+
+        return or_(*[search_field_filter(field, search_term) for field in fields])
+
+    def build_search_ranking(self, params):
+        """
+        Build relevance expression used to order objects found by full text search when no sorting is requested.
+
+        Args:
+            params (dict): Query params
+
+        Returns:
+            (sqlalchemy.sql.functions.Function): Relevance expression or None if objects are not ranked
+        """
+        search_terms = params.get('search')
+
+        if not search_terms or params.get('sorting') or params.get('search_mode') != SearchMode.FULLTEXT.value:
+            return None
+
+        query = fulltext_search_query(search_terms)
+        return None if query is None else fulltext_search_rank(self.search_vector, query)
+
+    def get_sorted_query(self, db_session, params, projection=None):
+        """
+        Build query of all objects filtered and sorted like `get_objects` does, without pagination.
+
+        Args:
+            db_session (Session): DB Session object
+            params (dict): Query parameters
+            projection (core.projection.Projection|None): Projection to select instead of model instances
+
+        Returns:
+            (sqlalchemy.orm.query.Query): Filtered and sorted query object
+        """
+        return db_session.query(
+            self.get_query_entity(projection)
+        ).filter(
+            *self.build_query_filters(params)
         ).order_by(
-            sorting_value
+            *self.get_sorting_parameter(params.get('sorting'), self.build_search_ranking(params))
         )
-        paginated_objects = self.paginate_result(
-            query=objects,
+
+    def get_query_entity(self, projection):
+        """
+        Get entity selected by collection queries.
+
+        Args:
+            projection (core.projection.Projection|None): Projection to select instead of model instances
+
+        Returns:
+            Model class or bundle of projection columns
+        """
+        return self.model if projection is None else projection.bundle
+
+    def paginate_by_offset(self, query, size, page, sorting, count_strategy, ranking=None):
+        """
+        Sort and paginate query result using page number.
+
+        With exact count strategy total number of objects is fetched along with the page using
+        `count(*) OVER()`. Total number is also known without counting when requested page is the last one.
+
+        Args:
+            query (sqlalchemy.orm.query.Query): Filtered query object
+            size (int): Desired page size
+            page (int): Page number
+            sorting (str): Sorting value, e.g. -name
+            count_strategy (str): CountStrategy value
+            ranking (sqlalchemy.sql.functions.Function): Relevance expression used when sorting is not requested
+
+        Returns:
+            (tuple): List of objects, total number of objects or None if it is not known,
+                True if there is a next page
+        """
+        with_total = count_strategy == CountStrategy.EXACT.value
+        if with_total:
+            query = query.add_columns(func.count().over().label('total'))
+
+        rows = self.paginate_result(
+            query=query.order_by(*self.get_sorting_parameter(sorting, ranking)),
             size=size,
             page=page
         ).all()
 
-        return paginated_objects, objects.count()
+        has_more = len(rows) > size
+        rows = rows[:size]
+
+        total = None
+        if with_total:
+            total = rows[0].total if rows else None
+            rows = [row[0] for row in rows]
+
+        if not has_more and (rows or page == 0):
+            total = size * page + len(rows)
 
-    def get_sorting_parameter(self, sorting):
+        return rows, total, has_more
+
+    def count_objects(self, db_session, query, count_strategy):
         """
-        Get value which will be used to order transactions
+        Count objects returned by query using given strategy.
+
+        Estimation falls back to exact count when the estimated number is lower than
+        `count_estimate_threshold`, since counting is cheap then and estimates of small sets are inaccurate.
+
+        Args:
+            db_session (Session): DB Session object
+            query (sqlalchemy.orm.query.Query): Filtered query object
+            count_strategy (str): CountStrategy value
+
+        Returns:
+            (tuple): CountStrategy value which produced total number, total number of objects
+        """
+        if count_strategy == CountStrategy.ESTIMATED.value:
+            estimate = self.estimate_count(db_session, query)
+            if estimate >= self.count_estimate_threshold:
+                return count_strategy, estimate
+
+        return CountStrategy.EXACT.value, query.count()
+
+    def estimate_count(self, db_session, query):
+        """
+        Estimate number of objects returned by query using PostgreSQL statistics.
+
+        Unfiltered query is estimated from `pg_class.reltuples`, filtered one from planner row estimate.
+
+        Args:
+            db_session (Session): DB Session object
+            query (sqlalchemy.orm.query.Query): Filtered query object
+
+        Returns:
+            (int): Estimated number of objects
+        """
+        if query.whereclause is None:
+            estimate = db_session.execute(
+                text('SELECT reltuples FROM pg_class WHERE oid = CAST(:table_name AS regclass)'),
+                {'table_name': self.model.__tablename__}
+            ).scalar()
+        else:
+            statement = query.statement.compile(dialect=postgresql.dialect())
+            plan = db_session.connection().execute(
+                f'EXPLAIN (FORMAT JSON) {statement}', statement.params
+            ).scalar()
+
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            estimate = plan[0]['Plan']['Plan Rows']
+
+        # Table which was never analyzed has reltuples set to -1
+        return max(int(estimate or 0), 0)
+
+    def get_sorting_expression(self, sorting, ranking=None):
+        """
+        Get expression and direction which will be used to order objects
 
         Args:
             sorting (str): Sorting value, e.g. -name
+            ranking (sqlalchemy.sql.functions.Function): Relevance expression used when sorting is not requested
 
         Returns:
-            (sqlalchemy.sql.elements.UnaryExpression): Sorting value
+            (tuple): Sorting expression, True if order is descending
         """
-        order = asc
-        if sorting and sorting.startswith('-'):
-            order = desc
+        if not sorting and ranking is not None:
+            # Most relevant objects first
+            return ranking, True
+
+        descending = bool(sorting and sorting.startswith('-'))
+        if descending:
             sorting = sorting[1:]
 
         # By default sort by ID
-        return order(self.sorting_mapper.get(sorting, self.model.id))
+        return self.sorting_mapper.get(sorting, self.model.id), descending
+
+    def get_sorting_parameter(self, sorting, ranking=None):
+        """
+        Get value which will be used to order transactions
+
+        Args:
+            sorting (str): Sorting value, e.g. -name
+            ranking (sqlalchemy.sql.functions.Function): Relevance expression used when sorting is not requested
+
+        Returns:
+            (tuple): Sorting values, sorting expression followed by ID as a tie-breaker
+        """
+        expression, descending = self.get_sorting_expression(sorting, ranking)
+        order = desc if descending else asc
+
+        if expression is self.model.id:
+            return order(expression),
+
+        return order(expression), order(self.model.id)
+
+    def paginate_by_cursor(self, query, size, sorting, cursor, ranking=None):
+        """
+        Paginate query result using keyset pagination.
+
+        Objects are ordered by sorting expression and ID as a tie-breaker, page starts right after
+        the key stored in the cursor, so the cost of a page does not depend on how deep it is.
+
+        Args:
+            query (sqlalchemy.orm.query.Query): Filtered query object
+            size (int): Desired page size
+            sorting (str): Sorting value, e.g. -name
+            cursor (str|None): Cursor returned with the previous page, None for the first page
+            ranking (sqlalchemy.sql.functions.Function): Relevance expression used when sorting is not requested
+
+        Raises:
+            falcon.HTTPBadRequest: If cursor is invalid or was created for different sorting
+
+        Returns:
+            (tuple): List of objects, cursor of the next page or None if it is the last page
+        """
+        expression, descending = self.get_sorting_expression(sorting, ranking)
+
+        query = query.add_columns(expression.label('sort_key'))
+
+        if cursor:
+            payload = decode_cursor(cursor)
+            if not payload or payload.get('sorting') != sorting:
+                raise falcon.HTTPBadRequest('Invalid cursor')
+
+            query = query.filter(self.build_cursor_filter(expression, descending, *payload['key']))
+
+        query = query.order_by(*self.get_sorting_parameter(sorting, ranking))
+
+        rows = query.limit(size + 1).all()
+        objects = [row[0] for row in rows[:size]]
+
+        next_cursor = None
+        if len(rows) > size:
+            last_object, sort_key = rows[size - 1]
+            next_cursor = encode_cursor({'sorting': sorting, 'key': [sort_key, last_object.id]})
+
+        return objects, next_cursor
+
+    def build_cursor_filter(self, expression, descending, value, last_id):
+        """
+        Build filter selecting objects placed after given key in requested order.
+
+        PostgreSQL puts NULL values last in ascending order and first in descending order.
+
+        Args:
+            expression (sqlalchemy.sql.elements.ColumnElement): Sorting expression
+            descending (bool): Indicates whether order is descending
+            value: Value of sorting expression of the last object from previous page
+            last_id (int): ID of the last object from previous page
+
+        Returns:
+            (sqlalchemy.sql.elements.ColumnElement): Filter to be applied
+        """
+        id_column = self.model.id
+
+        if expression is id_column:
+            return id_column < last_id if descending else id_column > last_id
+
+        if value is None:
+            if descending:
+                return or_(and_(expression.is_(None), id_column < last_id), expression.isnot(None))
+            return and_(expression.is_(None), id_column > last_id)
+
+        if not isinstance(expression.type, NullType):
+            # Compare with value of the same type, e.g. REAL rank would not be equal to its DOUBLE representation
+            value = cast(value, expression.type)
+
+        if descending:
+            return tuple_(expression, id_column) < tuple_(value, last_id)
+        return or_(tuple_(expression, id_column) > tuple_(value, last_id), expression.is_(None))
 
     @staticmethod
     def paginate_result(query, size, page):
         """
-        Paginate query result
+        Paginate query result, including the first object of the next page to tell if it exists
 
         Args:
             query (sqlalchemy.orm.query.Query): Query object
@@ -76,4 +618,4 @@ class BaseSortingAPI:
         Returns:
             (sqlalchemy.orm.query.Query): Paginated query object
         """
-        return query.slice(size * page, size * (page + 1))
+        return query.slice(size * page, size * (page + 1) + 1)
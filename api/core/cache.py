@@ -0,0 +1,243 @@
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+
+from sqlalchemy import event, inspect
+
+from core.db.session import Session
+from settings import INSTANCE_CACHE
+
+
+# Tag of all objects of a table, e.g. details of an organisation depend on all users
+ALL = '*'
+
+
+class InstanceCache:
+    """
+    Per-worker bounded LRU cache of detached model instances with TTL.
+
+    Every entry is tagged with the objects its data depends on, the instance itself and objects of relationships
+    loaded with it. Writes invalidate tags of changed objects once they are committed, so a worker never serves
+    data older than its own last successful write. Writes made by other workers are picked up after TTL expires.
+    """
+
+    def __init__(self, enabled, max_size, ttl):
+        """
+        Args:
+            enabled (bool): Indicates whether cache is used
+            max_size (int): Maximum number of entries, the least recently used entry is evicted when it is exceeded
+            ttl (float): Entry lifetime in seconds
+        """
+        self.enabled = enabled
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.entries = OrderedDict()
+        self.tagged_keys = {}
+        # Incremented by every invalidation, instance loaded before an invalidation may be stale and is not stored
+        self.generation = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        Get cached instance.
+
+        Args:
+            key (tuple): Table name and instance ID
+
+        Returns:
+            Detached model instance or None if it is not cached or it has expired
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None or entry[2] < time.monotonic():
+                self.misses += 1
+                if entry is not None:
+                    self.remove(key)
+                return None
+
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, instance, tags, generation):
+        """
+        Store instance unless anything was invalidated since it started to be loaded.
+
+        Args:
+            key (tuple): Table name and instance ID
+            instance: Detached model instance
+            tags (set): Tags of objects instance data depends on
+            generation (int): Value of `generation` taken before instance was loaded
+        """
+        with self.lock:
+            if generation != self.generation:
+                return
+
+            if key in self.entries:
+                self.remove(key)
+
+            self.entries[key] = (instance, tags, time.monotonic() + self.ttl)
+            for tag in tags:
+                self.tagged_keys.setdefault(tag, set()).add(key)
+
+            while len(self.entries) > self.max_size:
+                self.remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags):
+        """
+        Remove entries depending on any of given tags.
+
+        Args:
+            tags (iterable): Tags of changed objects
+        """
+        with self.lock:
+            self.generation += 1
+
+            for tag in tags:
+                for key in list(self.tagged_keys.get(tag, ())):
+                    self.remove(key)
+                    self.invalidations += 1
+
+    def remove(self, key):
+        """
+        Remove entry along with its tags, caller has to hold the lock.
+
+        Args:
+            key (tuple): Table name and instance ID
+        """
+        instance, tags, expires_at = self.entries.pop(key)
+
+        for tag in tags:
+            keys = self.tagged_keys[tag]
+            keys.discard(key)
+            if not keys:
+                del self.tagged_keys[tag]
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+            self.tagged_keys.clear()
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            (dict): Number of hits, misses, evictions, invalidated entries and current size
+        """
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self.entries),
+            }
+
+
+instance_cache = InstanceCache(**INSTANCE_CACHE)
+
+
+def get_instance_key(table_name, instance_id):
+    """
+    Build cache key, it is the same as a tag of the instance.
+
+    Args:
+        table_name (str): Table name
+        instance_id (int|str): Instance ID
+
+    Returns:
+        (tuple): Cache key
+    """
+    return table_name, str(instance_id)
+
+
+def get_instance_tags(instance):
+    """
+    Get tags of objects instance data depends on, the instance itself and objects of its loaded relationships.
+
+    Args:
+        instance (core.db.base.Base): Model instance
+
+    Returns:
+        (set): Tags
+    """
+    state = inspect(instance)
+    tags = {get_instance_key(state.mapper.local_table.name, instance.id)}
+
+    for relationship in state.mapper.relationships:
+        if relationship.key not in state.dict:
+            continue
+
+        table_name = relationship.mapper.local_table.name
+        related = state.dict[relationship.key]
+
+        if relationship.uselist:
+            tags.add((table_name, ALL))
+        elif related is not None:
+            tags.add(get_instance_key(table_name, related.id))
+
+    return tags
+
+
+def get_changed_tags(table_name, instance_id=None):
+    """
+    Get tags invalidated by a change of an object, or of any objects of a table when ID is not known.
+
+    Args:
+        table_name (str): Table name
+        instance_id (int|None): Changed instance ID
+
+    Returns:
+        (set): Tags
+    """
+    tags = {(table_name, ALL)}
+    if instance_id is not None:
+        tags.add(get_instance_key(table_name, instance_id))
+
+    return tags
+
+
+def invalidate_on_commit(db_session, tags):
+    """
+    Invalidate tags when session is committed, changes made outside of the ORM unit of work have to be
+    registered with it (e.g. `Base.bulk_create`).
+
+    Args:
+        db_session (Session): DB Session object
+        tags (iterable): Tags of changed objects
+    """
+    db_session.info.setdefault('changed_tags', set()).update(tags)
+
+
+@event.listens_for(Session, 'after_flush')
+def collect_changed_tags(db_session, flush_context):
+    """
+    Register tags of objects written by the flush, they are invalidated after commit. Tags of rolled back writes
+    are kept and invalidated with the next commit, needless invalidation is cheaper than tracking savepoints.
+    """
+    for instance in chain(db_session.new, db_session.dirty, db_session.deleted):
+        invalidate_on_commit(db_session, get_changed_tags(instance.__table__.name, instance.id))
+
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_changed_tags(db_session):
+    """
+    Invalidate tags of objects written by committed transaction.
+    """
+    tags = db_session.info.pop('changed_tags', None)
+    if tags:
+        instance_cache.invalidate(tags)
@@ -1,10 +1,12 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy import Column, DateTime, Integer, insert
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
 from sqlalchemy.orm.attributes import flag_modified
 from sqlalchemy.schema import MetaData
 
+from core.cache import get_changed_tags, invalidate_on_commit
+
 
 # Constraint naming convention for alembic
 convention = {
@@ -20,6 +22,11 @@ convention = {
 class Base:
     id = Column(Integer, primary_key=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Set by every ORM update which changes any column, see `Base.update`
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Rows inserted by a single multi-row INSERT, keeps bound parameters below PostgreSQL limit of 65535
+    bulk_insert_chunk_size = 1000
 
     @declared_attr
     def __tablename__(cls):
@@ -58,6 +65,36 @@ class Base:
         cls._commit(commit, db_session)
         return instance
 
+    @classmethod
+    def bulk_create(cls, db_session, rows, returning=('id', ), commit=True):
+        """
+        Create objects with multi-row INSERT ... RETURNING, bypassing the ORM unit of work.
+
+        Args:
+            db_session (Session): DB Session object
+            rows (list): Dicts with column values of objects to create
+            returning (tuple): Names of columns returned for every created row
+            commit (bool): Indicates whether to commit session or not
+
+        Returns:
+            (list): Rows with `returning` columns of created objects
+        """
+        table = cls.__table__
+        created = []
+
+        for start in range(0, len(rows), cls.bulk_insert_chunk_size):
+            statement = insert(table).values(
+                rows[start:start + cls.bulk_insert_chunk_size]
+            ).returning(
+                *[table.c[name] for name in returning]
+            )
+            created.extend(db_session.execute(statement).fetchall())
+
+        if created:
+            invalidate_on_commit(db_session, get_changed_tags(table.name))
+        cls._commit(commit, db_session)
+        return created
+
     def convert_object_to_dict(self, keys):
         """
         Create dict with object attribute, values as key and value.
@@ -123,18 +160,19 @@ class Base:
         return instance
 
     @classmethod
-    def get_by_id(cls, db_session, pk):
+    def get_by_id(cls, db_session, pk, options=()):
         """
         Get object by primary key
 
         Args:
             db_session (Session): DB Session object
             pk (int): Primary key
+            options (tuple): SQLAlchemy loader options
 
         Returns:
             Model instance or None
         """
-        return db_session.query(cls).get(pk)
+        return db_session.query(cls).options(*options).get(pk)
 
     @classmethod
     def delete_by_id(cls, db_session, instance_id, commit=True):
@@ -153,7 +191,17 @@ class Base:
         if not instance:
             return False
 
-        db_session.delete(instance)
-        cls._commit(commit, db_session)
+        instance.delete(db_session, commit=commit)
 
         return True
+
+    def delete(self, db_session, commit=True):
+        """
+        Remove already loaded instance.
+
+        Args:
+            db_session (Session): DB Session object
+            commit (bool): Indicates whether to commit session or not
+        """
+        db_session.delete(self)
+        self._commit(commit, db_session)
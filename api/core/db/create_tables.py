@@ -10,10 +10,12 @@ from organisations.models import Organisation
 from users.models import User
 
 
-def create_all_tables(configure_logger=True):
+def create_all_tables(configure_logger=True, url=None):
     path = join(dirname(dirname(dirname(realpath(__file__)))), 'alembic.ini')
     config = Config(path)
     config.attributes['configure_logger'] = configure_logger
+    # Database other than the configured one, e.g. a read replica in tests
+    config.attributes['url'] = url
     config.set_main_option(
         'sqlalchemy.url',
         '{engine}://{username}:{password}@{host}:{port}/{db_name}'.format(**POSTGRESQL)
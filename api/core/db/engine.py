@@ -1,11 +1,31 @@
 from sqlalchemy import create_engine
 
 import settings
+from core.metrics import InstrumentedQueuePool, instrument_engine
 
 
 engine = create_engine(
     "{engine}://{username}:{password}@{host}:{port}/{db_name}".format(**settings.POSTGRESQL),
     pool_size=settings.POSTGRESQL["pool_size"],
+    poolclass=InstrumentedQueuePool,
     connect_args={"application_name": settings.POSTGRESQL["application_name"]},
     echo=settings.SQLALCHEMY["debug"],
 )
+instrument_engine(engine, "primary")
+
+# Down replica must not hold requests for long, they fall back to the primary
+replica_engines = [
+    create_engine(
+        url,
+        pool_size=settings.POSTGRESQL["pool_size"],
+        poolclass=InstrumentedQueuePool,
+        connect_args={
+            "application_name": settings.POSTGRESQL["application_name"],
+            "connect_timeout": settings.POSTGRESQL["replica_connect_timeout"],
+        },
+        echo=settings.SQLALCHEMY["debug"],
+    )
+    for url in settings.POSTGRESQL["replicas"]
+]
+for number, replica_engine in enumerate(replica_engines):
+    instrument_engine(replica_engine, f"replica{number}")
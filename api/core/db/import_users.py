@@ -0,0 +1,37 @@
+import argparse
+import sys
+
+from core.db.session import session_manager
+from users.importer import IMPORT_FORMATS, import_users
+
+
+def import_users_file(path, file_format, report_path):
+    """
+    Import Users from NDJSON or CSV file, optionally gzipped, and write rejected rows as NDJSON.
+
+    Args:
+        path (str): Path of imported file, "-" for standard input
+        file_format (str): One of IMPORT_FORMATS
+        report_path (str): Path of rejected rows report, "-" for standard output
+    """
+    stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+    report = sys.stdout if report_path == '-' else open(report_path, 'w')
+
+    try:
+        with session_manager() as db_session:
+            imported, rejected = import_users(db_session, stream, file_format, report, commit=False)
+    finally:
+        stream.close()
+        report.close()
+
+    print(f'Imported {imported} users, rejected {rejected}', file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Import Users from NDJSON or CSV file, optionally gzipped')
+    parser.add_argument('path', help='Imported file, "-" for standard input')
+    parser.add_argument('--format', choices=IMPORT_FORMATS, default=IMPORT_FORMATS[0])
+    parser.add_argument('--rejected', default='-', help='Rejected rows report, "-" for standard output')
+    arguments = parser.parse_args()
+
+    import_users_file(arguments.path, arguments.format, arguments.rejected)
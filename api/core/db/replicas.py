@@ -0,0 +1,240 @@
+import logging
+import random
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+
+from core.db.engine import engine, replica_engines
+from core.db.session import Session
+from settings import READ_REPLICAS
+
+
+logger = logging.getLogger(__name__)
+
+# Cookie with WAL position of the last write of a client, its reads are served only by databases which replayed it
+LAST_WRITE_COOKIE = 'last_write_lsn'
+
+# Database which is not in recovery reports no replay position, it is never behind
+REPLICA_STATUS = """
+    SELECT
+        pg_is_in_recovery(),
+        pg_last_wal_replay_lsn()::text,
+        EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+"""
+
+
+def parse_lsn(value):
+    """
+    Convert textual WAL position, e.g. '16/B374D848', to a comparable number.
+
+    Args:
+        value (str|None): WAL position
+
+    Returns:
+        (int|None): WAL position or None if value is missing or invalid
+    """
+    try:
+        high, low = value.split('/')
+        return (int(high, 16) << 32) + int(low, 16)
+    except (AttributeError, ValueError):
+        return None
+
+
+def get_write_lsn(db_session):
+    """
+    Get current WAL position of the primary, every write committed before is replayed by replicas at it.
+
+    Args:
+        db_session (Session): DB Session object bound to the primary
+
+    Returns:
+        (str): WAL position
+    """
+    return db_session.execute('SELECT pg_current_wal_lsn()::text').scalar()
+
+
+def get_replica_lag(in_recovery, replay_lsn, replay_age, primary_lsn):
+    """
+    Estimate lag of a replica behind the primary.
+
+    The replica is compared with the primary rather than with WAL it received, a replica which lost connection
+    to the primary has replayed everything it received, but falls behind. Lag is 0 when the replica replayed
+    the position the primary had before the check, otherwise it is age of the last replayed transaction.
+
+    Args:
+        in_recovery (bool): Whether the database is in recovery, i.e. it is a replica
+        replay_lsn (int|None): Last WAL position replayed by the replica
+        replay_age (float|None): Seconds since commit of the last transaction replayed by the replica
+        primary_lsn (int|None): Current WAL position of the primary or None if it is unknown
+
+    Returns:
+        (float): Lag in seconds, infinity if it cannot be determined
+    """
+    if not in_recovery:
+        return 0.0
+
+    if replay_lsn is not None and primary_lsn is not None and replay_lsn >= primary_lsn:
+        return 0.0
+
+    if replay_age is None or primary_lsn is None:
+        return float('inf')
+
+    return float(replay_age)
+
+
+@event.listens_for(Session, 'after_commit', insert=True)
+def mark_committed_writes(db_session):
+    """
+    Mark session which committed changes, only its client gets WAL position of the write. Writes of ORM flushes
+    and Core statements register tags of changed objects in `core.cache`, this runs before they are dropped.
+    """
+    if db_session.info.get('changed_tags'):
+        db_session.info['committed_writes'] = True
+
+
+class Replica:
+    """
+    Read replica along with its last known health and lag.
+    """
+
+    def __init__(self, engine):
+        """
+        Args:
+            engine (sqlalchemy.engine.Engine): Engine connected to the replica
+        """
+        self.engine = engine
+        self.healthy = False
+        self.lag = None
+        self.replay_lsn = None
+        self.checked_at = None
+
+        # Broken connection makes the replica unhealthy right away instead of after the next check
+        event.listen(engine, 'handle_error', self.handle_error)
+
+    def check(self, primary_lsn=None):
+        """
+        Refresh health, lag and replay position of the replica.
+
+        Args:
+            primary_lsn (int|None): WAL position of the primary read before the check, None if it is unknown
+        """
+        self.checked_at = time.monotonic()
+
+        try:
+            with self.engine.connect() as connection:
+                in_recovery, replay_lsn, replay_age = connection.execute(REPLICA_STATUS).first()
+        except DBAPIError:
+            logger.warning('Health check of replica %s failed', self.engine.url, exc_info=True)
+            self.healthy = False
+            return
+
+        self.healthy = True
+        self.replay_lsn = parse_lsn(replay_lsn)
+        self.lag = get_replica_lag(in_recovery, self.replay_lsn, replay_age, primary_lsn)
+
+    def handle_error(self, context):
+        if context.is_disconnect:
+            self.healthy = False
+
+    def is_eligible(self, max_lag, min_lsn=None):
+        """
+        Check whether the replica may serve a read.
+
+        Args:
+            max_lag (float): Maximum lag in seconds
+            min_lsn (int|None): WAL position of the last write of the client, the replica has to replay it
+
+        Returns:
+            (bool): True if the replica is healthy, fresh enough and has all writes of the client
+        """
+        if not self.healthy or self.lag > max_lag:
+            return False
+
+        # Last replay position checked is a lower bound of the current one
+        return min_lsn is None or (self.replay_lsn is not None and self.replay_lsn >= min_lsn)
+
+
+class ReplicaRouter:
+    """
+    Choose a replica for reads, the primary is used when no replica is eligible.
+
+    Replicas are checked in a background thread of every worker, started by a request at most once per
+    `check_interval`. Requests never wait for the check, they use the last known state, so a replica which is
+    down costs its connect timeout to the check only. The ones which are down or lag more than `max_lag` are
+    excluded until a check finds them fine again.
+    """
+
+    def __init__(self, engines, primary, max_lag, check_interval, recent_writer_ttl):
+        """
+        Args:
+            engines (list): Engines connected to replicas
+            primary (sqlalchemy.engine.Engine): Engine connected to the primary, replicas are compared with it
+            max_lag (float): Seconds a replica may lag behind the primary
+            check_interval (float): Seconds between health checks of a replica
+            recent_writer_ttl (int): Seconds reads of a client are pinned to databases with its last write
+        """
+        self.replicas = [Replica(engine) for engine in engines]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.recent_writer_ttl = recent_writer_ttl
+        self.primary = primary
+        self.checked_at = None
+        self.checking = False
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.replicas)
+
+    def get_engine(self, min_lsn=None):
+        """
+        Get engine of a random eligible replica.
+
+        Args:
+            min_lsn (int|None): WAL position of the last write of the client
+
+        Returns:
+            (sqlalchemy.engine.Engine|None): Replica engine or None if the primary has to be used
+        """
+        if self.checked_at is None or time.monotonic() - self.checked_at >= self.check_interval:
+            self.start_check()
+
+        eligible = [replica for replica in self.replicas if replica.is_eligible(self.max_lag, min_lsn)]
+        if not eligible:
+            return None
+
+        return random.choice(eligible).engine
+
+    def start_check(self):
+        """
+        Start health check of replicas in a background thread, unless another request already started it.
+        """
+        with self.lock:
+            if self.checking:
+                return
+            self.checking = True
+
+        threading.Thread(target=self.check_replicas, name='replica-health-check', daemon=True).start()
+
+    def check_replicas(self):
+        """
+        Refresh health and lag of all replicas.
+        """
+        try:
+            try:
+                with self.primary.connect() as connection:
+                    primary_lsn = parse_lsn(connection.execute('SELECT pg_current_wal_lsn()::text').scalar())
+            except DBAPIError:
+                logger.warning('WAL position of the primary is unknown, lag of replicas cannot be checked')
+                primary_lsn = None
+
+            for replica in self.replicas:
+                replica.check(primary_lsn)
+        finally:
+            self.checked_at = time.monotonic()
+            self.checking = False
+
+
+replica_router = ReplicaRouter(replica_engines, engine, **READ_REPLICAS)
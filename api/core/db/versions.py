@@ -0,0 +1,51 @@
+from sqlalchemy import BigInteger, Column, DateTime, SmallInteger, String, Table, cast, func, select
+
+from core.db.base import Base
+
+
+# Version counter of a table, bumped by `table_versions_bump` trigger after every statement changing its rows,
+# so it covers ORM writes as well as bulk inserts and COPY. Counter is updated in the writing transaction,
+# readers never see new version before the data.
+#
+# The counter is split into shards, a writing transaction bumps the row of its backend and holds its lock until
+# commit. A single row would serialize all concurrent write transactions of the table. Version is the sum of
+# shards, every commit increases it.
+table_versions = Table(
+    'table_versions', Base.metadata,
+    Column('table_name', String(63), primary_key=True),
+    Column('shard', SmallInteger, primary_key=True),
+    Column('version', BigInteger, nullable=False),
+    Column('updated_at', DateTime, nullable=False),
+)
+
+
+def select_table_version(table_name):
+    """
+    Build query of version counter of a table, it returns a single row even if the table was never changed.
+
+    Args:
+        table_name (str): Table name
+
+    Returns:
+        (sqlalchemy.sql.expression.Select): Query selecting `version` and `updated_at`
+    """
+    return select([
+        cast(func.coalesce(func.sum(table_versions.c.version), 0), BigInteger).label('version'),
+        func.max(table_versions.c.updated_at).label('updated_at'),
+    ]).where(
+        table_versions.c.table_name == table_name
+    )
+
+
+def get_table_version(db_session, table_name):
+    """
+    Get version counter of a table.
+
+    Args:
+        db_session (Session): DB Session object
+        table_name (str): Table name
+
+    Returns:
+        (tuple): Version number, time of the last change or None for a table which was never changed
+    """
+    return tuple(db_session.execute(select_table_version(table_name)).first())
@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, unique
 
 
 class BaseEnum(Enum):
@@ -21,3 +21,42 @@ class BaseEnum(Enum):
             (list): Contains all available values for the enum
         """
         return [status.value for status in cls]
+
+
+@unique
+class PaginationMode(BaseEnum):
+    OFFSET = 'offset'
+    CURSOR = 'cursor'
+
+
+@unique
+class CountStrategy(BaseEnum):
+    EXACT = 'exact'
+    ESTIMATED = 'estimated'
+    NONE = 'none'
+
+
+@unique
+class SearchMode(BaseEnum):
+    SUBSTRING = 'substring'
+    FULLTEXT = 'fulltext'
+
+
+@unique
+class SearchIndex(BaseEnum):
+    BTREE = 'btree'
+    PATTERN = 'pattern'
+    TRIGRAM = 'trigram'
+
+
+@unique
+class SearchTerm(BaseEnum):
+    NUMBER = 'number'
+    EMAIL = 'email'
+    TEXT = 'text'
+
+
+@unique
+class ExportFormat(BaseEnum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
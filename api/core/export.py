@@ -0,0 +1,132 @@
+import csv
+import io
+
+from webargs.falconparser import use_args
+
+from core.enums import ExportFormat
+from core.media import dumps
+from core.serializers import BaseExportRequestSchema
+from core.serializers.compiled import compile_schema
+
+
+CONTENT_TYPES = {
+    ExportFormat.NDJSON.value: 'application/x-ndjson',
+    ExportFormat.CSV.value: 'text/csv',
+}
+
+
+class ExportResource:
+    """
+    API method to export all objects of a collection resource matching its search and sorting parameters.
+
+    Response is streamed while rows are fetched from a server-side cursor, so memory usage does not depend
+    on the number of exported objects.
+    """
+
+    # Rows fetched from the cursor and written to the response at once
+    chunk_size = 1000
+
+    def __init__(self, collection, Session):
+        """
+        Args:
+            collection (core.api.BaseSortingAPI): Collection resource defining model, search and sorting
+            Session (sqlalchemy.orm.session.sessionmaker): Session factory, request session is closed before
+                the response is streamed
+        """
+        self.collection = collection
+        self.Session = Session
+
+    @use_args(compile_schema(BaseExportRequestSchema), location='query')
+    def on_get(self, req, resp, params):
+        """
+        Get all objects as NDJSON or CSV stream
+
+        Args:
+            req (falcon.request.Request): Request object
+            resp (falcon.response.Response): Response object
+            params (dict): Query params
+        """
+        export_format = params['format']
+        serializer = self.collection.get_response_serializer(req.context['version'])
+        projection = self.collection.get_projection(req.context['version'])
+
+        resp.content_type = CONTENT_TYPES[export_format]
+        resp.append_header(
+            'Content-Disposition',
+            f'attachment; filename="{self.collection.model.__tablename__}.{export_format}"'
+        )
+        resp.stream = self.stream_objects(
+            params, serializer, export_format, projection, bind=req.context['db_session'].bind
+        )
+
+    def stream_objects(self, params, serializer, export_format, projection=None, bind=None):
+        """
+        Fetch objects with a single query using server-side cursor and serialize them in chunks.
+
+        Args:
+            params (dict): Query params
+            serializer (core.responses.ResponseSerializer): Response serializer of collection resource, its
+                keys are exported
+            export_format (str): ExportFormat value
+            projection (core.projection.Projection|None): Projection of collection resource, rows are read
+                without ORM hydration when it is given
+            bind (sqlalchemy.engine.Connectable|None): Database of the request session, e.g. a read replica,
+                default bind of the factory is used when it is not given
+
+        Yields:
+            (bytes): Serialized chunk of objects
+        """
+        db_session = self.Session(bind=bind) if bind is not None else self.Session()
+        buffer = io.StringIO()
+        write_row = self.get_row_writer(buffer, serializer.keys, export_format)
+        convert_to_dict = projection.convert_row_to_dict if projection is not None else serializer.convert_object
+
+        try:
+            query = self.collection.get_sorted_query(db_session, params, projection).yield_per(self.chunk_size)
+
+            for number, row in enumerate(query, start=1):
+                write_row(convert_to_dict(row))
+
+                if number % self.chunk_size == 0:
+                    yield self.flush(buffer)
+
+            yield self.flush(buffer)
+        finally:
+            db_session.close()
+
+    @staticmethod
+    def get_row_writer(buffer, keys, export_format):
+        """
+        Get function writing serialized object to the buffer, CSV header is written right away.
+
+        Args:
+            buffer (io.StringIO): Buffer of serialized objects
+            keys (tuple): Exported attribute names
+            export_format (str): ExportFormat value
+
+        Returns:
+            (callable): Function writing single object data
+        """
+        if export_format == ExportFormat.CSV.value:
+            writer = csv.DictWriter(buffer, fieldnames=keys)
+            writer.writeheader()
+            return writer.writerow
+
+        return lambda data: buffer.write(dumps(data).decode() + '\n')
+
+    @staticmethod
+    def flush(buffer):
+        """
+        Empty the buffer.
+
+        Args:
+            buffer (io.StringIO): Buffer of serialized objects
+
+        Returns:
+            (bytes): Buffer content
+        """
+        content = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+        return content
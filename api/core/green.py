@@ -0,0 +1,15 @@
+from gevent import monkey
+from psycogreen.gevent import patch_psycopg
+
+
+def patch():
+    """
+    Make blocking I/O of the process cooperative, so a gevent worker serves many requests at once.
+
+    Standard library is monkey patched unless gunicorn worker already did it, psycopg2 gets a wait callback
+    yielding to other greenlets while queries run. It has to be called before connections are opened.
+    """
+    if not monkey.is_module_patched('socket'):
+        monkey.patch_all()
+
+    patch_psycopg()
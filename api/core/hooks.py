@@ -1,12 +1,25 @@
+from itertools import chain
 from uuid import UUID
 
 from falcon import HTTPNotFound
 
+from core.cache import get_instance_key, get_instance_tags, instance_cache
+
 
 def get_instance(req, resp, resource, params, model_class):
     """
     Get instance of given model base on ID provided in URL under instance_key and attach it to request object.
 
+    Loader options are taken from `loader_options` of the resource, a dict of lowercase HTTP method names to
+    tuples of SQLAlchemy loader options (eg. `joinedload`, `selectinload` or `with_expression`), so every
+    method loads exactly what it needs with the instance. GET adds options of `response_loader_options`, a dict
+    of response keys to loader options, for keys rendered in the requested API version. Methods listed in
+    `methods_without_instance` of the resource get no instance, they look the object up by themselves.
+
+    GET requests consult per-worker instance cache first, when it is enabled, instances are cached separately
+    per set of response keys loaded with them. Other methods change the instance, so they always load it from
+    the database.
+
     Args:
         req (falcon.request.Request): Request object
         resp (falcon.response.Response): Response object
@@ -17,15 +30,47 @@ def get_instance(req, resp, resource, params, model_class):
     Raises:
         falcon.HTTPNotFound: If instance with provided ID does not exist
     """
+    if req.method.lower() in getattr(resource, 'methods_without_instance', ()):
+        return
+
     instance_id = params.get('object_id')
     db_session = req.context.db_session
 
     if isinstance(instance_id, UUID):
         instance_id = instance_id.hex
 
-    instance = model_class.get_by_id(db_session, instance_id)
+    options = getattr(resource, 'loader_options', {}).get(req.method.lower(), ())
+    loaded_keys = ()
+
+    response_loader_options = getattr(resource, 'response_loader_options', {})
+    if req.method == 'GET' and response_loader_options:
+        keys = resource.get_response_serializer(req.context['version']).keys
+        loaded_keys = tuple(key for key in response_loader_options if key in keys)
+        options += tuple(chain.from_iterable(response_loader_options[key] for key in loaded_keys))
+
+    # Instance read from a replica may predate writes already invalidated, so it is not stored
+    use_cache = req.method == 'GET' and instance_cache.enabled and not db_session.info.get('replica')
+    if use_cache:
+        key = get_instance_key(model_class.__tablename__, instance_id) + loaded_keys
+        instance = instance_cache.get(key)
+
+        if instance is not None:
+            req.context.instance = instance
+            return
+
+        generation = instance_cache.generation
+
+    instance = model_class.get_by_id(db_session, instance_id, options=options)
 
     if not instance:
         raise HTTPNotFound
 
+    if use_cache:
+        # Detached instance and objects loaded with it never touch the session of another request
+        tags = get_instance_tags(instance)
+        for related in list(db_session.identity_map.values()):
+            db_session.expunge(related)
+
+        instance_cache.put(key, instance, tags, generation)
+
     req.context.instance = instance
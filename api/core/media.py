@@ -0,0 +1,100 @@
+import datetime
+import json
+import uuid
+from enum import Enum
+
+import falcon
+from falcon.media import BaseHandler
+
+from settings import MEDIA
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def json_default(value):
+    """
+    Serialize values unknown to JSON, same way for every JSON library.
+
+    Dates and times are formatted with `str` like pagination cursors are, enums are replaced with their values.
+
+    Args:
+        value: Value to serialize
+
+    Raises:
+        TypeError: If value is not serializable
+
+    Returns:
+        Serializable value
+    """
+    if isinstance(value, (datetime.date, datetime.time, uuid.UUID)):
+        return str(value)
+
+    if isinstance(value, Enum):
+        return value.value
+
+    raise TypeError(f'Object of type {value.__class__.__name__} is not JSON serializable')
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, default=json_default).encode()
+
+
+def stdlib_loads(data):
+    return json.loads(data)
+
+
+if orjson is not None:
+    # Non string keys come from marshmallow errors of list items, datetimes and dataclasses are passed to
+    # `json_default`, so output does not depend on the library
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def orjson_dumps(obj):
+        return orjson.dumps(obj, default=json_default, option=ORJSON_OPTIONS)
+
+    orjson_loads = orjson.loads
+
+
+def get_json_library(name):
+    """
+    Get JSON functions of a library, standard library is used when requested one is not installed.
+
+    Args:
+        name (str): 'orjson' or 'json'
+
+    Returns:
+        (tuple): Function serializing object to bytes, function deserializing bytes or str
+    """
+    if name == 'orjson' and orjson is not None:
+        return orjson_dumps, orjson_loads
+
+    return stdlib_dumps, stdlib_loads
+
+
+dumps, loads = get_json_library(MEDIA['json_library'])
+
+
+class JSONHandler(BaseHandler):
+    """
+    JSON media handler of requests and responses using configured JSON library.
+    """
+
+    def __init__(self, dumps=dumps, loads=loads):
+        """
+        Args:
+            dumps (callable): Function serializing object to bytes
+            loads (callable): Function deserializing bytes
+        """
+        self.dumps = dumps
+        self.loads = loads
+
+    def deserialize(self, stream, content_type, content_length):
+        try:
+            return self.loads(stream.read())
+        except ValueError as err:
+            raise falcon.HTTPBadRequest('Invalid JSON', f'Could not parse JSON body - {err}')
+
+    def serialize(self, media, content_type):
+        return self.dumps(media)
@@ -0,0 +1,151 @@
+import os
+import time
+
+import falcon
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from settings import METRICS
+
+
+# Values of every gunicorn worker are written to files in this directory and aggregated on scrape, it has to
+# be set before prometheus_client is imported and emptied before the server starts
+MULTIPROCESS_DIRECTORY_VARIABLE = 'prometheus_multiproc_dir'
+
+REQUEST_DURATION = Histogram(
+    'api_request_duration_seconds', 'Duration of API requests', ('route', 'method', 'version'),
+)
+REQUESTS = Counter(
+    'api_requests_total', 'Number of API requests by response status', ('route', 'method', 'version', 'status'),
+)
+
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    'db_pool_checkout_duration_seconds', 'Time spent waiting for a pooled connection', ('database', ),
+    buckets=(.0005, .001, .005, .01, .05, .1, .5, 1, 5, 30),
+)
+DB_POOL_IN_USE = Gauge(
+    'db_pool_connections_in_use', 'Connections checked out from the pool', ('database', ),
+    multiprocess_mode='livesum',
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_connections_overflow', 'Connections opened over the pool size', ('database', ),
+    multiprocess_mode='livesum',
+)
+
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Duration of SQL statements', ('database', 'operation'),
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 5),
+)
+
+# Operation label is the first keyword of a statement, anything else is counted as other to bound cardinality
+QUERY_OPERATIONS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'COPY', 'CREATE', 'DROP', 'TRUNCATE')
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    Queue pool measuring how long checkouts wait for a connection, including time to open a new one, and keeping
+    gauges of connections in use up to date.
+    """
+
+    database = None
+
+    # Sessions and `Engine.connect` check connections out by different pool methods, both get them here
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_DURATION.labels(self.database).observe(time.perf_counter() - start)
+            self.update_gauges()
+
+    def _do_return_conn(self, conn):
+        # `checkin` event fires before the connection is returned, the pool still counts it as checked out
+        super()._do_return_conn(conn)
+        self.update_gauges()
+
+    def update_gauges(self):
+        if self.database is not None:
+            DB_POOL_IN_USE.labels(self.database).set(self.checkedout())
+            DB_POOL_OVERFLOW.labels(self.database).set(max(self.overflow(), 0))
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.database = self.database
+        return pool
+
+
+def get_query_operation(statement):
+    """
+    Get operation label of a SQL statement.
+
+    Args:
+        statement (str): SQL statement
+
+    Returns:
+        (str): Operation, e.g. 'SELECT'
+    """
+    words = statement.split(None, 1)
+    operation = words[0].upper() if words else ''
+    return operation if operation in QUERY_OPERATIONS else 'OTHER'
+
+
+def instrument_engine(engine, database):
+    """
+    Collect pool usage and statement durations of an engine.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Engine created with InstrumentedQueuePool
+        database (str): Value of `database` label, e.g. 'primary'
+    """
+    engine.pool.database = database
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        # Connection executes one statement at a time, start of a failed one is overwritten by the next one
+        conn.info['query_start_time'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def observe_query_duration(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info.pop('query_start_time')
+        DB_QUERY_DURATION.labels(database, get_query_operation(statement)).observe(duration)
+
+
+def get_registry():
+    """
+    Get registry of collected metrics, values of all worker processes are aggregated in multiprocess mode.
+
+    Returns:
+        (prometheus_client.CollectorRegistry): Registry
+    """
+    if MULTIPROCESS_DIRECTORY_VARIABLE not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+class MetricsResource:
+    """
+    Metrics in Prometheus text format, available only to clients listed in METRICS['allowed_addresses'].
+    """
+
+    def on_get(self, req, resp):
+        """
+        Get metrics
+
+        Args:
+            req (falcon.request.Request): Request object
+            resp (falcon.response.Response): Response object
+
+        Raises:
+            falcon.HTTPNotFound: If client is not allowed to read metrics
+        """
+        if req.remote_addr not in METRICS['allowed_addresses']:
+            raise falcon.HTTPNotFound
+
+        resp.content_type = CONTENT_TYPE_LATEST
+        resp.data = generate_latest(get_registry())
@@ -0,0 +1,55 @@
+import hashlib
+
+import falcon
+
+
+class ConditionalGetMiddleware:
+    """
+    Set strong ETag and Last-Modified of GET responses and answer conditional requests with 304 Not Modified.
+
+    Freshness comes from `get_freshness` of the resource, a cheap query run instead of loading and serializing
+    objects, so fresh representation is confirmed before any resource hook or responder runs. ETag covers
+    requested URI, so every representation (API version, query parameters) has its own.
+    """
+
+    def process_resource(self, req, resp, resource, params):
+        if req.method != 'GET' or not hasattr(resource, 'get_freshness'):
+            return
+
+        freshness = resource.get_freshness(req.context['db_session'], params)
+        if freshness is None:
+            return
+
+        token, last_modified = freshness
+        etag = hashlib.sha1(
+            repr((req.relative_uri, getattr(resource, 'database_json', False), token)).encode()
+        ).hexdigest()
+
+        resp.etag = etag
+        if last_modified:
+            # HTTP dates have second precision, client would never be able to match sub-second part
+            last_modified = last_modified.replace(microsecond=0)
+            resp.last_modified = last_modified
+
+        if self.is_not_modified(req, etag, last_modified):
+            resp.status = falcon.HTTP_304
+            resp.complete = True
+
+    @staticmethod
+    def is_not_modified(req, etag, last_modified):
+        """
+        Evaluate conditional request headers, `If-Modified-Since` is ignored when `If-None-Match` is present.
+
+        Args:
+            req (falcon.request.Request): Request object
+            etag (str): Current ETag
+            last_modified (datetime.datetime|None): Time of the last change
+
+        Returns:
+            (bool): True if representation known by the client is still fresh
+        """
+        if req.if_none_match:
+            return any(tag == '*' or tag == etag for tag in req.if_none_match)
+
+        if_modified_since = req.if_modified_since
+        return bool(last_modified and if_modified_since and last_modified <= if_modified_since)
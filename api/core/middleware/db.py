@@ -1,22 +1,67 @@
+from core.db.replicas import LAST_WRITE_COOKIE, get_write_lsn, parse_lsn
+
+
 class SQLAlchemySessionManager:
     """
     Create a session for every request and close it when the request ends.
+
+    Sessions of reads are bound to a replica chosen by the router, when there is an eligible one. Writes, and
+    validators run with them, use the primary. A client whose request committed changes gets a cookie with WAL
+    position of its write, so it reads its own writes from the primary until replicas replay them. The cookie
+    is marked secure only on HTTPS, clients would not send it back over plain HTTP otherwise.
     """
 
-    def __init__(self, Session):
+    read_methods = ('GET', 'HEAD')
+
+    def __init__(self, Session, router=None):
+        """
+        Args:
+            Session (sqlalchemy.orm.session.sessionmaker): Session factory bound to the primary
+            router (core.db.replicas.ReplicaRouter|None): Router of reads to replicas
+        """
         self.db_session = Session
+        self.router = router
 
     def process_resource(self, req, resp, resource, params):
         if req.method == 'OPTIONS':
             return
 
-        req.context['db_session'] = self.db_session()
+        req.context['db_session'] = self.create_session(req)
+
+    def create_session(self, req):
+        """
+        Create session bound to a replica for reads, or to the primary.
+
+        Args:
+            req (falcon.request.Request): Request object
+
+        Returns:
+            (Session): DB Session object, `info['replica']` is set when it is bound to a replica
+        """
+        if self.router is None or not self.router.enabled or req.method not in self.read_methods:
+            return self.db_session()
+
+        last_write_lsn = req.cookies.get(LAST_WRITE_COOKIE)
+        engine = self.router.get_engine(min_lsn=parse_lsn(last_write_lsn))
+        if engine is None:
+            return self.db_session()
+
+        return self.db_session(bind=engine, info={'replica': True})
 
     def process_response(self, req, resp, resource, req_succeeded):
         if req.method == 'OPTIONS':
             return
 
         if hasattr(req.context, 'db_session'):
+            db_session = req.context.db_session
             if not req_succeeded:
-                req.context.db_session.rollback()
-            req.context.db_session.close()
+                db_session.rollback()
+            elif self.router is not None and self.router.enabled and db_session.info.get('committed_writes'):
+                resp.set_cookie(
+                    LAST_WRITE_COOKIE,
+                    get_write_lsn(db_session),
+                    max_age=self.router.recent_writer_ttl,
+                    path='/',
+                    secure=req.scheme == 'https',
+                )
+            db_session.close()
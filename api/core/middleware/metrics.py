@@ -0,0 +1,24 @@
+import time
+
+from core.metrics import REQUEST_DURATION, REQUESTS
+
+
+class MetricsMiddleware:
+    """
+    Measure duration of every request, along with other middleware, by route template, method and API version.
+
+    It has to be the first middleware, so it sees the whole request.
+    """
+
+    def process_request(self, req, resp):
+        req.context['request_start_time'] = time.perf_counter()
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        duration = time.perf_counter() - req.context['request_start_time']
+
+        # Unmatched paths are not labelled one by one, so scanners cannot inflate cardinality
+        route = req.uri_template or 'unmatched'
+        version = req.context.get('api_version', '')
+
+        REQUEST_DURATION.labels(route, req.method, version).observe(duration)
+        REQUESTS.labels(route, req.method, version, resp.status[:3]).inc()
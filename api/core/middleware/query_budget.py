@@ -0,0 +1,37 @@
+from core.query_budget import check_budget, current_statements
+from settings import QUERY_BUDGET
+
+
+class QueryBudgetMiddleware:
+    """
+    Count SQL statements of requests and warn about or fail the ones which exceed budget of their route, in
+    development and tests (QUERY_BUDGET['mode']).
+
+    Budgets are taken from `query_budgets` of the resource, a dict of lowercase HTTP method names to maximum
+    numbers of statements, or to functions of the resource and request returning them when the number depends
+    on the request. Statements of all sessions are counted, including the ones opened by validators.
+    """
+
+    def process_resource(self, req, resp, resource, params):
+        if not QUERY_BUDGET['mode']:
+            return
+
+        budget = getattr(resource, 'query_budgets', {}).get(req.method.lower())
+        if budget is None:
+            return
+
+        if callable(budget):
+            budget = budget(resource, req)
+
+        req.context['query_budget'] = budget
+        req.context['statements_token'] = current_statements.set([])
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        token = req.context.get('statements_token')
+        if token is None:
+            return
+
+        statements = current_statements.get()
+        current_statements.reset(token)
+
+        check_budget(f'{req.method} {req.uri_template}', req.context['query_budget'], statements)
@@ -3,7 +3,17 @@ import falcon
 
 class RequireJSON:
 
+    def __init__(self, exempt_paths=()):
+        """
+        Args:
+            exempt_paths (tuple): Paths of resources with other media types, e.g. metrics
+        """
+        self.exempt_paths = exempt_paths
+
     def process_request(self, req, resp):
+        if req.path in self.exempt_paths:
+            return
+
         if not req.client_accepts_json:
             raise falcon.HTTPNotAcceptable(
                 'This API only supports responses encoded as JSON.',
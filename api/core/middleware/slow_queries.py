@@ -0,0 +1,16 @@
+from core.slow_queries import current_route, slow_query_recorder
+
+
+class SlowQueryLogMiddleware:
+    """
+    Let slow query records tell which route has executed the statement.
+    """
+
+    def process_resource(self, req, resp, resource, params):
+        if slow_query_recorder.enabled:
+            req.context['route_token'] = current_route.set(f'{req.method} {req.uri_template}')
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        token = req.context.get('route_token')
+        if token is not None:
+            current_route.reset(token)
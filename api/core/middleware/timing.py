@@ -0,0 +1,29 @@
+from core.timing import RequestTiming, current_timing, measure
+from settings import SERVER_TIMING
+
+
+class ServerTimingMiddleware:
+    """
+    Report wall time of request phases and DB cost of the request in `Server-Timing` header, when it is enabled.
+
+    Phases are measured by `core.timing.measure`, e.g. version check, body parsing and validation, building
+    response data and encoding it. Response media is encoded here, so the encoding is measured as well.
+    """
+
+    def process_request(self, req, resp):
+        if not SERVER_TIMING['enabled']:
+            return
+
+        req.context['timing_token'] = current_timing.set(RequestTiming())
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        token = req.context.get('timing_token')
+        if token is None:
+            return
+
+        with measure('serialization'):
+            # Serialized media is kept by the response, it is not encoded again when the body is sent
+            resp.data
+
+        resp.set_header('Server-Timing', current_timing.get().get_header())
+        current_timing.reset(token)
@@ -1,5 +1,6 @@
 from falcon import HTTPNotFound
 
+from core.timing import measure
 from core.utils import api_version_to_float
 from settings import API_VERSIONS
 
@@ -14,12 +15,13 @@ class VersionMiddleware:
         if req.method == 'OPTIONS' or 'api_version' not in params:
             return
 
-        version = params.pop('api_version')
-        if version not in API_VERSIONS['available']:
-            raise HTTPNotFound(
-                title='Unsupported version',
-                description=f'Provided version number: {version} is not supported'
-            )
+        with measure('version'):
+            version = params.pop('api_version')
+            if version not in API_VERSIONS['available']:
+                raise HTTPNotFound(
+                    title='Unsupported version',
+                    description=f'Provided version number: {version} is not supported'
+                )
 
-        req.context['api_version'] = version
-        req.context['version'] = api_version_to_float(version)
+            req.context['api_version'] = version
+            req.context['version'] = api_version_to_float(version)
@@ -0,0 +1,109 @@
+from collections import namedtuple
+from itertools import chain
+
+from sqlalchemy import Text, case, cast, func
+from sqlalchemy.orm import Bundle
+
+from core.responses import compile_converter
+
+
+class ComputedField(namedtuple('ComputedField', ('function', 'sources', 'expression'))):
+    """
+    Response field derived from selected columns, e.g. `name` of a User.
+
+    Attributes:
+        function (callable): Called with values of `sources` columns, returns field value
+        sources (tuple): Keys of columns passed to `function`
+        expression (sqlalchemy.sql.elements.ColumnElement): SQL equivalent of `function`, used when response
+            is built in database
+    """
+
+
+def enum_name_expression(enum, column):
+    """
+    Build SQL equivalent of `BaseEnum.get_name_by_value`.
+
+    Args:
+        enum (core.enums.BaseEnum): Enum class
+        column (sqlalchemy.sql.elements.ColumnElement): Column with enum values
+
+    Returns:
+        (sqlalchemy.sql.elements.Case): Name of enum member
+    """
+    return case({item.value: item.name for item in enum}, value=column)
+
+
+class Projection:
+    """
+    Response fields of a collection read as plain column tuples instead of ORM instances.
+
+    Only columns needed by response keys are selected, so rows are neither hydrated into model instances nor
+    added to the identity map. Computed fields are derived from them while rows are converted to dicts by
+    functions generated for the keys, see `core.responses.compile_converter`.
+
+    JSON projection selects every row already serialized by `json_build_object` instead, along with its ID.
+
+    Attributes:
+        convert_row_to_dict (callable|None): Creates dict with response fields of a single row
+        convert_rows_to_dicts (callable|None): Creates dicts with response fields of rows, both are None for
+            JSON projection
+    """
+
+    def __init__(self, name, keys, columns, computed_fields, as_json=False):
+        """
+        Args:
+            name (str): Name of the bundle of selected columns
+            keys (tuple): Response keys
+            columns (dict): Column expressions by key, `id` is always selected since cursor pagination needs it
+            computed_fields (dict): ComputedField by key
+            as_json (bool): Indicates whether to select rows serialized to JSON
+        """
+        self.keys = keys
+        self.as_json = as_json
+
+        if as_json:
+            self.json = func.json_build_object(*chain.from_iterable(
+                (key, computed_fields[key].expression if key in computed_fields else columns[key]) for key in keys
+            ))
+            self.bundle = Bundle(
+                name, columns['id'].label('id'), cast(self.json, Text).label('json'), single_entity=True
+            )
+            self.convert_row_to_dict = self.convert_rows_to_dicts = None
+            return
+
+        selected = ['id']
+        for key in keys:
+            sources = computed_fields[key].sources if key in computed_fields else (key, )
+            selected.extend(source for source in sources if source not in selected)
+
+        positions = {key: position for position, key in enumerate(selected)}
+
+        # Single entity bundle is returned as is by queries selecting nothing else, just like model instances
+        self.bundle = Bundle(name, *[columns[key].label(key) for key in selected], single_entity=True)
+        self.convert_row_to_dict, self.convert_rows_to_dicts = compile_converter(keys, computed_fields, positions)
+
+    def fetch_json(self, db_session, *criteria):
+        """
+        Fetch single object serialized by JSON projection.
+
+        Args:
+            db_session (Session): DB Session object
+            *criteria: Filters selecting the object
+
+        Returns:
+            (str|None): Object as JSON or None if it does not exist
+        """
+        return db_session.query(cast(self.json, Text)).filter(*criteria).scalar()
+
+    @staticmethod
+    def convert_rows_to_json(rows):
+        """
+        Join rows of JSON projection into JSON array.
+
+        Args:
+            rows (list): Rows of the bundle, ID followed by JSON
+
+        Returns:
+            (str): JSON array of objects
+        """
+        return '[' + ','.join([row[1] for row in rows]) + ']'
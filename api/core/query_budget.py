@@ -0,0 +1,96 @@
+import logging
+import os
+import traceback
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from settings import QUERY_BUDGET
+
+
+logger = logging.getLogger(__name__)
+
+# Statements of the request being processed, None outside of a request with a budget
+current_statements = ContextVar('current_statements', default=None)
+
+# Frames of the API itself are shown in stacks of statements, frames of libraries only add noise
+API_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Request executed more SQL statements than its route allows.
+    """
+
+
+def get_statement_stack():
+    """
+    Get frames of the API code which has executed a statement.
+
+    Returns:
+        (list): Stack summary of API frames, or of all frames if none of them belongs to the API
+    """
+    stack = traceback.extract_stack()[:-1]
+    api_frames = [
+        frame for frame in stack
+        if frame.filename.startswith(API_DIRECTORY) and frame.filename != __file__ and '/tests/' not in frame.filename
+    ]
+
+    return api_frames or stack
+
+
+def format_budget_report(route, budget, statements):
+    """
+    Describe request which exceeded its budget, statements repeated with different parameters are reported as
+    possible N+1 queries first.
+
+    Args:
+        route (str): Method and route template
+        budget (int): Maximum number of statements
+        statements (list): Statements with stacks of their execution
+
+    Returns:
+        (str): Report
+    """
+    lines = [f'{route} executed {len(statements)} SQL statements, its budget is {budget}']
+
+    repeated = [(statement, count) for statement, count in Counter(s for s, _ in statements).items() if count > 1]
+    for statement, count in repeated:
+        lines.append(f'\nPossible N+1, executed {count} times:\n{statement}')
+
+    for number, (statement, stack) in enumerate(statements, start=1):
+        lines.append(f'\n{number}. {statement}\n' + ''.join(traceback.format_list(stack)))
+
+    return '\n'.join(lines)
+
+
+def check_budget(route, budget, statements, mode=None):
+    """
+    Warn about or fail a request which exceeded its budget.
+
+    Args:
+        route (str): Method and route template
+        budget (int): Maximum number of statements
+        statements (list): Statements with stacks of their execution
+        mode (str|None): 'warn' or 'raise', QUERY_BUDGET['mode'] is used when it is not given
+
+    Raises:
+        QueryBudgetExceeded: If budget is exceeded in 'raise' mode
+    """
+    if len(statements) <= budget:
+        return
+
+    report = format_budget_report(route, budget, statements)
+    if (mode or QUERY_BUDGET['mode']) == 'raise':
+        raise QueryBudgetExceeded(report)
+
+    logger.warning(report)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def collect_statement(conn, cursor, statement, parameters, context, executemany):
+    statements = current_statements.get()
+    if statements is not None:
+        statements.append((statement, get_statement_stack()))
@@ -0,0 +1,194 @@
+from core.enums import BaseEnum
+from core.utils import api_version_to_float
+from settings import API_VERSIONS
+
+
+# Kinds of responses, items of a collection and details of a single instance
+LIST = 'list'
+DETAIL = 'detail'
+
+
+def get_enum_names(function):
+    """
+    Get names of enum members by their values, if function is `BaseEnum.get_name_by_value` of an enum.
+
+    Args:
+        function (callable): Function of a computed field
+
+    Returns:
+        (dict|None): Names by values, None if function is not an enum name lookup
+    """
+    enum = getattr(function, '__self__', None)
+    if not (isinstance(enum, type) and issubclass(enum, BaseEnum)):
+        return None
+
+    if getattr(function, '__func__', None) is not BaseEnum.get_name_by_value.__func__:
+        return None
+
+    return {item.value: item.name for item in enum}
+
+
+def compile_converter(keys, computed_fields, positions=None):
+    """
+    Generate functions creating dicts with response fields, specialised for given keys.
+
+    Generated code reads every field directly, instead of looking keys up per field and object. Fields are read
+    as attributes of objects, e.g. model instances, or from rows of a projection when `positions` are given.
+    Computed fields call their function with values of their sources, enum names are read from precomputed
+    tables instead of creating enum members.
+
+    Args:
+        keys (tuple): Response keys
+        computed_fields (dict): ComputedField by key, see `core.projection.ComputedField`
+        positions (dict|None): Positions of row columns by key
+
+    Returns:
+        (tuple): Function converting an object to dict and function converting list of objects to list of dicts
+
+    Raises:
+        ValueError: If a field cannot be read as an attribute
+    """
+    def read(source):
+        if positions is not None:
+            return f'item[{positions[source]}]'
+
+        if not source.isidentifier():
+            raise ValueError(f'Response field {source} is not a valid attribute name')
+
+        return f'item.{source}'
+
+    namespace = {}
+    fields = []
+
+    for number, key in enumerate(keys):
+        computed_field = computed_fields.get(key)
+
+        if computed_field is None:
+            value = read(key)
+        elif len(computed_field.sources) == 1 and get_enum_names(computed_field.function) is not None:
+            namespace[f'names_{number}'] = get_enum_names(computed_field.function)
+            value = f'names_{number}[{read(computed_field.sources[0])}]'
+        else:
+            namespace[f'function_{number}'] = computed_field.function
+            value = f'function_{number}({", ".join(read(source) for source in computed_field.sources)})'
+
+        fields.append(f'{key!r}: {value}')
+
+    body = '{' + ', '.join(fields) + '}'
+    source = (
+        f'def convert(item):\n    return {body}\n\n'
+        f'def convert_all(items):\n    return [{body} for item in items]\n'
+    )
+    exec(compile(source, f'<response fields {", ".join(keys)}>', 'exec'), namespace)
+
+    return namespace['convert'], namespace['convert_all']
+
+
+class ResponseSerializer:
+    """
+    Response fields of a resource in a single API version.
+
+    Attributes:
+        keys (tuple): Response keys
+        convert_object (callable): Creates dict with response fields of an object
+        convert_objects (callable): Creates list of dicts with response fields of objects
+    """
+
+    def __init__(self, keys, computed_fields):
+        """
+        Args:
+            keys (tuple): Response keys, attribute names of objects or keys of `computed_fields`
+            computed_fields (dict): ComputedField by key
+        """
+        self.keys = keys
+        self.convert_object, self.convert_objects = compile_converter(keys, computed_fields)
+
+
+class ResponseRegistry:
+    """
+    Response serializers by resource, API version and kind of response, generated when resources are defined.
+
+    Resources declare response keys only in versions which changed them, other versions use keys of the closest
+    lower declared version. New API version thus only needs to declare its keys, if it changes any.
+    """
+
+    def __init__(self, versions):
+        """
+        Args:
+            versions (list): Available API versions, e.g. ['v1', 'v2']
+        """
+        self.versions = sorted(api_version_to_float(version) for version in versions)
+        self.serializers = {}
+
+    def register(self, resource, kind, fields, computed_fields):
+        """
+        Generate serializers of a resource for every available API version.
+
+        Args:
+            resource (type): Resource class
+            kind (str): LIST or DETAIL
+            fields (dict): Response keys by API version which declared them, e.g. {'v1': ('id', 'name')}
+            computed_fields (dict): ComputedField by key
+
+        Raises:
+            ValueError: If keys of the first available version are not declared
+        """
+        declared = sorted((api_version_to_float(version), keys) for version, keys in fields.items())
+        if not declared or declared[0][0] > self.versions[0]:
+            raise ValueError(f'Response fields of {resource.__name__} are not declared for the first API version')
+
+        serializers = {}
+        for version in self.versions:
+            keys = [keys for declared_version, keys in declared if declared_version <= version][-1]
+            if keys not in serializers:
+                serializers[keys] = ResponseSerializer(keys, computed_fields)
+
+            self.serializers[resource, version, kind] = serializers[keys]
+
+    def is_registered(self, resource, kind):
+        """
+        Tell whether serializers of a resource are registered.
+
+        Args:
+            resource (type): Resource class
+            kind (str): LIST or DETAIL
+
+        Returns:
+            (bool): True if serializers are registered
+        """
+        return (resource, self.versions[0], kind) in self.serializers
+
+    def get(self, resource, version, kind):
+        """
+        Get serializer of a resource.
+
+        Args:
+            resource (type): Resource class
+            version (float|None): Current API version, the first one is used when it is not known
+            kind (str): LIST or DETAIL
+
+        Returns:
+            (ResponseSerializer): Serializer
+        """
+        return self.serializers[resource, version or self.versions[0], kind]
+
+
+response_serializers = ResponseRegistry(API_VERSIONS['available'])
+
+
+def serialize_responses(kind):
+    """
+    Class decorator registering response serializers of a resource, built from its `response_fields` and
+    `computed_fields`.
+
+    Args:
+        kind (str): LIST or DETAIL
+
+    Returns:
+        (callable): Decorator
+    """
+    def decorator(resource):
+        response_serializers.register(resource, kind, resource.response_fields, resource.computed_fields)
+        return resource
+
+    return decorator
@@ -0,0 +1,377 @@
+import hashlib
+import logging
+import os
+import pickle
+import select
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from core.db.engine import engine
+from settings import RESULT_CACHE
+
+
+logger = logging.getLogger(__name__)
+
+# Channel notified by `table_versions_bump` trigger on commit
+TABLE_VERSIONS_CHANNEL = 'table_versions'
+
+
+class MemoryResultBackend:
+    """
+    In-process LRU store of results, every worker has its own.
+    """
+
+    def __init__(self, max_size=1024, **kwargs):
+        """
+        Args:
+            max_size (int): Maximum number of entries
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Get stored result.
+
+        Args:
+            key (tuple): Table name, table version and digest of the query
+
+        Returns:
+            Result or None if it is not stored
+        """
+        with self.lock:
+            result = self.entries.get(key)
+            if result is not None:
+                self.entries.move_to_end(key)
+
+            return result
+
+    def set(self, key, result):
+        """
+        Store result, the least recently used one is evicted when the store is full.
+
+        Args:
+            key (tuple): Table name, table version and digest of the query
+            result: Picklable result
+        """
+        with self.lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, table_name, version):
+        """
+        Remove results of other than current version of a table.
+
+        Args:
+            table_name (str): Table name
+            version (int): Current version of the table
+        """
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == table_name and key[1] != version]:
+                del self.entries[key]
+
+
+class FileResultBackend:
+    """
+    Store of results in files shared by all workers of a host, e.g. placed in `/dev/shm`.
+
+    Results are pickled, so the directory must be writable only by the API. Files of stale versions are removed
+    when a table changes, the oldest written files are evicted when there are more than `max_size` of them, so
+    results of distinct queries do not fill memory while tables are not written.
+    """
+
+    def __init__(self, directory, max_size=1024, **kwargs):
+        """
+        Args:
+            directory (str): Directory with stored results, created if it does not exist
+            max_size (int): Maximum number of entries of all workers
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, key):
+        """
+        Get path of result file, table name and version prefix lets workers drop stale results.
+
+        Args:
+            key (tuple): Table name, table version and digest of the query
+
+        Returns:
+            (str): File path
+        """
+        return os.path.join(self.directory, '{}-{}-{}.pickle'.format(*key))
+
+    def get(self, key):
+        """
+        Get stored result.
+
+        Args:
+            key (tuple): Table name, table version and digest of the query
+
+        Returns:
+            Result or None if it is not stored
+        """
+        try:
+            with open(self.get_path(key), 'rb') as result_file:
+                return pickle.load(result_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def set(self, key, result):
+        """
+        Store result, file is replaced atomically so other workers never read a partial one.
+
+        Args:
+            key (tuple): Table name, table version and digest of the query
+            result: Picklable result
+        """
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as result_file:
+                pickle.dump(result, result_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self.get_path(key))
+        except OSError:
+            logger.exception('Result cache entry could not be stored')
+            if os.path.exists(temporary_path):
+                os.unlink(temporary_path)
+            return
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the oldest written results while there are more than `max_size` of them, workers may evict the same
+        files at once, so missing files are fine.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.pickle'):
+                continue
+
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                pass
+
+        if len(entries) <= self.max_size:
+            return
+
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_size]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def invalidate(self, table_name, version):
+        """
+        Remove results of other than current version of a table, every worker does it, so missing files are fine.
+
+        Args:
+            table_name (str): Table name
+            version (int): Current version of the table
+        """
+        current_prefix = f'{table_name}-{version}-'
+
+        for name in os.listdir(self.directory):
+            if name.startswith(f'{table_name}-') and not name.startswith(current_prefix):
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+
+RESULT_BACKENDS = {
+    'memory': MemoryResultBackend,
+    'file': FileResultBackend,
+}
+
+
+class TableVersionListener:
+    """
+    Keep versions of tables up to date in a worker, listening to notifications sent by `table_versions_bump`
+    trigger on commit.
+
+    Listening thread is started on first use in every process, so it survives forking of workers. Versions are
+    reported as unknown while the listening connection is down, since notifications may have been missed then.
+    """
+
+    reconnect_delay = 1
+    poll_timeout = 5
+
+    def __init__(self, on_change):
+        """
+        Args:
+            on_change (callable): Called with table name and its new version
+        """
+        self.on_change = on_change
+        self.versions = {}
+        # Versions of shards of table version counters, see `core.db.versions`
+        self.shard_versions = {}
+        self.connected = False
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def get_version(self, table_name):
+        """
+        Get current version of a table.
+
+        Args:
+            table_name (str): Table name
+
+        Returns:
+            (int|None): Table version or None if it is not known
+        """
+        self.ensure_started()
+
+        if not self.connected:
+            return None
+
+        return self.versions.get(table_name, 0)
+
+    def ensure_started(self):
+        if self.pid == os.getpid():
+            return
+
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+
+            self.pid = os.getpid()
+            self.connected = False
+            threading.Thread(target=self.run, name='table-version-listener', daemon=True).start()
+
+    def run(self):
+        while True:
+            try:
+                self.listen()
+            except (psycopg2.Error, OSError):
+                logger.exception('Listening to table versions failed')
+
+            self.connected = False
+            time.sleep(self.reconnect_delay)
+
+    def listen(self):
+        connection = psycopg2.connect(
+            **engine.url.translate_connect_args(username='user', database='dbname')
+        )
+        connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+
+        try:
+            with connection.cursor() as cursor:
+                # Versions are read after LISTEN, so no change can be missed in between
+                cursor.execute(f'LISTEN {TABLE_VERSIONS_CHANNEL}')
+                cursor.execute('SELECT table_name, shard, version FROM table_versions')
+                for table_name, shard, version in cursor.fetchall():
+                    self.handle_change(table_name, shard, version)
+
+            self.connected = True
+
+            while True:
+                if not select.select([connection], [], [], self.poll_timeout)[0]:
+                    continue
+
+                connection.poll()
+                while connection.notifies:
+                    table_name, shard, version = connection.notifies.pop(0).payload.split(' ')
+                    self.handle_change(table_name, int(shard), int(version))
+        finally:
+            connection.close()
+
+    def handle_change(self, table_name, shard, version):
+        """
+        Store new version of a table shard and let cache drop results of previous table versions.
+
+        Notifications of a shard arrive in commit order, versions read when listening starts may be older than
+        notifications received meanwhile, so only newer versions of a shard are stored.
+
+        Args:
+            table_name (str): Table name
+            shard (int): Shard of table version counter
+            version (int): Shard version
+        """
+        shards = self.shard_versions.setdefault(table_name, {})
+        if shards.get(shard, 0) >= version:
+            return
+
+        shards[shard] = version
+        self.versions[table_name] = sum(shards.values())
+        self.on_change(table_name, self.versions[table_name])
+
+
+class ResultCache:
+    """
+    Cache of collection query results shared by identical requests, see `BaseSortingAPI.get_objects`.
+
+    Keys contain version of the queried table, so a result computed before a write is never served after the
+    worker gets to know about it, which takes milliseconds thanks to LISTEN/NOTIFY. Stale entries are dropped
+    by the backend at the same time.
+    """
+
+    def __init__(self, backend=None, **options):
+        """
+        Args:
+            backend (str|None): Name of backend in RESULT_BACKENDS, None disables the cache
+            **options: Keyword arguments of backend class
+        """
+        self.backend = RESULT_BACKENDS[backend](**options) if backend else None
+        self.listener = TableVersionListener(self.invalidate)
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def get_key(self, table_name, query):
+        """
+        Build key of a query result.
+
+        Args:
+            table_name (str): Queried table
+            query (tuple): Normalized description of the query, e.g. resource, response keys and parameters
+
+        Returns:
+            (tuple|None): Key or None if current table version is not known and result must not be cached
+        """
+        version = self.listener.get_version(table_name)
+        if version is None:
+            return None
+
+        return table_name, version, hashlib.sha1(repr(query).encode()).hexdigest()
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, result):
+        self.backend.set(key, result)
+
+    def invalidate(self, table_name, version):
+        self.backend.invalidate(table_name, version)
+
+
+def normalize_params(params):
+    """
+    Normalize query parameters, so identical queries have identical keys regardless of parameters order.
+
+    Args:
+        params (dict): Query parameters
+
+    Returns:
+        (tuple): Sorted parameters with lists converted to tuples, missing ones are omitted
+    """
+    return tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in params.items() if value is not None
+    ))
+
+
+result_cache = ResultCache(**RESULT_CACHE)
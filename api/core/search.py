@@ -0,0 +1,117 @@
+import re
+from collections import namedtuple
+
+from sqlalchemy import false, func
+from sqlalchemy.dialects.postgresql import REAL
+from sqlalchemy.types import Integer
+
+from core.enums import SearchIndex
+
+
+# Text search configuration used by `search_vector` columns, names and emails should not be stemmed
+FULLTEXT_CONFIG = 'simple'
+
+# Greatest value of PostgreSQL INTEGER column
+MAX_INTEGER = 2 ** 31 - 1
+
+
+class SearchField(namedtuple('SearchField', ('expression', 'index', 'terms'))):
+    """
+    Searchable expression of a resource.
+
+    Attributes:
+        expression (sqlalchemy.sql.elements.ColumnElement): Searched expression, indexed exactly as it is searched.
+            Expressions with `SearchIndex.PATTERN` index have to be lower-cased, e.g. `func.lower(User.email)`
+        index (SearchIndex): Kind of index serving the expression, it determines the predicate
+        terms (tuple): SearchTerm values which are matched against the expression
+    """
+
+
+def escape_like(value):
+    """
+    Escape LIKE wildcards, so value is matched literally.
+
+    Args:
+        value (str): Value to escape
+
+    Returns:
+        (str): Escaped value, `\\` is the escape character
+    """
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def search_field_filter(field, search_term):
+    """
+    Build the narrowest predicate matching search term which can be served by the index of given field.
+
+    - `SearchIndex.BTREE` - equality
+    - `SearchIndex.PATTERN` - case insensitive prefix match, index has to use `text_pattern_ops` operator class
+    - `SearchIndex.TRIGRAM` - case insensitive substring match, index has to use `gin_trgm_ops` operator class
+
+    Args:
+        field (SearchField): Searchable field
+        search_term (str): Search term
+
+    Returns:
+        (sqlalchemy.sql.elements.ColumnElement): Filter to be applied
+    """
+    expression = field.expression
+
+    if field.index == SearchIndex.BTREE:
+        if isinstance(expression.type, Integer):
+            search_term = int(search_term)
+            if search_term > MAX_INTEGER:
+                return false()
+
+        return expression == search_term
+
+    if field.index == SearchIndex.PATTERN:
+        return expression.like(f'{escape_like(search_term.lower())}%', escape='\\')
+
+    return expression.ilike(f'%{search_term}%')
+
+
+def fulltext_search_query(search_terms):
+    """
+    Build text search query requiring every word of search terms, each word is matched as a prefix.
+
+    Args:
+        search_terms (list): Search terms, e.g. ['John McClane']
+
+    Returns:
+        (sqlalchemy.sql.functions.Function): `tsquery` expression or None if search terms contain no words
+    """
+    words = [word for search_term in search_terms for word in re.findall(r'\w+', search_term.lower())]
+
+    if not words:
+        return None
+
+    return func.to_tsquery(FULLTEXT_CONFIG, ' & '.join(f'{word}:*' for word in words))
+
+
+def fulltext_search_filter(search_vector, query):
+    """
+    Build filter matching `tsvector` column against text search query, served by GIN index on the column.
+
+    Args:
+        search_vector (sqlalchemy.Column): `tsvector` column
+        query (sqlalchemy.sql.functions.Function): `tsquery` expression
+
+    Returns:
+        (sqlalchemy.sql.elements.BinaryExpression): Filter to be applied
+    """
+    return search_vector.op('@@')(query)
+
+
+def fulltext_search_rank(search_vector, query):
+    """
+    Build relevance of `tsvector` column for text search query.
+
+    Args:
+        search_vector (sqlalchemy.Column): `tsvector` column
+        query (sqlalchemy.sql.functions.Function): `tsquery` expression
+
+    Returns:
+        (sqlalchemy.sql.functions.Function): `ts_rank` expression
+    """
+    return func.ts_rank(search_vector, query, type_=REAL)
@@ -1,6 +1,8 @@
 from marshmallow import fields, validate, validates_schema, Schema
 from marshmallow.exceptions import ValidationError
 
+from core.enums import CountStrategy, ExportFormat, PaginationMode, SearchMode
+
 
 class BaseSchema(Schema):
     class Meta:
@@ -29,6 +31,11 @@ class BaseSearchSortGetRequestSchema(BaseSchema):
         required=False,
         missing=[]
     )
+    search_mode = fields.Str(
+        missing=SearchMode.SUBSTRING.value,
+        required=False,
+        validate=validate.OneOf(SearchMode.values())
+    )
     sorting = fields.Str(required=False)
 
 
@@ -43,3 +50,21 @@ class BasePaginatedRequestSchema(BaseSchema):
         required=False,
         validate=validate.Range(min=0)
     )
+    pagination = fields.Str(
+        missing=PaginationMode.OFFSET.value,
+        required=False,
+        validate=validate.OneOf(PaginationMode.values())
+    )
+    cursor = fields.Str(required=False)
+    count = fields.Str(
+        required=False,
+        validate=validate.OneOf(CountStrategy.values())
+    )
+
+
+class BaseExportRequestSchema(BaseSearchSortGetRequestSchema):
+    format = fields.Str(
+        missing=ExportFormat.NDJSON.value,
+        required=False,
+        validate=validate.OneOf(ExportFormat.values())
+    )
@@ -0,0 +1,273 @@
+from collections.abc import Mapping
+
+from marshmallow import RAISE, fields, missing, validate
+from marshmallow.decorators import VALIDATES_SCHEMA
+from marshmallow.exceptions import ValidationError
+from marshmallow.validate import Validator
+
+
+# Schema validators which can never fail when unknown fields raise errors, see `StrictSchema.check_unknown_fields`
+REDUNDANT_SCHEMA_VALIDATORS = {(VALIDATES_SCHEMA, False): ['check_unknown_fields']}
+
+# Compiled schemas by schema class, see `compile_schema`
+compiled_schemas = {}
+
+
+def get_fast_deserializer(field):
+    """
+    Get function coercing the common valid input of a field, e.g. text of a query string parameter to int.
+
+    Args:
+        field (marshmallow.fields.Field): Schema field
+
+    Returns:
+        (callable|None): Function returning coerced value or `missing` when input has to be deserialized by the
+            field itself, None if field type is not specialised
+    """
+    field_type = type(field)
+
+    if field_type in (fields.String, fields.Email):
+        return lambda value: value if type(value) is str else missing
+
+    if field_type is fields.Integer and not field.strict:
+        def deserialize_integer(value):
+            if type(value) is int:
+                return value
+            if type(value) is str:
+                try:
+                    return int(value)
+                except ValueError:
+                    return missing
+            return missing
+
+        return deserialize_integer
+
+    inner = getattr(field, 'inner', None)
+    if field_type is fields.List and type(inner) is fields.String and not inner.validators:
+        def deserialize_string_list(value):
+            if type(value) is list:
+                for item in value:
+                    if type(item) is not str:
+                        return missing
+                return list(value)
+            return missing
+
+        return deserialize_string_list
+
+    return None
+
+
+def get_fast_check(validator):
+    """
+    Get predicate telling that a value passes a validator, without building error messages.
+
+    Args:
+        validator (callable): Field validator
+
+    Returns:
+        (callable|None): Predicate, None if validator is not specialised and has to be called
+    """
+    validator_type = type(validator)
+
+    if validator_type is validate.Length:
+        if validator.equal is not None:
+            equal = validator.equal
+            return lambda value: len(value) == equal
+
+        lowest = validator.min if validator.min is not None else 0
+        if validator.max is None:
+            return lambda value: len(value) >= lowest
+
+        highest = validator.max
+        return lambda value: lowest <= len(value) <= highest
+
+    if validator_type is validate.Range:
+        lowest, min_inclusive = validator.min, validator.min_inclusive
+        highest, max_inclusive = validator.max, validator.max_inclusive
+
+        def check_range(value):
+            if lowest is not None and (value < lowest if min_inclusive else value <= lowest):
+                return False
+            return highest is None or (value <= highest if max_inclusive else value < highest)
+
+        return check_range
+
+    if validator_type is validate.OneOf:
+        choices = validator.choices
+        try:
+            choices = frozenset(choices)
+        except TypeError:
+            pass
+
+        def check_choice(value):
+            try:
+                return value in choices
+            except TypeError:
+                return False
+
+        return check_choice
+
+    return None
+
+
+class CompiledField:
+    """
+    Loader of a single field, behaving exactly like `marshmallow.fields.Field.deserialize`.
+
+    Common valid input is coerced and checked by functions specialised for the field type and its validators,
+    which build no error messages. Anything else, e.g. invalid or null input, is passed to the field itself, so
+    error messages are always the ones of marshmallow.
+    """
+
+    def __init__(self, name, field):
+        """
+        Args:
+            name (str): Key of the field in input data
+            field (marshmallow.fields.Field): Schema field
+        """
+        self.name = name
+        self.field = field
+        self.deserialize_fast = get_fast_deserializer(field)
+        self.validators = tuple((get_fast_check(validator), validator) for validator in field.validators)
+        self.validator_failed = field.error_messages['validator_failed']
+
+    def load(self, value, data):
+        """
+        Deserialize and validate value of the field.
+
+        Args:
+            value: Input value, `missing` if data does not contain the field
+            data (Mapping): Whole input data
+
+        Returns:
+            Deserialized value or `missing` if field should be left out
+
+        Raises:
+            ValidationError: If value is not valid
+        """
+        if value is missing or self.deserialize_fast is None:
+            return self.field.deserialize(value, self.name, data, partial=False)
+
+        output = self.deserialize_fast(value)
+        if output is missing:
+            return self.field.deserialize(value, self.name, data, partial=False)
+
+        self.validate(output)
+        return output
+
+    def validate(self, value):
+        """
+        Run validators of the field, like `marshmallow.fields.Field._validate` does.
+
+        Args:
+            value: Deserialized value
+
+        Raises:
+            ValidationError: With messages of all failed validators
+        """
+        errors = []
+        for check, validator in self.validators:
+            if check is not None and check(value):
+                continue
+
+            try:
+                result = validator(value)
+                if result is False and not isinstance(validator, Validator):
+                    raise ValidationError(self.validator_failed)
+            except ValidationError as err:
+                if isinstance(err.messages, dict):
+                    errors.append(err.messages)
+                else:
+                    errors.extend(err.messages)
+
+        if errors:
+            raise ValidationError(errors)
+
+
+class CompiledSchemaMixin:
+    """
+    Schema loading data with fields compiled once, when the schema is created, see `compile_schema`.
+
+    Loaded data and error messages are the same as of `Schema.load`, which is still used for loads this layer
+    does not cover, i.e. `many` or `partial` loads and schemas with processors, field validators or schema
+    validators which may fail.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.compiled_fields = tuple(
+            (CompiledField(field.data_key or name, field), field.attribute or name)
+            for name, field in self.load_fields.items()
+        )
+        self.field_keys = {loader.name for loader, _ in self.compiled_fields}
+        self.hooks = {tag: names for tag, names in self._hooks.items() if names}
+        self.compiled = not self.many and not self.partial and all('.' not in key for _, key in self.compiled_fields)
+
+    def load(self, data, *, many=None, partial=None, unknown=None):
+        """
+        Deserialize data, see `marshmallow.Schema.load`.
+
+        Raises:
+            ValidationError: If data is not valid
+        """
+        unknown = unknown or self.unknown
+        if not self.compiled or many or partial or not self.can_load_compiled(unknown):
+            return super().load(data, many=many, partial=partial, unknown=unknown)
+
+        result = self.dict_class()
+        errors = {}
+
+        if not isinstance(data, Mapping):
+            errors['_schema'] = [self.error_messages['type']]
+        else:
+            for loader, key in self.compiled_fields:
+                try:
+                    value = loader.load(data.get(loader.name, missing), data)
+                except ValidationError as err:
+                    errors[loader.name] = err.messages
+                    continue
+
+                if value is not missing:
+                    result[key] = value
+
+            if unknown == RAISE:
+                for key in set(data) - self.field_keys:
+                    errors[key] = [self.error_messages['unknown']]
+
+        if errors:
+            exc = ValidationError(errors, data=data, valid_data=result)
+            self.handle_error(exc, data, many=False, partial=False)
+            raise exc
+
+        return result
+
+    def can_load_compiled(self, unknown):
+        """
+        Tell whether hooks of the schema allow compiled load.
+
+        Args:
+            unknown (str): Handling of unknown fields, e.g. RAISE
+
+        Returns:
+            (bool): True if compiled load gives the same result as `Schema.load`
+        """
+        return not self.hooks or (unknown == RAISE and self.hooks == REDUNDANT_SCHEMA_VALIDATORS)
+
+
+def compile_schema(schema_class):
+    """
+    Get schema instance loading data with compiled fields, it is created once per schema class and reused by
+    every request, so declared fields are not copied and validators are not resolved per request.
+
+    Args:
+        schema_class (type): Subclass of `marshmallow.Schema`
+
+    Returns:
+        (marshmallow.Schema): Instance of compiled subclass of `schema_class`
+    """
+    if schema_class not in compiled_schemas:
+        compiled_class = type(f'Compiled{schema_class.__name__}', (CompiledSchemaMixin, schema_class), {})
+        compiled_schemas[schema_class] = compiled_class()
+
+    return compiled_schemas[schema_class]
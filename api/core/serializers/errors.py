@@ -1,3 +1,6 @@
+from core.media import dumps
+
+
 def error_serializer(req, resp, exception):
     """
     Force error response content type and return always 'application/json'.
@@ -8,5 +11,5 @@ def error_serializer(req, resp, exception):
         exception: Falcon exception.
     """
 
-    resp.body = exception.to_json()
+    resp.data = dumps(exception.to_dict())
     resp.content_type = 'application/json'
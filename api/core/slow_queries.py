@@ -0,0 +1,196 @@
+import datetime
+import logging
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.media import dumps
+from settings import SLOW_QUERY_LOG
+
+
+logger = logging.getLogger(__name__)
+
+# Route of the request being processed, e.g. 'GET /{api_version}/users/', set by SlowQueryLogMiddleware
+current_route = ContextVar('current_route', default=None)
+
+EXPLAIN = 'EXPLAIN (ANALYZE off, FORMAT JSON) '
+
+
+def redact_parameters(parameters):
+    """
+    Replace values of bound parameters which may contain personal data, e.g. emails or search terms.
+
+    Numbers, booleans and None are kept, they identify rows or tell which branch of a query was taken.
+
+    Args:
+        parameters (dict|tuple|list): Bound parameters of a statement
+
+    Returns:
+        Parameters of the same shape with redacted values
+    """
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) for value in parameters]
+
+    if parameters is None or isinstance(parameters, (bool, int, float)):
+        return parameters
+
+    return f'<{type(parameters).__name__}>'
+
+
+class SlowQueryRecorder:
+    """
+    Record statements running longer than a threshold to a rotating JSONL file, along with their plans.
+
+    Requests only put slow statements to a bounded queue. A background thread of every worker process runs
+    `EXPLAIN` on a separate connection, since the request connection may be busy or in a failed transaction,
+    and writes the record. Statements are dropped when the queue is full, so recording never slows the API.
+    Every process should have its own file, rotation is not coordinated between processes.
+    """
+
+    def __init__(self, enabled, threshold, path, max_bytes, backup_count, queue_size=100):
+        """
+        Args:
+            enabled (bool): Indicates whether statements are recorded
+            threshold (float): Minimum duration of recorded statement in seconds
+            path (str): Path of the log file, `{pid}` is replaced with process ID
+            max_bytes (int): Size of the file when it is rotated
+            backup_count (int): Number of rotated files kept
+            queue_size (int): Maximum number of statements waiting for EXPLAIN
+        """
+        self.enabled = enabled
+        self.threshold = threshold
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.handler = None
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def ensure_started(self):
+        if self.pid == os.getpid():
+            return
+
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+
+            self.pid = os.getpid()
+            self.handler = RotatingFileHandler(
+                self.path.format(pid=self.pid), maxBytes=self.max_bytes, backupCount=self.backup_count,
+                encoding='utf-8',
+            )
+            threading.Thread(target=self.run, name='slow-query-recorder', daemon=True).start()
+
+    def add(self, engine, statement, parameters, duration, executemany):
+        """
+        Queue slow statement to be explained and written.
+
+        Args:
+            engine (sqlalchemy.engine.Engine): Engine which executed the statement
+            statement (str): SQL statement
+            parameters (dict|tuple|list): Bound parameters
+            duration (float): Duration in seconds
+            executemany (bool): Indicates whether statement was executed for many parameter sets
+        """
+        self.ensure_started()
+
+        entry = {
+            'time': datetime.datetime.utcnow().isoformat(),
+            'duration': round(duration, 6),
+            'route': current_route.get(),
+            'database': engine.url.database,
+            'statement': statement,
+            'parameters': redact_parameters(parameters),
+        }
+
+        try:
+            self.queue.put_nowait((engine, statement, None if executemany else parameters, entry))
+        except queue.Full:
+            logger.warning('Slow query dropped, recorder queue is full')
+
+    def run(self):
+        while True:
+            engine, statement, parameters, entry = self.queue.get()
+            try:
+                entry['plan'] = self.explain(engine, statement, parameters)
+                self.write(entry)
+            except Exception:  # noqa
+                logger.exception('Slow query could not be recorded')
+            finally:
+                self.queue.task_done()
+
+    @staticmethod
+    def explain(engine, statement, parameters):
+        """
+        Get plan of a statement, it is not executed.
+
+        Args:
+            engine (sqlalchemy.engine.Engine): Engine which executed the statement
+            statement (str): SQL statement
+            parameters (dict|tuple|None): Bound parameters, None if they are not known
+
+        Returns:
+            (list|str|None): Plan in JSON format, error message if statement cannot be explained (e.g. it uses
+                temporary table) or None for statements executed many times
+        """
+        if parameters is None:
+            return None
+
+        connection = engine.raw_connection()
+        try:
+            # Raw DB API cursor is not instrumented, so EXPLAIN is never recorded itself
+            cursor = connection.cursor()
+            cursor.execute(EXPLAIN + statement, parameters)
+            return cursor.fetchone()[0]
+        except engine.dialect.dbapi.Error as err:
+            return f'EXPLAIN failed: {err}'.strip()
+        finally:
+            connection.rollback()
+            connection.close()
+
+    def write(self, entry):
+        """
+        Write record as a single JSON line, the file is rotated when it exceeds `max_bytes`.
+
+        Args:
+            entry (dict): Slow query record
+        """
+        record = logging.makeLogRecord({'msg': dumps(entry).decode()})
+        self.handler.handle(record)
+
+    def flush(self):
+        """
+        Wait until queued statements are written.
+        """
+        self.queue.join()
+
+
+slow_query_recorder = SlowQueryRecorder(**SLOW_QUERY_LOG)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_slow_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if slow_query_recorder.enabled:
+        conn.info['slow_query_start_time'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def record_slow_query(conn, cursor, statement, parameters, context, executemany):
+    start_time = conn.info.pop('slow_query_start_time', None)
+    if not slow_query_recorder.enabled or start_time is None:
+        return
+
+    duration = time.perf_counter() - start_time
+    if duration >= slow_query_recorder.threshold:
+        slow_query_recorder.add(conn.engine, statement, parameters, duration, executemany)
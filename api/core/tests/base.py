@@ -1,12 +1,16 @@
 import json
+from contextlib import contextmanager
 from urllib.parse import urlencode
 
 import falcon
-from falcon.testing import TestCase
+from falcon.testing import TestCase, create_environ
+from sqlalchemy import event
 from sqlalchemy.orm import scoped_session
 
 from app import app
+from core.db.engine import engine
 from core.db.session import Session
+from core.query_budget import check_budget, get_statement_stack
 
 
 ScopedSession = scoped_session(Session)
@@ -19,6 +23,54 @@ class BaseDBTestCase(TestCase):
         super().setUp()
         self.db_session = ScopedSession()
 
+    def tearDown(self):
+        ScopedSession.remove()
+        super().tearDown()
+
+    @contextmanager
+    def assert_num_queries(self, number):
+        """
+        Assert number of SQL statements executed within the block.
+
+        Args:
+            number (int): Expected number of statements
+        """
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+        self.assertEqual(len(statements), number, '\n\n'.join(statements))
+
+    @contextmanager
+    def assert_max_queries(self, number, description='Block'):
+        """
+        Assert that the block executes at most given number of SQL statements, failure lists them along with
+        stacks of API code which executed them and statements repeated with different parameters (N+1).
+
+        Args:
+            number (int): Maximum number of statements
+            description (str): Description of the block in failure message
+        """
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, get_statement_stack()))
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+        check_budget(description, number, statements, mode='raise')
+
 
 class BaseApiTestCase(BaseDBTestCase):
     """Prepare helpers to simulate API requests."""
@@ -73,3 +125,31 @@ class BaseApiTestCase(BaseDBTestCase):
 
     def request_put(self, path, body, status=falcon.HTTP_200, headers=None):
         return self._request_method('PUT', path, status, headers, body)
+
+    def request_within_query_budget(self, method, path, **kwargs):
+        """
+        Make request and assert it does not exceed `query_budgets` of its resource.
+
+        Args:
+            method (str): HTTP method
+            path (str): Request path
+            **kwargs: Keyword arguments of request method, e.g. `body` or `status`
+
+        Returns:
+            (falcon.testing.Result): Response
+        """
+        resource, method_map, params, uri_template = self.app._router.find(path)
+        budget = resource.query_budgets[method.lower()]
+
+        if callable(budget):
+            environ = create_environ(
+                path=path,
+                query_string=urlencode(kwargs['params'], safe=',') if kwargs.get('params') else '',
+                method=method,
+                headers=self.request_headers,
+                body=json.dumps(kwargs['body'], ensure_ascii=False) if kwargs.get('body') else '',
+            )
+            budget = budget(resource, falcon.Request(environ, options=self.app.req_options))
+
+        with self.assert_max_queries(budget, f'{method} {uri_template}'):
+            return getattr(self, f'request_{method.lower()}')(path, **kwargs)
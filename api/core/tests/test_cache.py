@@ -0,0 +1,49 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from core.cache import ALL, InstanceCache
+
+
+class InstanceCacheTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = InstanceCache(enabled=True, max_size=2, ttl=10)
+
+    def put(self, key, tags=()):
+        self.cache.put(key, object(), {key, *tags}, self.cache.generation)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.put(('users', '1'))
+        self.put(('users', '2'))
+        self.cache.get(('users', '1'))
+        self.put(('users', '3'))
+
+        self.assertIsNotNone(self.cache.get(('users', '1')))
+        self.assertIsNone(self.cache.get(('users', '2')))
+        self.assertEqual(
+            self.cache.stats(), {'hits': 2, 'misses': 1, 'evictions': 1, 'invalidations': 0, 'size': 2}
+        )
+
+    def test_expired_entry_is_not_served(self):
+        self.put(('users', '1'))
+
+        with patch('core.cache.time.monotonic', return_value=10 ** 9):
+            self.assertIsNone(self.cache.get(('users', '1')))
+
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_invalidation_follows_tags(self):
+        self.put(('users', '1'), tags=(('organisations', '1'), ))
+        self.put(('organisations', '1'), tags=(('users', ALL), ))
+
+        self.cache.invalidate({('organisations', '1'), ('organisations', ALL)})
+        self.assertIsNone(self.cache.get(('users', '1')))
+        self.assertIsNone(self.cache.get(('organisations', '1')))
+        self.assertEqual(self.cache.stats()['invalidations'], 2)
+
+    def test_instance_loaded_before_invalidation_is_not_stored(self):
+        generation = self.cache.generation
+        self.cache.invalidate({('users', '1')})
+        self.cache.put(('users', '1'), object(), {('users', '1')}, generation)
+
+        self.assertIsNone(self.cache.get(('users', '1')))
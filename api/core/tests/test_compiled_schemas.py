@@ -0,0 +1,68 @@
+from falcon.testing import TestCase
+from marshmallow import EXCLUDE, ValidationError
+
+from core.media import dumps
+from core.serializers import BaseExportRequestSchema
+from core.serializers.compiled import compile_schema
+from organisations.serializers import OrganisationPatchRequestSchema
+from users.serializers import OrganisationPatchRequestSchema as UserPatchRequestSchema
+from users.serializers import UserBulkPostRequestSchema, UserGetRequestSchema
+
+
+def load(schema, data, **kwargs):
+    """
+    Load data and serialize the outcome, so error messages are compared along with their order.
+    """
+    try:
+        return 'valid', schema.load(data, **kwargs)
+    except ValidationError as err:
+        return 'invalid', dumps(err.messages)
+
+
+class CompiledSchemaTestCase(TestCase):
+
+    def assert_same_as_marshmallow(self, schema_class, corpus, **kwargs):
+        compiled = compile_schema(schema_class)
+
+        for data in corpus:
+            with self.subTest(data=data):
+                self.assertEqual(load(compiled, data, **kwargs), load(schema_class(), data, **kwargs))
+
+    def test_query_schemas(self):
+        corpus = [
+            {},
+            {'size': '20', 'page': '3', 'search': ['smith'], 'sorting': '-last_name'},
+            {'size': '0', 'page': '-1'},
+            {'size': '1001', 'page': 'x', 'pagination': 'cursor', 'cursor': 'abc'},
+            {'size': ' 12 ', 'page': '1_0', 'count': 'estimated'},
+            {'size': '1.5', 'count': 'all', 'search_mode': 'regex', 'search': ['a', 1, None]},
+            {'size': ['1', '2'], 'search': 'a', 'format': 'xml', 'unknown': '1'},
+            {'size': True, 'page': 2.7, 'sorting': None, 'format': 'csv'},
+        ]
+
+        for schema_class in (UserGetRequestSchema, BaseExportRequestSchema):
+            self.assert_same_as_marshmallow(schema_class, corpus, unknown=EXCLUDE)
+
+    def test_body_schemas(self):
+        corpus = [
+            {'name': 'Nakatomi', 'status': 0},
+            {'first_name': 'John', 'last_name': 'McClane', 'organisation_id': 1},
+            {'first_name': 'John', 'last_name': 'McClane', 'email': 'john@example.com', 'organisation_id': '1'},
+            {'first_name': 'a' * 129, 'last_name': 1, 'email': 'x@' + 'y' * 300 + '.com', 'organisation_id': True},
+            {'name': 5, 'status': 9, 'b': 1, 'a': 2},
+            {'first_name': None, 'email': 'bad', 'organisation_id': 'x', 'unknown': []},
+            [],
+            'text',
+            None,
+        ]
+
+        for schema_class in (OrganisationPatchRequestSchema, UserPatchRequestSchema, UserBulkPostRequestSchema):
+            self.assert_same_as_marshmallow(schema_class, corpus)
+
+    def test_schema_is_compiled_once(self):
+        self.assertIs(compile_schema(UserGetRequestSchema), compile_schema(UserGetRequestSchema))
+
+    def test_partial_load_uses_marshmallow(self):
+        schema = compile_schema(UserBulkPostRequestSchema)
+
+        self.assertEqual(schema.load({'first_name': 'John'}, partial=True), {'first_name': 'John'})
@@ -0,0 +1,20 @@
+import time
+from unittest import TestCase, skipUnless
+
+from core.db.engine import engine
+from settings import SERVING
+
+
+@skipUnless(SERVING['worker_class'] == 'gevent', 'runs in gevent serving mode, API_WORKER_CLASS=gevent')
+class GeventServingTestCase(TestCase):
+    def test_queries_of_concurrent_requests_overlap(self):
+        import gevent
+
+        def sleep_in_database():
+            with engine.connect() as connection:
+                connection.execute('SELECT pg_sleep(0.2)')
+
+        start = time.monotonic()
+        gevent.joinall([gevent.spawn(sleep_in_database) for _ in range(5)], raise_error=True)
+
+        self.assertLess(time.monotonic() - start, 0.5)
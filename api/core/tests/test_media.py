@@ -0,0 +1,38 @@
+import json
+from datetime import datetime
+from unittest import TestCase
+
+from core.media import get_json_library
+from users.enums import UserState
+
+
+class JSONLibraryTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.libraries = (get_json_library('orjson'), get_json_library('json'))
+
+    def test_libraries_serialize_same_values(self):
+        data = {
+            'created_at': datetime(2026, 10, 18, 20, 9, 19, 680521),
+            'state': UserState.ENABLED,
+            'name': 'Zoë Nakatomi',
+            'errors': {0: {'email': ['Missing data for required field.']}},
+        }
+        expected = {
+            'created_at': '2026-10-18 20:09:19.680521',
+            'state': UserState.ENABLED.value,
+            'name': 'Zoë Nakatomi',
+            'errors': {'0': {'email': ['Missing data for required field.']}},
+        }
+
+        for dumps, loads in self.libraries:
+            serialized = dumps(data)
+
+            self.assertIsInstance(serialized, bytes)
+            self.assertEqual(json.loads(serialized), expected)
+            self.assertEqual(loads(serialized), expected)
+
+    def test_unknown_value_is_not_serialized(self):
+        for dumps, loads in self.libraries:
+            with self.assertRaises(TypeError):
+                dumps({'value': object()})
@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+from falcon import HTTP_404
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+
+from core.metrics import InstrumentedQueuePool, get_query_operation, instrument_engine
+from core.tests.base import BaseApiTestCase
+
+
+class MetricsResourceTestCase(BaseApiTestCase):
+    def test_metrics_of_requests_and_queries_are_exposed(self):
+        self.request_get('/v1/users')
+
+        # Scrapers send no JSON headers
+        response = self.simulate_get('/metrics', remote_addr='127.0.0.1')
+
+        self.assertEqual(response.headers['content-type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIn(
+            'api_request_duration_seconds_count{method="GET",route="/{api_version}/users/",version="v1"}',
+            response.text
+        )
+        self.assertIn(
+            'api_requests_total{method="GET",route="/{api_version}/users/",status="200",version="v1"}',
+            response.text
+        )
+        self.assertIn('db_query_duration_seconds_count{database="primary",operation="SELECT"}', response.text)
+        self.assertIn('db_pool_connections_in_use{database="primary"}', response.text)
+
+    def test_metrics_are_not_available_to_remote_clients(self):
+        response = self.simulate_get('/metrics', remote_addr='10.0.0.1')
+
+        self.assertEqual(response.status, HTTP_404)
+
+    def test_query_operation(self):
+        self.assertEqual(get_query_operation('\n    SELECT users.id FROM users'), 'SELECT')
+        self.assertEqual(get_query_operation('savepoint sa_1'), 'OTHER')
+
+
+class PoolGaugesTestCase(TestCase):
+    def setUp(self):
+        self.engine = create_engine('sqlite://', poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1)
+        instrument_engine(self.engine, 'gauges')
+        self.addCleanup(self.engine.dispose)
+
+    def get_gauge(self, name):
+        return REGISTRY.get_sample_value(name, {'database': 'gauges'})
+
+    def test_gauges_return_to_zero_when_connections_are_returned(self):
+        first = self.engine.connect()
+        second = self.engine.connect()
+
+        self.assertEqual(self.get_gauge('db_pool_connections_in_use'), 2)
+        self.assertEqual(self.get_gauge('db_pool_connections_overflow'), 1)
+
+        # Returned connection is kept in the pool, overflow drops only when the pool is full
+        second.close()
+        self.assertEqual(self.get_gauge('db_pool_connections_in_use'), 1)
+        self.assertEqual(self.get_gauge('db_pool_connections_overflow'), 1)
+
+        first.close()
+        self.assertEqual(self.get_gauge('db_pool_connections_in_use'), 0)
+        self.assertEqual(self.get_gauge('db_pool_connections_overflow'), 0)
@@ -0,0 +1,72 @@
+from unittest.mock import patch
+
+from core.api import BaseSortingAPI
+from core.enums import CountStrategy
+from core.query_budget import QueryBudgetExceeded
+from core.tests.base import BaseApiTestCase
+from organisations.models import Organisation
+from users.api import UserResource
+from users.models import User
+
+
+class QueryBudgetTestCase(BaseApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.organisation = Organisation.create(db_session=self.db_session, name='Nakatomi')
+        self.users = [
+            User.create(
+                db_session=self.db_session, first_name=f'John{number}', last_name='McClane',
+                email=f'john{number}@example.com', organisation_id=self.organisation.id
+            )
+            for number in range(5)
+        ]
+
+    def test_routes_are_within_budget(self):
+        self.request_within_query_budget('GET', '/v2/users')
+        self.request_within_query_budget('GET', f'/v2/users/{self.users[0].id}')
+        self.request_within_query_budget('GET', '/v2/organisations')
+        self.request_within_query_budget('GET', f'/v2/organisations/{self.organisation.id}')
+
+    def test_list_budget_depends_on_requested_count(self):
+        for params in (
+            None,
+            {'page': 1, 'size': 2},
+            {'page': 10},
+            {'count': 'estimated'},
+            {'count': 'none'},
+            {'pagination': 'cursor', 'size': 2},
+        ):
+            with self.subTest(params=params):
+                self.request_within_query_budget('GET', '/v2/users', params=params)
+                self.request_within_query_budget('GET', '/v2/organisations', params=params)
+
+    def test_separate_count_of_first_page_exceeds_budget(self):
+        paginate_by_offset = BaseSortingAPI.paginate_by_offset
+
+        def paginate_without_total(resource, *args, **kwargs):
+            kwargs['count_strategy'] = CountStrategy.NONE.value
+            return paginate_by_offset(resource, *args, **kwargs)
+
+        # Total of a full page is counted by another query instead of the page query
+        with patch.object(BaseSortingAPI, 'paginate_by_offset', paginate_without_total), \
+                self.assertRaises(QueryBudgetExceeded) as context:
+            self.request_get('/v2/users', params={'size': 2})
+
+        self.assertIn('GET /{api_version}/users/ executed 3 SQL statements, its budget is 2', str(context.exception))
+
+    def test_lazy_load_exceeds_budget(self):
+        # Organisation is loaded lazily when building response without loader options
+        with patch.object(UserResource, 'loader_options', {}), self.assertRaises(QueryBudgetExceeded) as context:
+            self.request_get(f'/v2/users/{self.users[0].id}')
+
+        report = str(context.exception)
+        self.assertIn('GET /{api_version}/users/{object_id} executed 3 SQL statements, its budget is 2', report)
+        self.assertIn('FROM organisations', report)
+        self.assertIn('build_response', report)
+
+    def test_repeated_statements_are_reported(self):
+        with self.assertRaises(QueryBudgetExceeded) as context, self.assert_max_queries(1):
+            for user in self.users:
+                self.db_session.query(User).filter(User.id == user.id).populate_existing().one()
+
+        self.assertIn('Possible N+1, executed 5 times', str(context.exception))
@@ -0,0 +1,192 @@
+import threading
+import time
+import urllib.request
+from copy import copy
+from email.message import Message
+from http.cookiejar import CookieJar
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from falcon import HTTP_201, HTTP_204, HTTP_422
+from sqlalchemy import create_engine
+from sqlalchemy_utils import create_database, database_exists, drop_database
+
+from core.db.create_tables import create_all_tables
+from core.db.engine import engine
+from core.db.replicas import LAST_WRITE_COOKIE, Replica, get_replica_lag, parse_lsn, replica_router
+from core.db.session import Session
+from core.tests.base import BaseApiTestCase
+from organisations.models import Organisation
+
+
+class ParseLsnTestCase(TestCase):
+    def test_positions_are_comparable(self):
+        self.assertGreater(parse_lsn('1/0'), parse_lsn('0/FFFFFFFF'))
+        self.assertEqual(parse_lsn('0/16B3748'), 0x16B3748)
+        self.assertIsNone(parse_lsn(None))
+        self.assertIsNone(parse_lsn('invalid'))
+
+
+class GetReplicaLagTestCase(TestCase):
+    def test_database_not_in_recovery_does_not_lag(self):
+        self.assertEqual(get_replica_lag(False, None, None, parse_lsn('1/0')), 0)
+
+    def test_replica_which_replayed_position_of_primary_does_not_lag(self):
+        self.assertEqual(get_replica_lag(True, parse_lsn('1/10'), 3600, parse_lsn('1/0')), 0)
+
+    def test_replica_behind_primary_lags_by_age_of_last_replayed_transaction(self):
+        # Replica disconnected from the primary has replayed everything it received, but it is still behind
+        self.assertEqual(get_replica_lag(True, parse_lsn('1/0'), 3600, parse_lsn('1/10')), 3600)
+
+    def test_lag_is_infinite_when_it_cannot_be_determined(self):
+        self.assertEqual(get_replica_lag(True, parse_lsn('1/0'), None, parse_lsn('1/10')), float('inf'))
+        self.assertEqual(get_replica_lag(True, parse_lsn('1/0'), 1, None), float('inf'))
+
+
+class ReplicaRoutingTestCase(BaseApiTestCase):
+    """
+    Second local database plays the replica, it never receives writes made to the primary.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.replica_url = copy(engine.url)
+        cls.replica_url.database = f'{engine.url.database}_replica'
+
+        if database_exists(cls.replica_url):
+            drop_database(cls.replica_url)
+        create_database(cls.replica_url)
+
+        create_all_tables(configure_logger=False, url=str(cls.replica_url))
+        cls.replica_engine = create_engine(cls.replica_url)
+        cls.replica = Replica(cls.replica_engine)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.replica_engine.dispose()
+        drop_database(cls.replica_url)
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+
+        # Replicas are checked by tests themselves, requests never start a background check
+        for patcher in (
+            patch.object(replica_router, 'replicas', [self.replica]),
+            patch.object(replica_router, 'check_interval', 3600),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        replica_router.check_replicas()
+
+    def tearDown(self):
+        with self.replica_engine.begin() as connection:
+            connection.execute('TRUNCATE users, organisations CASCADE')
+        super().tearDown()
+
+    def get_organisation_names(self, headers=None):
+        response = self.request_get('/v1/organisations', headers=headers)
+        return [organisation['name'] for organisation in response.json['data']]
+
+    def test_reads_are_served_by_replica(self):
+        Organisation.create(db_session=self.db_session, name='Primary')
+        replica_session = Session(bind=self.replica_engine)
+        Organisation.create(db_session=replica_session, name='Replica')
+        replica_session.close()
+
+        self.assertEqual(self.get_organisation_names(), ['Replica'])
+
+    @staticmethod
+    def get_client_cookie(response, path):
+        """
+        Get Cookie header which HTTP client sends with a request of given path after it received the response,
+        the API is served over plain HTTP.
+
+        Args:
+            response (falcon.testing.Result): Response with Set-Cookie header
+            path (str): Path of the next request
+
+        Returns:
+            (str|None): Cookie header or None if the client sends no cookies
+        """
+        url = f'http://falconframework.org{path}'
+        headers = Message()
+        headers['Set-Cookie'] = response.headers['set-cookie']
+
+        jar = CookieJar()
+        jar.extract_cookies(SimpleNamespace(info=lambda: headers), urllib.request.Request(url))
+        request = urllib.request.Request(url)
+        jar.add_cookie_header(request)
+        return request.get_header('Cookie')
+
+    def test_reads_of_recent_writer_are_served_by_primary(self):
+        response = self.request_post('/v1/organisations', body={'name': 'Nakatomi'}, status=HTTP_201)
+        cookie = self.get_client_cookie(response, '/v1/organisations')
+
+        self.assertIsNotNone(parse_lsn(response.cookies[LAST_WRITE_COOKIE].value))
+        self.assertIsNotNone(cookie)
+        self.assertEqual(self.get_organisation_names(), [])
+        self.assertEqual(self.get_organisation_names(headers={'Cookie': cookie}), ['Nakatomi'])
+
+    def test_write_cookie_is_secure_on_https(self):
+        response = self.simulate_post(
+            '/v1/organisations', headers=self.request_headers, body='{"name": "Nakatomi"}', protocol='https'
+        )
+
+        self.assertEqual(response.status, HTTP_201)
+        self.assertTrue(response.cookies[LAST_WRITE_COOKIE].secure)
+
+    def test_requests_without_committed_changes_get_no_write_cookie(self):
+        organisation = Organisation.create(db_session=self.db_session, name='Nakatomi')
+
+        # Values are the same, nothing is written
+        response = self.request_patch(
+            f'/v1/organisations/{organisation.id}', body={'name': 'Nakatomi', 'status': organisation.status},
+            status=HTTP_204
+        )
+        self.assertNotIn(LAST_WRITE_COOKIE, response.cookies)
+
+        response = self.request_post('/v1/users/bulk', body=[{'first_name': 'Hans'}], status=HTTP_422)
+        self.assertNotIn(LAST_WRITE_COOKIE, response.cookies)
+
+    def test_lagging_replica_is_excluded(self):
+        Organisation.create(db_session=self.db_session, name='Primary')
+        self.replica.lag = replica_router.max_lag + 1
+
+        self.assertEqual(self.get_organisation_names(), ['Primary'])
+
+    def test_unavailable_replica_falls_back_to_primary(self):
+        Organisation.create(db_session=self.db_session, name='Primary')
+        unavailable_replica = Replica(create_engine('postgresql+psycopg2://interview@127.0.0.1:1/interview'))
+
+        with patch.object(replica_router, 'replicas', [unavailable_replica]):
+            replica_router.check_replicas()
+            self.assertEqual(self.get_organisation_names(), ['Primary'])
+
+        self.assertFalse(unavailable_replica.healthy)
+
+    def test_due_check_runs_once_in_background(self):
+        check_started = threading.Event()
+        finish_check = threading.Event()
+        checks = []
+
+        def check(primary_lsn):
+            checks.append(primary_lsn)
+            check_started.set()
+            finish_check.wait(5)
+
+        with patch.object(replica_router, 'checked_at', None), patch.object(self.replica, 'check', check):
+            # Requests do not wait for the check, they use the last known state
+            self.assertEqual(replica_router.get_engine(), self.replica_engine)
+            self.assertTrue(check_started.wait(5))
+            self.assertEqual(replica_router.get_engine(), self.replica_engine)
+
+            finish_check.set()
+            while replica_router.checking:
+                time.sleep(0.01)
+
+        self.assertEqual(len(checks), 1)
+        self.assertIsNotNone(checks[0])
@@ -0,0 +1,71 @@
+from falcon.testing import TestCase
+
+from core.api import BaseSortingAPI
+from core.responses import DETAIL, LIST, ResponseRegistry, compile_converter, response_serializers
+from users.api import UserCollectionResource, UserResource
+from users.enums import UserState
+from users.models import User
+from users.projections import USER_COMPUTED_FIELDS
+
+
+class ResponseSerializersTestCase(TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.users = [
+            User(id=index, first_name='John', last_name=None, email=f'john{index}@example.com', state=state.value)
+            for index, state in enumerate(UserState, start=1)
+        ]
+
+    def test_converter_is_same_as_convert_object_to_dict(self):
+        keys = ('id', 'name', 'email', 'state_name')
+        convert, convert_all = compile_converter(keys, USER_COMPUTED_FIELDS)
+
+        expected = [user.convert_object_to_dict(keys) for user in self.users]
+
+        self.assertEqual([convert(user) for user in self.users], expected)
+        self.assertEqual(convert_all(self.users), expected)
+        self.assertEqual([list(item) for item in convert_all(self.users)], [list(keys)] * len(self.users))
+
+    def test_converter_reads_rows_by_position(self):
+        positions = {'id': 0, 'first_name': 1, 'last_name': 2, 'state': 3}
+        convert, _ = compile_converter(('id', 'name', 'state_name'), USER_COMPUTED_FIELDS, positions)
+
+        self.assertEqual(
+            convert((5, 'John', 'McClane', UserState.DISABLED.value)),
+            {'id': 5, 'name': 'John McClane', 'state_name': UserState.DISABLED.name}
+        )
+
+    def test_converter_rejects_invalid_attribute(self):
+        with self.assertRaises(ValueError):
+            compile_converter(('id', 'state name'), {})
+
+    def test_undeclared_version_uses_previous_keys(self):
+        resource = type('Resource', (), {})
+        registry = ResponseRegistry(['v1', 'v2', 'v3'])
+        registry.register(resource, LIST, {'v1': ('id', ), 'v2': ('id', 'name')}, {})
+
+        self.assertEqual(registry.get(resource, None, LIST).keys, ('id', ))
+        self.assertEqual(registry.get(resource, 2.0, LIST).keys, ('id', 'name'))
+        self.assertIs(registry.get(resource, 3.0, LIST), registry.get(resource, 2.0, LIST))
+
+    def test_first_version_must_be_declared(self):
+        with self.assertRaises(ValueError):
+            ResponseRegistry(['v1', 'v2']).register(type('Resource', (), {}), LIST, {'v2': ('id', )}, {})
+
+    def test_resources_are_registered(self):
+        self.assertEqual(UserCollectionResource.get_response_keys(1.0), ('id', 'name', 'email'))
+        self.assertEqual(
+            response_serializers.get(UserResource, 2.0, DETAIL).keys,
+            ('id', 'name', 'email', 'state_name', 'organisation')
+        )
+
+    def test_collection_requires_registered_response_fields(self):
+        attributes = {'model': User, 'sorting_mapper': {}}
+
+        with self.assertRaises(ValueError):
+            type('Resource', (BaseSortingAPI, ), attributes)()
+
+        with self.assertRaises(ValueError):
+            type('Resource', (BaseSortingAPI, ), {**attributes, 'response_fields': {'v1': ('id', )}})()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from core.result_cache import FileResultBackend, MemoryResultBackend, normalize_params
+
+
+class MemoryResultBackendTestCase(TestCase):
+    def test_least_recently_used_result_is_evicted(self):
+        backend = MemoryResultBackend(max_size=2)
+        backend.set(('users', 1, 'a'), 'A')
+        backend.set(('users', 1, 'b'), 'B')
+        backend.get(('users', 1, 'a'))
+        backend.set(('users', 1, 'c'), 'C')
+
+        self.assertEqual(backend.get(('users', 1, 'a')), 'A')
+        self.assertIsNone(backend.get(('users', 1, 'b')))
+
+    def test_invalidate_drops_other_versions_of_table(self):
+        backend = MemoryResultBackend()
+        backend.set(('users', 1, 'a'), 'A')
+        backend.set(('users', 2, 'a'), 'B')
+        backend.set(('organisations', 1, 'a'), 'C')
+
+        backend.invalidate('users', 2)
+
+        self.assertIsNone(backend.get(('users', 1, 'a')))
+        self.assertEqual(backend.get(('users', 2, 'a')), 'B')
+        self.assertEqual(backend.get(('organisations', 1, 'a')), 'C')
+
+
+class FileResultBackendTestCase(TestCase):
+    def test_results_are_shared_through_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            FileResultBackend(directory).set(('users', 1, 'a'), ([(1, 'John')], {'has_more': False}))
+            backend = FileResultBackend(directory)
+
+            self.assertEqual(backend.get(('users', 1, 'a')), ([(1, 'John')], {'has_more': False}))
+            self.assertIsNone(backend.get(('users', 1, 'b')))
+
+            backend.invalidate('users', 2)
+            self.assertIsNone(backend.get(('users', 1, 'a')))
+
+    def test_oldest_written_result_is_evicted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            backend = FileResultBackend(directory, max_size=2)
+            backend.set(('users', 1, 'a'), 'A')
+            backend.set(('users', 1, 'b'), 'B')
+            os.utime(backend.get_path(('users', 1, 'a')), (1, 1))
+            os.utime(backend.get_path(('users', 1, 'b')), (2, 2))
+
+            backend.set(('organisations', 1, 'c'), 'C')
+
+            self.assertIsNone(backend.get(('users', 1, 'a')))
+            self.assertEqual(backend.get(('users', 1, 'b')), 'B')
+            self.assertEqual(backend.get(('organisations', 1, 'c')), 'C')
+
+
+class NormalizeParamsTestCase(TestCase):
+    def test_order_and_missing_params_do_not_matter(self):
+        self.assertEqual(
+            normalize_params({'search': ['holly', 'john'], 'page': 0, 'cursor': None}),
+            normalize_params({'page': 0, 'search': ['holly', 'john']})
+        )
@@ -0,0 +1,36 @@
+import json
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from core.slow_queries import SlowQueryRecorder, redact_parameters
+from core.tests.base import BaseApiTestCase
+
+
+class RedactParametersTestCase(TestCase):
+    def test_personal_data_is_redacted(self):
+        self.assertEqual(
+            redact_parameters({'email_1': 'john@example.com', 'param_1': 20, 'id_1': [1, 'a'], 'state': None}),
+            {'email_1': '<str>', 'param_1': 20, 'id_1': [1, '<str>'], 'state': None}
+        )
+
+
+class SlowQueryLogTestCase(BaseApiTestCase):
+    def test_slow_queries_are_recorded_with_plans(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = SlowQueryRecorder(
+                enabled=True, threshold=0, path=f'{directory}/slow-{{pid}}.jsonl', max_bytes=10 ** 6, backup_count=1
+            )
+            with patch('core.slow_queries.slow_query_recorder', recorder), \
+                    patch('core.middleware.slow_queries.slow_query_recorder', recorder):
+                self.request_get('/v2/users', params={'search': 'john@example.com', 'sorting': 'last_name'})
+                recorder.flush()
+
+            with open(f'{directory}/slow-{recorder.pid}.jsonl') as log:
+                records = [json.loads(line) for line in log]
+
+        query = next(record for record in records if 'FROM users' in record['statement'])
+
+        self.assertEqual(query['route'], 'GET /{api_version}/users/')
+        self.assertNotIn('john@example.com', json.dumps(query['parameters']))
+        self.assertIn('Plan', query['plan'][0])
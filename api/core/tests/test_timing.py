@@ -0,0 +1,38 @@
+import re
+from unittest.mock import patch
+
+from falcon import HTTP_201
+
+from core.tests.base import BaseApiTestCase
+from organisations.models import Organisation
+from settings import SERVER_TIMING
+
+
+class ServerTimingTestCase(BaseApiTestCase):
+    def get_server_timing(self, response):
+        return {
+            name: (float(duration), description)
+            for name, duration, description in re.findall(
+                r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', response.headers['server-timing']
+            )
+        }
+
+    def test_phases_and_db_cost_are_reported(self):
+        organisation = Organisation.create(db_session=self.db_session, name='Nakatomi')
+        body = {'first_name': 'John', 'last_name': 'McClane', 'email': 'john@example.com',
+                'organisation_id': organisation.id}
+
+        with patch.dict(SERVER_TIMING, enabled=True), self.assert_num_queries(3) as statements:
+            response = self.request_post('/v2/users', body=body, status=HTTP_201)
+
+        server_timing = self.get_server_timing(response)
+
+        self.assertEqual(list(server_timing), ['version', 'validation', 'serialization', 'db', 'total'])
+        # Statements of validator sessions are included
+        self.assertEqual(server_timing['db'][1], f'{len(statements)} queries')
+        self.assertGreaterEqual(server_timing['total'][0], server_timing['validation'][0])
+
+    def test_header_is_not_set_when_disabled(self):
+        response = self.request_get('/v2/users')
+
+        self.assertNotIn('server-timing', response.headers)
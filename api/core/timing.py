@@ -0,0 +1,116 @@
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Timing of the request being processed, None when Server-Timing is disabled or outside of a request
+current_timing = ContextVar('current_timing', default=None)
+
+
+class RequestTiming:
+    """
+    Wall time of request phases and cost of SQL statements executed by the request.
+
+    Statements are counted on every engine, so queries of sessions opened aside of the request session, e.g. by
+    validators with `session_manager`, are included as well.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = OrderedDict()
+        self.queries = 0
+        self.db_duration = 0
+
+    def add_phase(self, phase, duration):
+        """
+        Add duration to a phase, phases measured several times are summed up.
+
+        Args:
+            phase (str): Phase name
+            duration (float): Duration in seconds
+        """
+        self.phases[phase] = self.phases.get(phase, 0) + duration
+
+    def add_query(self, duration):
+        """
+        Add executed SQL statement.
+
+        Args:
+            duration (float): Duration in seconds
+        """
+        self.queries += 1
+        self.db_duration += duration
+
+    def get_header(self):
+        """
+        Build value of Server-Timing header, durations are in milliseconds.
+
+        Returns:
+            (str): Header value
+        """
+        metrics = [f'{phase};dur={duration * 1000:.2f}' for phase, duration in self.phases.items()]
+        metrics.append(f'db;dur={self.db_duration * 1000:.2f};desc="{self.queries} queries"')
+        metrics.append(f'total;dur={(time.perf_counter() - self.start) * 1000:.2f}')
+
+        return ', '.join(metrics)
+
+
+@contextmanager
+def measure(phase):
+    """
+    Measure wall time of a block as a phase of the current request, nothing is measured when there is none.
+
+    Args:
+        phase (str): Phase name
+    """
+    timing = current_timing.get()
+    if timing is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add_phase(phase, time.perf_counter() - start)
+
+
+def timed(phase):
+    """
+    Decorator measuring every call of a function as a phase of the current request.
+
+    Args:
+        phase (str): Phase name
+
+    Returns:
+        (callable): Decorator
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with measure(phase):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    if current_timing.get() is not None:
+        conn.info['timing_start_time'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def add_statement_timing(conn, cursor, statement, parameters, context, executemany):
+    timing = current_timing.get()
+    start_time = conn.info.pop('timing_start_time', None)
+
+    if timing is not None and start_time is not None:
+        timing.add_query(time.perf_counter() - start_time)
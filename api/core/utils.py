@@ -1,3 +1,6 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from math import isnan
 
 
@@ -23,3 +26,38 @@ def api_version_to_float(version):
         return None
 
     return result
+
+
+def encode_cursor(payload):
+    """
+    Encode pagination cursor payload as an opaque, URL safe string.
+
+    Args:
+        payload (dict): Cursor data, must be JSON serializable
+
+    Returns:
+        (str): Encoded cursor
+    """
+    data = json.dumps(payload, separators=(',', ':'), default=str)
+    return urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode pagination cursor created by `encode_cursor`.
+
+    Args:
+        cursor (str): Encoded cursor
+
+    Returns:
+        (dict): Cursor payload or `None` if cursor is malformed
+    """
+    try:
+        payload = json.loads(urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+    if not isinstance(payload, dict) or not isinstance(payload.get('key'), list) or len(payload['key']) != 2:
+        return None
+
+    return payload
@@ -2,6 +2,7 @@ import falcon
 import sqlalchemy
 
 from marshmallow import ValidationError
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from core.db.session import session_manager
 
@@ -43,3 +44,22 @@ def validate_instance_of_model_exists_by_id(model, instance_id):
 
         if not exists:
             raise ValidationError(f'{model.__name__} with given ID ({instance_id}) does not exist')
+
+
+def get_existing_ids(db_session, model, instance_ids):
+    """
+    Find which of provided IDs belong to existing instances of given model, with a single query.
+
+    Args:
+        db_session (Session): DB Session object
+        model (class): Model class
+        instance_ids (iterable): Instance IDs
+
+    Returns:
+        (set): IDs of existing instances
+    """
+    ids = db_session.query(model.id).filter(
+        model.id == sqlalchemy.any_(sqlalchemy.literal(list(instance_ids), ARRAY(model.id.type)))
+    )
+
+    return {instance_id for instance_id, in ids}
@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration of both serving modes, chosen by `API_WORKER_CLASS` environment variable.
+
+    gunicorn -c gunicorn_config.py --bind=0.0.0.0:8081 app:app
+    API_WORKER_CLASS=gevent gunicorn -c gunicorn_config.py --bind=0.0.0.0:8081 app:app
+"""
+import os
+
+from settings import SERVING
+
+
+worker_class = SERVING['worker_class']
+worker_connections = SERVING['worker_connections']
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        from core.green import patch
+
+        patch()
+
+
+def worker_exit(server, worker):
+    # Live gauges of exited worker must not be aggregated by /metrics anymore
+    if 'prometheus_multiproc_dir' in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
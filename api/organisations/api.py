@@ -1,33 +1,61 @@
 import falcon
 
-from sqlalchemy import cast, or_, String, func
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import selectinload, with_expression
 from webargs.falconparser import use_args
 
 from core.api import BaseSortingAPI
+from core.enums import SearchIndex, SearchTerm
+from core.db.versions import select_table_version
 from core.hooks import get_instance
+from core.projection import Projection
+from core.responses import DETAIL, LIST, response_serializers, serialize_responses
+from core.search import SearchField
+from core.serializers.compiled import compile_schema
+from core.timing import timed
 from core.validators import validate_object_id
 from organisations.models import Organisation
+from organisations.projections import (
+    ORGANISATION_COLUMNS,
+    ORGANISATION_COMPUTED_FIELDS,
+    ORGANISATION_DETAIL_COMPUTED_FIELDS
+)
 from organisations.serializers import (
     OrganisationGetRequestSchema,
     OrganisationPatchRequestSchema,
     OrganisationPostRequestSchema
 )
+from settings import RESPONSES
+from users.models import User
 
 
+@serialize_responses(LIST)
 class OrganisationCollectionResource(BaseSortingAPI):
     """
     Organisation API methods to handle listing, searching, sorting and create new instance.
     """
     serializers = {
-        'post': OrganisationPostRequestSchema
+        'post': compile_schema(OrganisationPostRequestSchema)
     }
+    query_budgets = {'get': BaseSortingAPI.get_list_query_budget, 'post': 3}
     model = Organisation
     sorting_mapper = {
         'name': func.lower(Organisation.name),
         'id': Organisation.id,
     }
+    search_fields = (
+        SearchField(Organisation.id, SearchIndex.BTREE, (SearchTerm.NUMBER, )),
+        SearchField(Organisation.name, SearchIndex.TRIGRAM, (SearchTerm.TEXT, )),
+    )
+    search_vector = Organisation.__table__.c.search_vector
+    response_fields = {
+        'v1': ('id', 'name'),
+        'v2': ('id', 'name', 'status_name'),
+    }
+    projection_columns = ORGANISATION_COLUMNS
+    computed_fields = ORGANISATION_COMPUTED_FIELDS
 
-    @use_args(OrganisationGetRequestSchema)
+    @use_args(compile_schema(OrganisationGetRequestSchema), location='query')
     def on_get(self, req, resp, params):
         """
         Get Organisation instance list
@@ -41,10 +69,15 @@ class OrganisationCollectionResource(BaseSortingAPI):
             (dict): Organisation instance list and total number
         """
 
-        paginated_filtered_result, total_objects = self.get_objects(req.context.db_session, params)
+        projection = self.get_projection(req.context['version'], self.database_json)
+        paginated_filtered_result, pagination = self.get_objects(req.context.db_session, params, projection)
+
+        if self.database_json:
+            resp.data = self.build_json_response(pagination, paginated_filtered_result)
+            return
 
         resp.media = self.build_response(
-            total=total_objects,
+            pagination=pagination,
             data=paginated_filtered_result,
             version=req.context['version']
         )
@@ -64,56 +97,26 @@ class OrganisationCollectionResource(BaseSortingAPI):
         resp.status = falcon.HTTP_201
         resp.media = organisation.convert_object_to_dict(('id', 'name', 'status_name'))
 
-    def build_query_filters(self, params):
-        """
-        Create filter for search purpose
-
-        Args:
-            params (dict): Query params
-
-        Returns:
-            (list): List of filters to be applied
-        """
-        search_terms = params.get('search')
-
-        if not search_terms:
-            return []
-
-        filters = []
-
-        for search_term in search_terms:
-            search_term = f'%{search_term.strip()}%'
-            filters.append(or_(*[
-                self.model.name.ilike(search_term),
-                cast(self.model.id, String).ilike(search_term),
-            ]))
-
-        return filters
-
-    @staticmethod
-    def build_response(total, data, version):
+    @timed('serialization')
+    def build_response(self, pagination, data, version):
         """
         Build response in proper format
 
         Args:
-            total (int): total number of airports
+            pagination (dict): Pagination data, e.g. total number of objects and next page cursor
             data (list): list of Airport instances
             version (str|None): Current API version
 
         Returns:
             (dict) with basic airport data
         """
-        keys = ('id', 'name')
-
-        if version and version > 1.0:
-            keys += ('status_name',)
-
         return {
-            'total': total,
-            'data': [item.convert_object_to_dict(keys) for item in data]
+            **pagination,
+            'data': self.convert_objects_to_dicts(data, version)
         }
 
 
+@serialize_responses(DETAIL)
 @falcon.before(validate_object_id, Organisation)
 @falcon.before(get_instance, Organisation)
 class OrganisationResource:
@@ -121,8 +124,35 @@ class OrganisationResource:
     Organisation API methods to handle single instance.
     """
     serializers = {
-        'patch': OrganisationPatchRequestSchema
+        'patch': compile_schema(OrganisationPatchRequestSchema)
+    }
+    loader_options = {
+        'delete': (
+            with_expression(
+                Organisation.users_count,
+                select([func.count(User.id)]).where(User.organisation_id == Organisation.id).as_scalar()
+            ),
+        ),
+    }
+    # Users are loaded only by API versions which render them, see `core.hooks.get_instance`
+    response_loader_options = {
+        'users': (selectinload(Organisation.users).load_only('id', 'first_name', 'last_name', 'email', 'state'), ),
     }
+    query_budgets = {'get': 3, 'patch': 2, 'delete': 2}
+    response_fields = {
+        'v1': ('id', 'name', 'status_name'),
+        'v2': ('id', 'name', 'status_name', 'enable_user_login', 'users'),
+    }
+    computed_fields = ORGANISATION_DETAIL_COMPUTED_FIELDS
+    # Build GET response body in database, see `core.projection.Projection`
+    database_json = RESPONSES['database_json']
+
+    @property
+    def methods_without_instance(self):
+        """
+        Methods which get no instance from `get_instance` hook, GET response built in database needs none.
+        """
+        return ('get', ) if self.database_json else ()
 
     def on_get(self, req, resp, object_id):
         """
@@ -136,6 +166,10 @@ class OrganisationResource:
         Returns:
             (falcon.response.Response): Organisation instance details
         """
+        if self.database_json:
+            resp.data = self.build_json_response(req.context['db_session'], object_id, req.context['version'])
+            return
+
         resp.media = self.build_response(req.context['instance'], req.context['version'])
 
     def on_patch(self, req, resp, object_id):
@@ -174,17 +208,63 @@ class OrganisationResource:
         """
         instance = req.context['instance']
 
-        users_no = len(instance.users)
+        users_no = instance.users_count
         if users_no > 0:
             raise falcon.HTTPConflict(
                 f'This Organisation is assign to {users_no} airport(s). Remove users before delete!'
             )
 
-        response = Organisation.delete_by_id(req.context['db_session'], object_id)
-        resp.status = falcon.HTTP_204 if response else falcon.HTTP_404
+        instance.delete(req.context['db_session'])
+        resp.status = falcon.HTTP_204
 
     @staticmethod
-    def build_response(instance, version):
+    def get_freshness(db_session, params):
+        """
+        Get freshness of organisation details for `ConditionalGetMiddleware`, response contains its users too,
+        so version counter of users table is a part of it.
+
+        Args:
+            db_session (Session): DB Session object
+            params (dict): Query parameters
+
+        Returns:
+            (tuple|None): Freshness token, time of the last change, None if organisation does not exist
+        """
+        object_id = params['object_id']
+        if not object_id.isdigit():
+            # Invalid ID is rejected by `validate_object_id` hook
+            return None
+
+        users_version = select_table_version(User.__tablename__).alias('users_version')
+        row = db_session.query(
+            Organisation.updated_at, users_version.c.version, users_version.c.updated_at
+        ).join(
+            users_version, true()
+        ).filter(
+            Organisation.id == object_id
+        ).first()
+
+        if row is None:
+            return None
+
+        updated_at, users_version, users_updated_at = row
+        return tuple(row), max(filter(None, (updated_at, users_updated_at)), default=None)
+
+    @staticmethod
+    def get_response_serializer(version):
+        """
+        Get serializer of Organisation returned by detail endpoint.
+
+        Args:
+            version (str|None): Current API version
+
+        Returns:
+            (core.responses.ResponseSerializer): Serializer registered for the version
+        """
+        return response_serializers.get(OrganisationResource, version, DETAIL)
+
+    @timed('serialization')
+    def build_response(self, instance, version):
         """
         Create dict with full organisation data.
 
@@ -195,17 +275,34 @@ class OrganisationResource:
         Returns:
             (dict): Organisation instance details
         """
-        keys = ('id', 'name', 'status_name')
+        return self.get_response_serializer(version).convert_object(instance)
+
+    def build_json_response(self, db_session, object_id, version):
+        """
+        Build response body with full organisation data in database, fields are the same as `build_response`
+        returns.
+
+        Args:
+            db_session (Session): DB Session object
+            object_id: (int): Object instance ID
+            version (str|None): Current API version
 
-        if version and version > 1.0:
-            keys += ('enable_user_login', )
+        Raises:
+            falcon.HTTPNotFound: If instance with provided ID does not exist
 
-        response = instance.convert_object_to_dict(keys)
+        Returns:
+            (bytes): Response body
+        """
+        projection = Projection(
+            'organisations',
+            self.get_response_serializer(version).keys,
+            ORGANISATION_COLUMNS,
+            self.computed_fields,
+            as_json=True
+        )
 
-        if version and version > 1.0:
-            response['users'] = [
-                item.convert_object_to_dict(('id', 'name', 'email', 'state_name'))
-                for item in instance.users
-            ]
+        body = projection.fetch_json(db_session, Organisation.id == object_id)
+        if body is None:
+            raise falcon.HTTPNotFound
 
-        return response
+        return body.encode()
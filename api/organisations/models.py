@@ -1,5 +1,7 @@
-from sqlalchemy import Boolean, Column, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Index, Integer, String, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, query_expression, relationship
+from sqlalchemy.schema import FetchedValue
 
 from core.db.base import Base
 from organisations.enums import OrganisationStatus
@@ -10,8 +12,13 @@ class Organisation(Base):
 
     name = Column(String(128), nullable=False)
     status = Column(Integer, nullable=False, default=OrganisationStatus.ENABLED.value)
-    users = relationship('User')
+    # Deleting organisation with users is refused by the API, no need to load them to clear their foreign keys
+    users = relationship('User', passive_deletes=True)
+    # Number of users, loaded only on demand with `with_expression`
+    users_count = query_expression()
     enable_user_login = Column(Boolean, default=False)
+    # Organisation name, maintained by `organisations_search_vector_update` trigger
+    search_vector = deferred(Column(TSVECTOR, server_default=FetchedValue(), server_onupdate=FetchedValue()))
 
     @property
     def status_name(self):
@@ -22,3 +29,16 @@ class Organisation(Base):
             (str) status name
         """
         return OrganisationStatus.get_name_by_value(self.status)
+
+
+# Keyset pagination index, sorting expression followed by ID tie-breaker
+Index('ix_organisations_lower_name_id', func.lower(Organisation.name), Organisation.id)
+
+# Substring search index, see `core.search.search_field_filter`
+Index(
+    'ix_organisations_name_trgm', Organisation.name,
+    postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+)
+
+# Full text search index, see `core.search.fulltext_search_filter`
+Index('ix_organisations_search_vector', Organisation.search_vector, postgresql_using='gin')
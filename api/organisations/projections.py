@@ -0,0 +1,52 @@
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from core.projection import ComputedField, Projection, enum_name_expression
+from core.responses import compile_converter
+from organisations.enums import OrganisationStatus
+from organisations.models import Organisation
+from users.models import User
+from users.projections import USER_COLUMNS, USER_COMPUTED_FIELDS
+
+
+# Columns of Organisation response fields, see `core.projection.Projection`
+ORGANISATION_COLUMNS = {
+    'id': Organisation.id,
+    'name': Organisation.name,
+    'status': Organisation.status,
+    'enable_user_login': Organisation.enable_user_login,
+}
+
+ORGANISATION_COMPUTED_FIELDS = {
+    'status_name': ComputedField(
+        OrganisationStatus.get_name_by_value,
+        ('status', ),
+        enum_name_expression(OrganisationStatus, Organisation.status)
+    ),
+}
+
+# Response keys of users listed in organisation details
+ORGANISATION_USER_KEYS = ('id', 'name', 'email', 'state_name')
+
+# Users of organisation as JSON array, rendered like `OrganisationResource.build_response` does
+ORGANISATION_USERS_JSON = select([
+    func.coalesce(
+        func.json_agg(aggregate_order_by(
+            Projection('users', ORGANISATION_USER_KEYS, USER_COLUMNS, USER_COMPUTED_FIELDS, as_json=True).json,
+            User.id
+        )),
+        func.json_build_array()
+    )
+]).where(
+    User.organisation_id == Organisation.id
+).as_scalar()
+
+# Fields of organisation details, users are converted from the loaded relationship or selected by a subquery
+ORGANISATION_DETAIL_COMPUTED_FIELDS = {
+    **ORGANISATION_COMPUTED_FIELDS,
+    'users': ComputedField(
+        compile_converter(ORGANISATION_USER_KEYS, USER_COMPUTED_FIELDS)[1],
+        ('users', ),
+        ORGANISATION_USERS_JSON
+    ),
+}
@@ -0,0 +1,93 @@
+from unittest.mock import patch
+
+from falcon import HTTP_200, HTTP_404, HTTP_409
+
+from core.cache import instance_cache
+from organisations.api import OrganisationCollectionResource, OrganisationResource
+from users.tests.test_api import BaseUserTestCase
+
+
+class OrganisationResourceTestCase(BaseUserTestCase):
+    def test_get_organisation_with_users(self):
+        organisation = self.create_organisation()
+        for number in range(3):
+            self.create_user(organisation.id, email=f'john{number}@example.com')
+
+        with self.assert_num_queries(3):
+            response = self.request_get(path=f'/v2/organisations/{organisation.id}')
+
+        self.assertEqual(len(response.json['users']), 3)
+
+    def test_get_organisation_without_users(self):
+        organisation = self.create_organisation()
+        self.create_user(organisation.id)
+
+        # Freshness and organisation, users are not rendered in v1
+        with self.assert_num_queries(2):
+            response = self.request_get(path=f'/v1/organisations/{organisation.id}')
+
+        self.assertNotIn('users', response.json)
+
+    def test_cached_organisation_per_version(self):
+        organisation = self.create_organisation()
+        self.create_user(organisation.id)
+
+        instance_cache.clear()
+        self.addCleanup(instance_cache.clear)
+
+        with patch.object(instance_cache, 'enabled', True):
+            self.request_get(path=f'/v1/organisations/{organisation.id}')
+            response = self.request_get(path=f'/v2/organisations/{organisation.id}')
+
+        self.assertEqual(len(response.json['users']), 1)
+
+    def test_delete_organisation(self):
+        organisation = self.create_organisation()
+
+        with self.assert_num_queries(2):
+            self.request_delete(path=f'/v1/organisations/{organisation.id}')
+
+    def test_delete_organisation_with_users(self):
+        organisation = self.create_organisation()
+        self.create_user(organisation.id)
+
+        with self.assert_num_queries(1):
+            self.request_delete(path=f'/v1/organisations/{organisation.id}', status=HTTP_409)
+
+
+class DatabaseJSONTestCase(BaseUserTestCase):
+    def setUp(self):
+        super().setUp()
+        self.organisation = self.create_organisation('Nakatomi')
+        self.users = [
+            self.create_user(self.organisation.id, first_name='Holly', email='holly@example.com'),
+            self.create_user(self.organisation.id, first_name='Hans', last_name=None, email='hans@example.com'),
+            self.create_user(self.organisation.id, first_name='Karl', email='karl@example.com'),
+        ]
+
+    def request_both_ways(self, path, params=None, status=HTTP_200):
+        response = self.request_get(path, params=params, status=status)
+
+        with patch.object(OrganisationCollectionResource, 'database_json', True), \
+                patch.object(OrganisationResource, 'database_json', True):
+            database_response = self.request_get(path, params=params, status=status)
+
+        self.assertEqual(database_response.json, response.json)
+        return database_response
+
+    def test_collection(self):
+        for version in ('v1', 'v2'):
+            self.request_both_ways(f'/{version}/organisations', params={'search': 'naka'})
+
+    def test_detail(self):
+        for version in ('v1', 'v2'):
+            self.request_both_ways(f'/{version}/organisations/{self.organisation.id}')
+
+        self.request_both_ways('/v2/organisations/0', status=HTTP_404)
+
+    def test_detail_in_single_query(self):
+        # Freshness query of conditional GET and the response body
+        with patch.object(OrganisationResource, 'database_json', True), self.assert_num_queries(2):
+            response = self.request_get(f'/v2/organisations/{self.organisation.id}')
+
+        self.assertListEqual([user['id'] for user in response.json['users']], [user.id for user in self.users])
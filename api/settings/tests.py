@@ -8,3 +8,7 @@ BASE_URL = 'https://localhost:8081'
 POSTGRESQL = {
     'db_name': 'test_interview',
 }
+
+QUERY_BUDGET = {
+    'mode': 'raise',
+}
@@ -1,29 +1,65 @@
+from math import ceil
+
 import falcon
 
-from sqlalchemy import cast, or_, String, func
+from marshmallow import ValidationError
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from webargs.falconparser import use_args
 
 from core.api import BaseSortingAPI
+from core.enums import SearchIndex, SearchTerm
+from core.errors import HTTPError
 from core.hooks import get_instance
+from core.projection import Projection
+from core.responses import DETAIL, LIST, response_serializers, serialize_responses
+from core.search import SearchField
+from core.serializers.compiled import compile_schema
+from core.timing import timed
+from organisations.models import Organisation
 from users.models import User
-from users.serializers import UserGetRequestSchema, OrganisationPatchRequestSchema, UserPostRequestSchema
-from core.validators import validate_object_id
-
-
+from users.projections import USER_COLUMNS, USER_COMPUTED_FIELDS, USER_DETAIL_COMPUTED_FIELDS
+from users.serializers import (
+    OrganisationPatchRequestSchema,
+    UserBulkPostRequestSchema,
+    UserGetRequestSchema,
+    UserPostRequestSchema
+)
+from users.validators import get_existing_user_emails
+from core.validators import get_existing_ids, validate_object_id
+from settings import RESPONSES
+
+
+@serialize_responses(LIST)
 class UserCollectionResource(BaseSortingAPI):
     """
     User API methods to handle listing, searching, sorting and create new instance.
     """
     serializers = {
-        'post': UserPostRequestSchema
+        'post': compile_schema(UserPostRequestSchema)
     }
+    query_budgets = {'get': BaseSortingAPI.get_list_query_budget, 'post': 3}
     model = User
     sorting_mapper = {
         'first_name': func.lower(User.first_name),
         'last_name': func.lower(User.last_name),
     }
+    search_fields = (
+        SearchField(User.id, SearchIndex.BTREE, (SearchTerm.NUMBER, )),
+        SearchField(func.lower(User.email), SearchIndex.PATTERN, (SearchTerm.EMAIL, )),
+        SearchField(User.last_name, SearchIndex.TRIGRAM, (SearchTerm.TEXT, )),
+        SearchField(User.first_name, SearchIndex.TRIGRAM, (SearchTerm.TEXT, )),
+        SearchField(User.email, SearchIndex.TRIGRAM, (SearchTerm.TEXT, )),
+    )
+    search_vector = User.__table__.c.search_vector
+    response_fields = {
+        'v1': ('id', 'name', 'email'),
+        'v2': ('id', 'name', 'email', 'state_name'),
+    }
+    projection_columns = USER_COLUMNS
+    computed_fields = USER_COMPUTED_FIELDS
 
-    @use_args(UserGetRequestSchema)
+    @use_args(compile_schema(UserGetRequestSchema), location='query')
     def on_get(self, req, resp, params):
         """
         Get list of all Users
@@ -32,12 +68,15 @@ class UserCollectionResource(BaseSortingAPI):
             req (falcon.request.Request): Request object
             resp (falcon.response.Response): Response object
         """
-        paginated_filtered_result, total_objects = self.get_objects(
-            req.context.db_session, params
-        )
+        projection = self.get_projection(req.context['version'], self.database_json)
+        paginated_filtered_result, pagination = self.get_objects(req.context.db_session, params, projection)
+
+        if self.database_json:
+            resp.data = self.build_json_response(pagination, paginated_filtered_result)
+            return
 
         resp.media = self.build_response(
-            total=total_objects,
+            pagination=pagination,
             data=paginated_filtered_result,
             version=req.context['version']
         )
@@ -55,56 +94,151 @@ class UserCollectionResource(BaseSortingAPI):
 
         user = self.model.create(db_session, **serializer)
         resp.status = falcon.HTTP_201
-        keys = ('id', 'name', 'email')
+        resp.media = self.get_response_serializer(req.context['version']).convert_object(user)
+
+    @timed('serialization')
+    def build_response(self, pagination, data, version):
+        """
+        Build response in proper format
+
+        Args:
+            pagination (dict): Pagination data, e.g. total number of objects and next page cursor
+            data (list): list of Airport instances
+            version (str|None): Current API version
+        """
+        return {
+            **pagination,
+            'data': self.convert_objects_to_dicts(data, version)
+        }
+
+
+class UserBulkResource:
+    """
+    User API method to create many instances at once.
+    """
+    model = User
+    max_size = 10000
+    item_schema = compile_schema(UserBulkPostRequestSchema)
+
+    def get_post_query_budget(self, req):
+        """
+        Get query budget of a bulk create, emails and organisations are checked by a query each and valid items
+        are inserted by a query per `bulk_insert_chunk_size` of them.
 
-        if req.context['version'] and req.context['version'] > 1:
-            keys += ('state_name', )
+        Args:
+            req (falcon.request.Request): Request object
+
+        Returns:
+            (int): Maximum number of SQL statements
+        """
+        items = req.media
+        size = len(items) if isinstance(items, list) and len(items) <= self.max_size else 0
+        return 2 + ceil(size / self.model.bulk_insert_chunk_size)
 
-        resp.media = user.convert_object_to_dict(keys)
+    query_budgets = {'post': get_post_query_budget}
 
-    def build_query_filters(self, params):
+    def on_post(self, req, resp):
         """
-        Build filters list based on provided query parameters.
+        Post create many User instances
+
+        Every item is validated on its own, emails and organisations of the whole batch are checked with
+        a single query each and valid items are created with multi-row INSERT. Invalid items are reported
+        with their errors and do not prevent creating the others.
+
+        Args:
+            req (falcon.request.Request): Request object
+            resp (falcon.response.Response): Response object
+
+        Raises:
+            (HTTPError): Request body is not a list of allowed length
         """
-        search_terms = params.get('search')
+        items = req.media
 
-        if not search_terms:
-            return []
+        if not isinstance(items, list):
+            raise HTTPError(status=falcon.HTTP_422, errors={'_schema': ['Invalid input type.']})
 
-        filters = []
+        if len(items) > self.max_size:
+            raise HTTPError(
+                status=falcon.HTTP_422,
+                errors={'_schema': [f'Longer than maximum length {self.max_size}.']}
+            )
 
-        for search_term in search_terms:
-            search_term = f'%{search_term.strip()}%'
-            filters.append(or_(*[
-                self.model.last_name.ilike(search_term),
-                self.model.first_name.ilike(search_term),
-                self.model.email.ilike(search_term),
-                cast(self.model.id, String).ilike(search_term),
-            ]))
+        db_session = req.context['db_session']
+        results = [None] * len(items)
+        loaded = {}
+
+        for index, item in enumerate(items):
+            try:
+                loaded[index] = self.item_schema.load(item)
+            except ValidationError as err:
+                results[index] = {'status': falcon.HTTP_422, 'errors': err.messages}
+
+        existing_emails = get_existing_user_emails(db_session, {data['email'] for data in loaded.values()})
+        existing_organisations = get_existing_ids(
+            db_session, Organisation, {data['organisation_id'] for data in loaded.values()}
+        )
+
+        valid = {}
+        for index, data in loaded.items():
+            errors = self.validate_item(data, existing_emails, existing_organisations)
+
+            if errors:
+                results[index] = {'status': falcon.HTTP_422, 'errors': errors}
+            else:
+                valid[index] = data
+                existing_emails.add(data['email'])
+
+        created = self.model.bulk_create(db_session, list(valid.values()), returning=('id', 'state'), commit=False)
+        db_session.commit()
 
-        return filters
+        convert_object = UserCollectionResource.get_response_serializer(req.context['version']).convert_object
+
+        for (index, data), (instance_id, state) in zip(valid.items(), created):
+            user = self.model(id=instance_id, state=state, **data)
+            results[index] = {'status': falcon.HTTP_201, 'data': convert_object(user)}
+
+        failed = len(items) - len(created)
+
+        if not failed:
+            resp.status = falcon.HTTP_201
+        elif created:
+            resp.status = falcon.HTTP_207
+        else:
+            resp.status = falcon.HTTP_422
+
+        resp.media = {
+            'created': len(created),
+            'failed': failed,
+            'data': results
+        }
 
     @staticmethod
-    def build_response(total, data, version):
+    def validate_item(data, existing_emails, existing_organisations):
         """
-        Build response in proper format
+        Validate single item against data fetched for the whole batch.
 
         Args:
-            total (int): total number of airports
-            data (list): list of Airport instances
-            version (str|None): Current API version
+            data (dict): Deserialized item
+            existing_emails (set): Emails already used, including emails of valid items preceding this one
+            existing_organisations (set): IDs of existing Organisations
+
+        Returns:
+            (dict): Error messages, empty if item is valid
         """
-        keys = ('id', 'name', 'email')
+        errors = {}
 
-        if version and version > 1:
-            keys += ('state_name', )
+        if data['email'] in existing_emails:
+            errors['email'] = [f'User email {data["email"]} already exists']
 
-        return {
-            'total': total,
-            'data': [item.convert_object_to_dict(keys) for item in data]
-        }
+        if data['organisation_id'] not in existing_organisations:
+            errors['organisation_id'] = [
+                f'Organisation with given ID ({data["organisation_id"]}) does not exist'
+            ]
+
+        return errors
 
 
+@serialize_responses(DETAIL)
 @falcon.before(validate_object_id, User)
 @falcon.before(get_instance, User)
 class UserResource:
@@ -112,8 +246,26 @@ class UserResource:
     Organisation API methods to handle single instance.
     """
     serializers = {
-        'patch': OrganisationPatchRequestSchema
+        'patch': compile_schema(OrganisationPatchRequestSchema)
+    }
+    loader_options = {
+        'get': (joinedload(User.organisation).load_only('name'), ),
     }
+    query_budgets = {'get': 2, 'patch': 3, 'delete': 2}
+    response_fields = {
+        'v1': ('id', 'name', 'email', 'organisation'),
+        'v2': ('id', 'name', 'email', 'state_name', 'organisation'),
+    }
+    computed_fields = USER_DETAIL_COMPUTED_FIELDS
+    # Build GET response body in database, see `core.projection.Projection`
+    database_json = RESPONSES['database_json']
+
+    @property
+    def methods_without_instance(self):
+        """
+        Methods which get no instance from `get_instance` hook, GET response built in database needs none.
+        """
+        return ('get', ) if self.database_json else ()
 
     def on_get(self, req, resp, object_id):
         """
@@ -127,6 +279,10 @@ class UserResource:
         Returns:
             (falcon.response.Response): User instance details
         """
+        if self.database_json:
+            resp.data = self.build_json_response(req.context['db_session'], object_id, req.context['version'])
+            return
+
         resp.media = self.build_response(req.context['instance'], req.context['version'])
 
     def on_patch(self, req, resp, object_id):
@@ -163,11 +319,54 @@ class UserResource:
         Raises::
             (HTTPNotFound): User instance does not exist
         """
-        response = User.delete_by_id(req.context['db_session'], object_id)
-        resp.status = falcon.HTTP_204 if response else falcon.HTTP_404
+        req.context['instance'].delete(req.context['db_session'])
+        resp.status = falcon.HTTP_204
 
     @staticmethod
-    def build_response(instance, version):
+    def get_freshness(db_session, params):
+        """
+        Get freshness of user details for `ConditionalGetMiddleware`, response contains organisation name too.
+
+        Args:
+            db_session (Session): DB Session object
+            params (dict): Query parameters
+
+        Returns:
+            (tuple|None): Freshness token, time of the last change, None if user does not exist
+        """
+        object_id = params['object_id']
+        if not object_id.isdigit():
+            # Invalid ID is rejected by `validate_object_id` hook
+            return None
+
+        row = db_session.query(
+            User.updated_at, Organisation.updated_at
+        ).outerjoin(
+            Organisation, Organisation.id == User.organisation_id
+        ).filter(
+            User.id == object_id
+        ).first()
+
+        if row is None:
+            return None
+
+        return tuple(row), max(filter(None, row), default=None)
+
+    @staticmethod
+    def get_response_serializer(version):
+        """
+        Get serializer of User returned by detail endpoint.
+
+        Args:
+            version (str|None): Current API version
+
+        Returns:
+            (core.responses.ResponseSerializer): Serializer registered for the version
+        """
+        return response_serializers.get(UserResource, version, DETAIL)
+
+    @timed('serialization')
+    def build_response(self, instance, version):
         """
         Create dict with full user data.
 
@@ -178,11 +377,29 @@ class UserResource:
         Returns:
             (dict): User instance details
         """
-        keys = ('id', 'name', 'email')
+        return self.get_response_serializer(version).convert_object(instance)
+
+    def build_json_response(self, db_session, object_id, version):
+        """
+        Build response body with full user data in database, fields are the same as `build_response` returns.
+
+        Args:
+            db_session (Session): DB Session object
+            object_id: (int): Object instance ID
+            version (str|None): Current API version
+
+        Raises:
+            falcon.HTTPNotFound: If instance with provided ID does not exist
+
+        Returns:
+            (bytes): Response body
+        """
+        projection = Projection(
+            'users', self.get_response_serializer(version).keys, USER_COLUMNS, self.computed_fields, as_json=True
+        )
 
-        if version and version > 1:
-            keys += ('state_name', )
+        body = projection.fetch_json(db_session, User.id == object_id)
+        if body is None:
+            raise falcon.HTTPNotFound
 
-        response = instance.convert_object_to_dict(keys)
-        response['organisation'] = instance.organisation.name
-        return response
+        return body.encode()
@@ -0,0 +1,237 @@
+import csv
+import gzip
+import io
+import json
+from itertools import islice
+
+from marshmallow import ValidationError
+from psycopg2.extensions import get_wait_callback, set_wait_callback
+
+from core.cache import get_changed_tags, invalidate_on_commit
+from core.serializers.compiled import compile_schema
+from users.enums import UserState
+from users.models import User
+from users.serializers import UserBulkPostRequestSchema
+
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+IMPORT_COLUMNS = ('first_name', 'last_name', 'email', 'organisation_id')
+
+# Rows validated and copied to the staging table at once, memory usage does not depend on file size
+CHUNK_SIZE = 5000
+
+# Gzip magic number
+GZIP_HEADER = b'\x1f\x8b'
+
+CREATE_STAGING_TABLE = """
+    CREATE TEMPORARY TABLE users_import (
+        line INTEGER PRIMARY KEY,
+        first_name VARCHAR(128),
+        last_name VARCHAR(128),
+        email VARCHAR(128),
+        organisation_id INTEGER,
+        errors JSONB
+    ) ON COMMIT DROP
+"""
+
+COPY_STAGING_TABLE = f"COPY users_import (line, {', '.join(IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+# Same rules and messages as `users.validators` and `organisations.validators`. Like `UserBulkResource`, only
+# rows with existing organisation reserve their email, the first of them wins
+VALIDATE_STAGING_TABLE = """
+    UPDATE users_import AS staged
+    SET errors = validated.errors
+    FROM (
+        SELECT line, jsonb_strip_nulls(jsonb_build_object(
+            'email', CASE
+                WHEN email_line < line OR EXISTS (SELECT 1 FROM users WHERE users.email = ranked.email)
+                THEN jsonb_build_array('User email ' || email || ' already exists')
+            END,
+            'organisation_id', CASE
+                WHEN NOT organisation_exists
+                THEN jsonb_build_array('Organisation with given ID (' || organisation_id || ') does not exist')
+            END
+        )) AS errors
+        FROM (
+            SELECT *, min(line) FILTER (WHERE organisation_exists) OVER (PARTITION BY email) AS email_line
+            FROM (
+                SELECT *, EXISTS (
+                    SELECT 1 FROM organisations WHERE organisations.id = users_import.organisation_id
+                ) AS organisation_exists
+                FROM users_import
+            ) AS checked
+        ) AS ranked
+    ) AS validated
+    WHERE staged.line = validated.line AND validated.errors <> '{}'::jsonb
+"""
+
+MERGE_STAGING_TABLE = f"""
+    INSERT INTO users ({', '.join(IMPORT_COLUMNS)}, state, created_at, updated_at)
+    SELECT {', '.join(IMPORT_COLUMNS)}, %(state)s, timezone('utc', now()), timezone('utc', now())
+    FROM users_import
+    WHERE errors IS NULL
+    ORDER BY line
+"""
+
+SELECT_REJECTED = "SELECT line, errors FROM users_import WHERE errors IS NOT NULL ORDER BY line"
+
+
+def open_text_stream(stream):
+    """
+    Wrap binary stream as text, decompressing it on the fly if it is gzipped.
+
+    Args:
+        stream (io.BufferedIOBase): Binary stream
+
+    Returns:
+        (io.TextIOWrapper): Text stream
+    """
+    stream = io.BufferedReader(stream) if not hasattr(stream, 'peek') else stream
+
+    if stream.peek(len(GZIP_HEADER)).startswith(GZIP_HEADER):
+        stream = gzip.GzipFile(fileobj=stream)
+
+    return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+
+def read_rows(stream, file_format):
+    """
+    Lazily read rows of NDJSON or CSV (with header) stream.
+
+    Args:
+        stream (io.TextIOBase): Text stream
+        file_format (str): One of IMPORT_FORMATS
+
+    Yields:
+        (tuple): Line number, row data or None if the line is not valid JSON
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def validate_rows(rows, report):
+    """
+    Validate rows against `UserBulkPostRequestSchema`, write rejected ones to the report.
+
+    Args:
+        rows (iterable): Line numbers with row data
+        report (io.TextIOBase): Text stream for rejected rows
+
+    Returns:
+        (list): Line numbers with deserialized data of valid rows
+    """
+    schema = compile_schema(UserBulkPostRequestSchema)
+    valid = []
+
+    for line_number, row in rows:
+        if row is None:
+            write_rejected(report, line_number, {'_schema': ['Invalid JSON.']})
+            continue
+
+        try:
+            valid.append((line_number, schema.load(row)))
+        except ValidationError as err:
+            write_rejected(report, line_number, err.messages)
+
+    return valid
+
+
+def write_rejected(report, line_number, errors):
+    """
+    Write rejected row to the report as a single NDJSON line.
+
+    Args:
+        report (io.TextIOBase): Text stream for rejected rows
+        line_number (int): Line number of rejected row
+        errors (dict): Error messages
+    """
+    report.write(json.dumps({'line': line_number, 'errors': errors}) + '\n')
+    report.flush()
+
+
+def copy_rows(cursor, rows):
+    """
+    Load rows to the staging table with `COPY FROM STDIN`.
+
+    Args:
+        cursor (psycopg2.extensions.cursor): DB API cursor
+        rows (list): Line numbers with deserialized data
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    for line_number, data in rows:
+        writer.writerow((line_number, *[data[column] for column in IMPORT_COLUMNS]))
+
+    buffer.seek(0)
+
+    # COPY does not support wait callback set in gevent serving mode, it blocks the whole process for a moment
+    wait_callback = get_wait_callback()
+    set_wait_callback(None)
+    try:
+        cursor.copy_expert(COPY_STAGING_TABLE, buffer)
+    finally:
+        set_wait_callback(wait_callback)
+
+
+def import_users(db_session, stream, file_format, report, commit=True):
+    """
+    Import Users from NDJSON or CSV stream.
+
+    Rows are validated in chunks and copied to a staging table, then emails and organisations of all rows are
+    validated with a single statement and valid rows are merged into `users` with another one. Rejected rows
+    are written to the report as soon as they are known.
+
+    Args:
+        db_session (Session): DB Session object
+        stream (io.BufferedIOBase): Binary stream, optionally gzipped
+        file_format (str): One of IMPORT_FORMATS
+        report (io.TextIOBase): Text stream for rejected rows
+        commit (bool): Indicates whether to commit session or not
+
+    Returns:
+        (tuple): Number of imported rows, number of rejected rows
+    """
+    cursor = db_session.connection().connection.cursor()
+    cursor.execute(CREATE_STAGING_TABLE)
+
+    rows = read_rows(open_text_stream(stream), file_format)
+    total = 0
+
+    while True:
+        chunk = list(islice(rows, CHUNK_SIZE))
+        if not chunk:
+            break
+
+        total += len(chunk)
+        copy_rows(cursor, validate_rows(chunk, report))
+
+    cursor.execute('ANALYZE users_import')
+    cursor.execute(VALIDATE_STAGING_TABLE)
+    cursor.execute(MERGE_STAGING_TABLE, {'state': UserState.ENABLED.value})
+    imported = cursor.rowcount
+
+    # Named cursor is server-side, rejected rows are fetched in batches
+    rejected = db_session.connection().connection.cursor(name='users_import_rejected')
+    rejected.execute(SELECT_REJECTED)
+    for line_number, errors in rejected:
+        write_rejected(report, line_number, errors)
+    rejected.close()
+
+    cursor.close()
+    invalidate_on_commit(db_session, get_changed_tags(User.__tablename__))
+    User._commit(commit, db_session)
+
+    return imported, total - imported
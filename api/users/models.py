@@ -2,10 +2,14 @@ from sqlalchemy import (
     Boolean,
     Column,
     ForeignKey,
+    Index,
     Integer,
     String,
+    func,
 )
-from sqlalchemy.orm import Session, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Session, deferred, relationship
+from sqlalchemy.schema import FetchedValue
 
 from core.db.base import Base
 from users.enums import UserState
@@ -20,10 +24,26 @@ class User(Base):
     organisation_id = Column(Integer, ForeignKey('organisations.id'))
     organisation = relationship('Organisation', back_populates='users')
     state = Column(Integer, default=UserState.ENABLED.value)
+    # Full name and email local part, maintained by `users_search_vector_update` trigger
+    search_vector = deferred(Column(TSVECTOR, server_default=FetchedValue(), server_onupdate=FetchedValue()))
 
     @property
     def name(self):
-        return f'{self.first_name} {self.last_name}'
+        return self.format_name(self.first_name, self.last_name)
+
+    @staticmethod
+    def format_name(first_name, last_name):
+        """
+        Build full name of a user.
+
+        Args:
+            first_name (str|None): User first name
+            last_name (str|None): User last name
+
+        Returns:
+            (str) full name
+        """
+        return f'{first_name} {last_name}'
 
     @property
     def state_name(self):
@@ -34,3 +54,31 @@ class User(Base):
             (str) state name
         """
         return UserState.get_name_by_value(self.state)
+
+
+# Keyset pagination indexes, sorting expression followed by ID tie-breaker
+Index('ix_users_lower_first_name_id', func.lower(User.first_name), User.id)
+Index('ix_users_lower_last_name_id', func.lower(User.last_name), User.id)
+
+# Substring search indexes, see `core.search.search_field_filter`
+Index(
+    'ix_users_first_name_trgm', User.first_name,
+    postgresql_using='gin', postgresql_ops={'first_name': 'gin_trgm_ops'}
+)
+Index(
+    'ix_users_last_name_trgm', User.last_name,
+    postgresql_using='gin', postgresql_ops={'last_name': 'gin_trgm_ops'}
+)
+Index(
+    'ix_users_email_trgm', User.email,
+    postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'}
+)
+
+# Email prefix search index, see `core.search.search_field_filter`
+Index(
+    'ix_users_lower_email_pattern', func.lower(User.email).label('lower_email'),
+    postgresql_ops={'lower_email': 'text_pattern_ops'}
+)
+
+# Full text search index, see `core.search.fulltext_search_filter`
+Index('ix_users_search_vector', User.search_vector, postgresql_using='gin')
@@ -0,0 +1,41 @@
+from operator import attrgetter
+
+from sqlalchemy import func, select
+
+from core.projection import ComputedField, enum_name_expression
+from organisations.models import Organisation
+from users.enums import UserState
+from users.models import User
+
+
+# Columns of User response fields, see `core.projection.Projection`
+USER_COLUMNS = {
+    'id': User.id,
+    'first_name': User.first_name,
+    'last_name': User.last_name,
+    'email': User.email,
+    'state': User.state,
+}
+
+USER_COMPUTED_FIELDS = {
+    # Missing names are formatted as None, just like `User.format_name` does
+    'name': ComputedField(
+        User.format_name,
+        ('first_name', 'last_name'),
+        func.concat(func.coalesce(User.first_name, 'None'), ' ', func.coalesce(User.last_name, 'None'))
+    ),
+    'state_name': ComputedField(
+        UserState.get_name_by_value,
+        ('state', ),
+        enum_name_expression(UserState, User.state)
+    ),
+}
+
+# Name of user organisation, rendered like `UserResource.build_response` does
+USER_ORGANISATION_NAME = select([Organisation.name]).where(Organisation.id == User.organisation_id).as_scalar()
+
+# Fields of user details, organisation name is read from the loaded organisation or selected by a subquery
+USER_DETAIL_COMPUTED_FIELDS = {
+    **USER_COMPUTED_FIELDS,
+    'organisation': ComputedField(attrgetter('name'), ('organisation', ), USER_ORGANISATION_NAME),
+}
@@ -44,3 +44,24 @@ class OrganisationPatchRequestSchema(StrictSchema):
         validate=validate_organisation_exists
     )
 
+
+class UserBulkPostRequestSchema(StrictSchema):
+    """
+    Single User of bulk create request. Uniqueness of emails and existence of organisations
+    are validated for the whole batch at once, see `UserBulkResource`.
+    """
+    first_name = String(
+        required=True,
+        validate=validate.Length(max=128)
+    )
+    last_name = String(
+        required=True,
+        validate=validate.Length(max=128)
+    )
+    # Limited to column length, one too long value would fail the whole multi-row INSERT
+    email = Email(
+        required=True,
+        validate=[validate.Length(max=128), validate.Email()],
+        allow_none=False
+    )
+    organisation_id = Integer(required=True)
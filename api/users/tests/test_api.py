@@ -1,7 +1,10 @@
-from unittest.mock import ANY
+from datetime import datetime
+from unittest.mock import ANY, patch
 
-from falcon import HTTP_201
+from falcon import HTTP_201, HTTP_207, HTTP_304, HTTP_422
+from falcon.util import dt_to_http
 
+from core.cache import instance_cache
 from core.tests.base import BaseApiTestCase
 from organisations.models import Organisation
 from users.models import User
@@ -62,3 +65,192 @@ class UserPostTestCase(BaseUserTestCase):
             response.json,
             {"id": ANY, "name": "John McClean", "email": "john@example.com"}
         )
+
+
+class UserBulkPostTestCase(BaseUserTestCase):
+    def test_create_users(self):
+        organisation = self.create_organisation('Die Hard')
+        body = [
+            {'first_name': f'John{i}', 'last_name': 'McClane', 'email': f'john{i}@example.com',
+             'organisation_id': organisation.id}
+            for i in range(3)
+        ]
+
+        response = self.request_post(path='/v2/users/bulk', status=HTTP_201, body=body)
+
+        self.assertEqual(response.json['created'], 3)
+        self.assertEqual(response.json['failed'], 0)
+        self.assertListEqual(
+            response.json['data'],
+            [
+                {
+                    'status': HTTP_201,
+                    'data': {'id': ANY, 'name': f'John{i} McClane', 'email': f'john{i}@example.com',
+                             'state_name': 'ENABLED'}
+                }
+                for i in range(3)
+            ]
+        )
+        self.assertEqual(self.db_session.query(User).count(), 3)
+
+    def test_create_users_partial_failure(self):
+        organisation = self.create_organisation('Die Hard')
+        self.create_user(organisation.id, email='john@example.com')
+
+        body = [
+            {'first_name': 'John', 'last_name': 'McClane', 'email': 'john@example.com',
+             'organisation_id': organisation.id},
+            {'first_name': 'Holly', 'last_name': 'Gennero', 'email': 'holly@example.com',
+             'organisation_id': organisation.id},
+            {'first_name': 'Holly', 'last_name': 'McClane', 'email': 'holly@example.com',
+             'organisation_id': organisation.id + 1},
+            {'first_name': 'Hans', 'email': 'hans@example.com', 'organisation_id': organisation.id},
+            'Karl',
+        ]
+
+        response = self.request_post(path='/v1/users/bulk', status=HTTP_207, body=body)
+
+        self.assertEqual(response.json['created'], 1)
+        self.assertEqual(response.json['failed'], 4)
+        self.assertListEqual(
+            response.json['data'],
+            [
+                {'status': HTTP_422, 'errors': {'email': ['User email john@example.com already exists']}},
+                {'status': HTTP_201, 'data': {'id': ANY, 'name': 'Holly Gennero', 'email': 'holly@example.com'}},
+                {
+                    'status': HTTP_422,
+                    'errors': {
+                        'email': ['User email holly@example.com already exists'],
+                        'organisation_id': [f'Organisation with given ID ({organisation.id + 1}) does not exist'],
+                    }
+                },
+                {'status': HTTP_422, 'errors': {'last_name': ['Missing data for required field.']}},
+                {'status': HTTP_422, 'errors': {'_schema': ['Invalid input type.']}},
+            ]
+        )
+
+    def test_create_users_in_several_chunks(self):
+        organisation = self.create_organisation('Die Hard')
+        size = User.bulk_insert_chunk_size + 1
+        body = [
+            {'first_name': f'John{i}', 'last_name': 'McClane', 'email': f'john{i}@example.com',
+             'organisation_id': organisation.id}
+            for i in range(size)
+        ]
+
+        # Query budget grows with the number of inserted chunks
+        response = self.request_post(path='/v1/users/bulk', status=HTTP_201, body=body)
+
+        self.assertEqual(response.json['created'], size)
+        self.assertEqual(self.db_session.query(User).count(), size)
+
+    def test_create_users_requires_list(self):
+        self.request_post(path='/v1/users/bulk', status=HTTP_422, body={'first_name': 'John'})
+
+
+class UserResourceTestCase(BaseUserTestCase):
+    def test_get_user_with_organisation(self):
+        organisation = self.create_organisation('Nakatomi')
+        user = self.create_user(organisation.id)
+
+        # Freshness query of conditional GET and user with organisation name
+        with self.assert_num_queries(2):
+            response = self.request_get(path=f'/v1/users/{user.id}')
+
+        self.assertEqual(response.json['organisation'], 'Nakatomi')
+
+    def test_delete_user(self):
+        organisation = self.create_organisation()
+        user = self.create_user(organisation.id)
+
+        with self.assert_num_queries(2):
+            self.request_delete(path=f'/v1/users/{user.id}')
+
+
+class ConditionalGetTestCase(BaseUserTestCase):
+    def setUp(self):
+        super().setUp()
+        self.organisation = self.create_organisation('Nakatomi')
+        self.user = self.create_user(self.organisation.id)
+
+    def test_detail_not_modified(self):
+        path = f'/v2/users/{self.user.id}'
+        response = self.request_get(path)
+        etag = response.headers['etag']
+
+        self.assertEqual(response.headers['last-modified'], dt_to_http(self.user.updated_at))
+
+        # Freshness query only, user is neither loaded nor serialized
+        with self.assert_num_queries(1):
+            response = self.request_get(path, status=HTTP_304, headers={'If-None-Match': etag})
+
+        self.assertEqual(response.headers['etag'], etag)
+        self.assertEqual(response.content, b'')
+
+        del self.request_headers['If-None-Match']
+        self.request_get(path, status=HTTP_304, headers={'If-Modified-Since': dt_to_http(datetime.utcnow())})
+        del self.request_headers['If-Modified-Since']
+
+        # Response of another version is another representation
+        self.request_get(f'/v1/users/{self.user.id}', headers={'If-None-Match': etag})
+
+    def test_detail_modified(self):
+        path = f'/v2/organisations/{self.organisation.id}'
+        etag = self.request_get(path).headers['etag']
+
+        self.user.update(self.db_session, first_name='Holly')
+
+        response = self.request_get(path, headers={'If-None-Match': etag})
+        self.assertNotEqual(response.headers['etag'], etag)
+        self.assertEqual(response.json['users'][0]['name'], 'Holly McClane')
+
+    def test_collection(self):
+        etag = self.request_get('/v2/users').headers['etag']
+
+        self.request_get('/v2/users', status=HTTP_304, headers={'If-None-Match': etag})
+
+        self.create_user(self.organisation.id, email='holly@example.com')
+        self.request_get('/v2/users', headers={'If-None-Match': etag})
+
+
+class InstanceCacheTestCase(BaseUserTestCase):
+    def setUp(self):
+        super().setUp()
+        self.organisation = self.create_organisation('Nakatomi')
+        self.user = self.create_user(self.organisation.id)
+
+        instance_cache.clear()
+        patcher = patch.object(instance_cache, 'enabled', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(instance_cache.clear)
+
+    def test_cached_instance(self):
+        self.request_get(f'/v2/users/{self.user.id}')
+
+        # Freshness query of conditional GET only
+        with self.assert_num_queries(1):
+            response = self.request_get(f'/v2/users/{self.user.id}')
+
+        self.assertEqual(response.json['organisation'], 'Nakatomi')
+
+    def test_write_invalidates_dependent_instances(self):
+        self.request_get(f'/v2/users/{self.user.id}')
+        self.request_get(f'/v2/organisations/{self.organisation.id}')
+
+        self.organisation.update(self.db_session, name='Nakatomi Plaza')
+        self.user.update(self.db_session, first_name='Holly')
+
+        self.assertEqual(self.request_get(f'/v2/users/{self.user.id}').json['organisation'], 'Nakatomi Plaza')
+        self.assertEqual(
+            self.request_get(f'/v2/organisations/{self.organisation.id}').json['users'][0]['name'], 'Holly McClane'
+        )
+
+    def test_created_and_deleted_users_invalidate_organisation(self):
+        self.request_get(f'/v2/organisations/{self.organisation.id}')
+
+        self.create_user(self.organisation.id, email='holly@example.com')
+        self.assertEqual(len(self.request_get(f'/v2/organisations/{self.organisation.id}').json['users']), 2)
+
+        User.delete_by_id(self.db_session, self.user.id)
+        self.assertEqual(len(self.request_get(f'/v2/organisations/{self.organisation.id}').json['users']), 1)
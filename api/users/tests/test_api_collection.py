@@ -1,5 +1,309 @@
+import csv
+import io
+import json
+from unittest.mock import patch
+
+from falcon import HTTP_200, HTTP_400, HTTP_404
+
+from core.result_cache import MemoryResultBackend, result_cache
+from users.api import UserCollectionResource, UserResource
+from users.models import User
 from users.tests.test_api import BaseUserTestCase
 
 
 class UserPostTestCase(BaseUserTestCase):
     pass
+
+
+class UserCursorPaginationTestCase(BaseUserTestCase):
+    def setUp(self):
+        super().setUp()
+        organisation = self.create_organisation()
+        first_names = ('Holly', None, 'hans', 'Karl', None, 'Al', 'holly')
+
+        self.users = [
+            self.create_user(organisation.id, first_name=first_name, email=f'user{i}@example.com')
+            for i, first_name in enumerate(first_names)
+        ]
+
+    def fetch_all_pages(self, sorting):
+        params = {'pagination': 'cursor', 'size': 2, 'sorting': sorting}
+        ids = []
+
+        while True:
+            response = self.request_get('/v1/users', params=params).json
+            self.assertEqual(response['total'], len(self.users))
+            ids.extend(item['id'] for item in response['data'])
+
+            if response['next_cursor'] is None:
+                return ids
+
+            params = {'cursor': response['next_cursor'], 'size': 2, 'sorting': sorting}
+
+    def test_cursor_pagination_follows_sorting(self):
+        def sort_key(user):
+            return user.first_name is None, (user.first_name or '').lower(), user.id
+
+        ascending = [user.id for user in sorted(self.users, key=sort_key)]
+
+        self.assertListEqual(self.fetch_all_pages('first_name'), ascending)
+        self.assertListEqual(self.fetch_all_pages('-first_name'), ascending[::-1])
+        self.assertListEqual(self.fetch_all_pages('-id'), sorted((user.id for user in self.users), reverse=True))
+
+    def test_cursor_from_different_sorting(self):
+        response = self.request_get('/v1/users', params={'pagination': 'cursor', 'size': 2, 'sorting': 'last_name'})
+
+        self.request_get(
+            '/v1/users',
+            params={'cursor': response.json['next_cursor'], 'sorting': 'first_name'},
+            status=HTTP_400
+        )
+
+    def test_invalid_cursor(self):
+        self.request_get('/v1/users', params={'cursor': 'invalid'}, status=HTTP_400)
+
+
+class UserCountStrategyTestCase(BaseUserTestCase):
+    def setUp(self):
+        super().setUp()
+        organisation = self.create_organisation()
+
+        for i in range(5):
+            self.create_user(organisation.id, first_name=f'John{i}', email=f'john{i}@example.com')
+
+    def test_exact_count(self):
+        response = self.request_get('/v1/users', params={'size': 2, 'page': 1, 'count': 'exact'}).json
+
+        self.assertEqual(response['total'], 5)
+        self.assertEqual(response['total_strategy'], 'exact')
+        self.assertTrue(response['has_more'])
+        self.assertEqual(len(response['data']), 2)
+
+    def test_exact_count_out_of_range_page(self):
+        response = self.request_get('/v1/users', params={'size': 2, 'page': 10}).json
+
+        self.assertEqual(response['total'], 5)
+        self.assertFalse(response['has_more'])
+        self.assertListEqual(response['data'], [])
+
+    def test_estimated_count(self):
+        params = {'size': 2, 'count': 'estimated', 'search': 'John'}
+        response = self.request_get('/v1/users', params=params).json
+
+        # Small estimates are replaced with exact count
+        self.assertEqual(response['total'], 5)
+        self.assertEqual(response['total_strategy'], 'exact')
+
+        with patch.object(UserCollectionResource, 'count_estimate_threshold', 0):
+            response = self.request_get('/v1/users', params=params).json
+
+        self.assertIsInstance(response['total'], int)
+        self.assertEqual(response['total_strategy'], 'estimated')
+
+    def test_no_count(self):
+        response = self.request_get('/v1/users', params={'size': 2, 'page': 2, 'count': 'none'}).json
+
+        self.assertNotIn('total', response)
+        self.assertNotIn('total_strategy', response)
+        self.assertFalse(response['has_more'])
+        self.assertEqual(len(response['data']), 1)
+
+
+class UserSearchTestCase(BaseUserTestCase):
+    def setUp(self):
+        super().setUp()
+        organisation = self.create_organisation()
+
+        self.john = self.create_user(organisation.id, email='john@example.com')
+        self.holly = self.create_user(
+            organisation.id, first_name='Holly', last_name='Gennero', email='holly@nakatomi.com'
+        )
+
+    def test_search_matches_any_field(self):
+        response = self.request_get('/v1/users', params={'search': 'nakatomi'}).json
+        self.assertListEqual([item['id'] for item in response['data']], [self.holly.id])
+
+        response = self.request_get('/v1/users', params={'search': 'MCCLANE'}).json
+        self.assertListEqual([item['id'] for item in response['data']], [self.john.id])
+
+    def explain_search(self, search_term):
+        params = {'search': [search_term]}
+        query = self.db_session.query(User).filter(*UserCollectionResource().build_query_filters(params))
+        statement = query.statement.compile(dialect=self.db_session.bind.dialect)
+
+        self.db_session.execute('SET LOCAL enable_seqscan = off')
+        return '\n'.join(
+            row[0] for row in self.db_session.connection().execute(f'EXPLAIN {statement}', statement.params)
+        )
+
+    def test_text_search_uses_trigram_indexes(self):
+        plan = self.explain_search('mcclane')
+
+        for column in ('first_name', 'last_name', 'email'):
+            self.assertIn(f'ix_users_{column}_trgm', plan)
+
+    def test_number_search_uses_primary_key(self):
+        self.assertIn('pk_users', self.explain_search(str(self.holly.id)))
+
+        response = self.request_get('/v1/users', params={'search': str(self.holly.id)}).json
+        self.assertListEqual([item['id'] for item in response['data']], [self.holly.id])
+
+        response = self.request_get('/v1/users', params={'search': '9' * 20}).json
+        self.assertListEqual(response['data'], [])
+
+    def test_email_search_uses_prefix_index(self):
+        plan = self.explain_search('Holly@Naka')
+
+        self.assertIn('ix_users_lower_email_pattern', plan)
+        self.assertNotIn('_trgm', plan)
+
+        response = self.request_get('/v1/users', params={'search': 'Holly@Naka'}).json
+        self.assertListEqual([item['id'] for item in response['data']], [self.holly.id])
+
+    def test_fulltext_search_matches_full_name(self):
+        params = {'search': 'John McClane', 'search_mode': 'fulltext'}
+        response = self.request_get('/v1/users', params=params).json
+
+        self.assertListEqual([item['id'] for item in response['data']], [self.john.id])
+
+    def test_fulltext_search_orders_by_rank(self):
+        karl = self.create_user(self.john.organisation_id, first_name='Karl', email='holly.fan@example.com')
+
+        response = self.request_get('/v1/users', params={'search': 'holl', 'search_mode': 'fulltext'}).json
+        self.assertListEqual([item['id'] for item in response['data']], [self.holly.id, karl.id])
+
+        params = {'search': 'holl', 'search_mode': 'fulltext', 'sorting': '-id'}
+        response = self.request_get('/v1/users', params=params).json
+        self.assertListEqual([item['id'] for item in response['data']], [karl.id, self.holly.id])
+
+    def test_fulltext_search_vector_follows_updates(self):
+        self.john.update(self.db_session, first_name='Johnny')
+
+        response = self.request_get('/v1/users', params={'search': 'johnny', 'search_mode': 'fulltext'}).json
+        self.assertListEqual([item['id'] for item in response['data']], [self.john.id])
+
+
+class UserProjectionTestCase(BaseUserTestCase):
+    def test_list_selects_only_response_columns(self):
+        organisation = self.create_organisation()
+        user = self.create_user(organisation.id, first_name='Holly', last_name=None)
+
+        with self.assert_num_queries(2) as statements:
+            response = self.request_get('/v2/users', params={'count': 'none'})
+
+        self.assertNotIn('created_at', statements[-1])
+        self.assertNotIn('organisation_id', statements[-1])
+        self.assertListEqual(
+            response.json['data'],
+            [{'id': user.id, 'name': 'Holly None', 'email': 'john@example.com', 'state_name': 'ENABLED'}]
+        )
+
+    def test_projection_keys_follow_version(self):
+        resource = UserCollectionResource()
+
+        self.assertEqual(resource.get_projection(1.0).keys, ('id', 'name', 'email'))
+        self.assertEqual(resource.get_projection(2.0).keys, ('id', 'name', 'email', 'state_name'))
+        self.assertIs(resource.get_projection(2.0), resource.get_projection(2.0))
+
+
+class DatabaseJSONTestCase(BaseUserTestCase):
+    def setUp(self):
+        super().setUp()
+        self.organisation = self.create_organisation('Nakatomi')
+        self.users = [
+            self.create_user(self.organisation.id, first_name='Holly', email='holly@example.com'),
+            self.create_user(self.organisation.id, first_name='Hans', last_name=None, email='hans@example.com'),
+            self.create_user(self.organisation.id, first_name='Karl', email='karl@example.com'),
+        ]
+
+    def request_both_ways(self, path, params=None, status=HTTP_200):
+        response = self.request_get(path, params=params, status=status)
+
+        with patch.object(UserCollectionResource, 'database_json', True), \
+                patch.object(UserResource, 'database_json', True):
+            database_response = self.request_get(path, params=params, status=status)
+
+        self.assertEqual(database_response.json, response.json)
+        return database_response
+
+    def test_collection(self):
+        for version in ('v1', 'v2'):
+            self.request_both_ways(f'/{version}/users', params={'sorting': '-first_name', 'size': 2, 'page': 1})
+
+        response = self.request_both_ways('/v2/users', params={'pagination': 'cursor', 'size': 2})
+        self.request_both_ways('/v2/users', params={'cursor': response.json['next_cursor'], 'size': 2})
+
+    def test_detail(self):
+        for version in ('v1', 'v2'):
+            self.request_both_ways(f'/{version}/users/{self.users[1].id}')
+
+        self.request_both_ways('/v2/users/0', status=HTTP_404)
+
+
+class ResultCacheTestCase(BaseUserTestCase):
+    def setUp(self):
+        super().setUp()
+        self.organisation = self.create_organisation()
+        self.user = self.create_user(self.organisation.id)
+        self.table_version = 1
+
+        for patcher in (
+            patch.object(result_cache, 'backend', MemoryResultBackend()),
+            patch.object(result_cache.listener, 'get_version', lambda table_name: self.table_version),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_identical_requests_share_result(self):
+        params = {'search': 'john', 'size': 5}
+        response = self.request_get('/v2/users', params=params)
+
+        # Freshness query of conditional GET only
+        with self.assert_num_queries(1):
+            cached_response = self.request_get('/v2/users', params={'size': 5, 'search': 'john'})
+
+        self.assertEqual(cached_response.json, response.json)
+
+        # API version is a part of the key
+        self.assertNotIn('state_name', self.request_get('/v1/users', params=params).json['data'][0])
+
+    def test_new_table_version_is_not_served_stale_result(self):
+        self.request_get('/v2/users')
+
+        self.create_user(self.organisation.id, email='holly@example.com')
+        self.table_version = 2
+
+        self.assertEqual(self.request_get('/v2/users').json['total'], 2)
+
+
+class UserExportTestCase(BaseUserTestCase):
+    def setUp(self):
+        super().setUp()
+        organisation = self.create_organisation()
+
+        self.users = [
+            self.create_user(organisation.id, first_name=first_name, email=f'{first_name.lower()}@example.com')
+            for first_name in ('Holly', 'Hans', 'Karl')
+        ]
+
+    def test_export_ndjson(self):
+        response = self.request_get('/v2/users/export', params={'sorting': '-first_name', 'search': 'H'})
+
+        self.assertEqual(response.headers['content-type'], 'application/x-ndjson')
+        self.assertListEqual(
+            [json.loads(line) for line in response.text.splitlines()],
+            [
+                {'id': self.users[0].id, 'name': 'Holly McClane', 'email': 'holly@example.com',
+                 'state_name': 'ENABLED'},
+                {'id': self.users[1].id, 'name': 'Hans McClane', 'email': 'hans@example.com', 'state_name': 'ENABLED'},
+            ]
+        )
+
+    def test_export_csv(self):
+        response = self.request_get('/v1/users/export', params={'format': 'csv'})
+
+        self.assertEqual(response.headers['content-type'], 'text/csv')
+        self.assertListEqual(
+            list(csv.DictReader(io.StringIO(response.text))),
+            [{'id': str(user.id), 'name': user.name, 'email': user.email} for user in self.users]
+        )
@@ -0,0 +1,106 @@
+import gzip
+import io
+import json
+
+from core.tests.base import BaseDBTestCase
+from organisations.models import Organisation
+from users.importer import import_users
+from users.models import User
+
+
+class UserImportTestCase(BaseDBTestCase):
+    def setUp(self):
+        super().setUp()
+        self.organisation = Organisation.create(db_session=self.db_session, name='Die Hard')
+        User.create(
+            db_session=self.db_session,
+            first_name='John',
+            last_name='McClane',
+            email='john@example.com',
+            organisation_id=self.organisation.id
+        )
+
+    def import_users(self, content, file_format):
+        report = io.StringIO()
+        result = import_users(self.db_session, io.BytesIO(content), file_format, report)
+
+        return result, [json.loads(line) for line in report.getvalue().splitlines()]
+
+    def test_import_ndjson(self):
+        rows = [
+            {'first_name': 'Holly', 'last_name': 'Gennero', 'email': 'holly@example.com',
+             'organisation_id': self.organisation.id},
+            {'first_name': 'John', 'last_name': 'McClane', 'email': 'john@example.com',
+             'organisation_id': self.organisation.id},
+            {'first_name': 'Hans', 'last_name': 'Gruber', 'email': 'hans@example.com',
+             'organisation_id': self.organisation.id + 1},
+            {'first_name': 'Holly', 'last_name': 'McClane', 'email': 'holly@example.com',
+             'organisation_id': self.organisation.id},
+            {'first_name': 'Karl'},
+        ]
+        content = '\n'.join(json.dumps(row) for row in rows) + '\n{invalid\n'
+
+        (imported, rejected), report = self.import_users(gzip.compress(content.encode()), 'ndjson')
+
+        self.assertEqual((imported, rejected), (1, 5))
+        self.assertListEqual(
+            sorted(report, key=lambda item: item['line']),
+            [
+                {'line': 2, 'errors': {'email': ['User email john@example.com already exists']}},
+                {'line': 3, 'errors': {
+                    'organisation_id': [f'Organisation with given ID ({self.organisation.id + 1}) does not exist']
+                }},
+                {'line': 4, 'errors': {'email': ['User email holly@example.com already exists']}},
+                {'line': 5, 'errors': {
+                    'last_name': ['Missing data for required field.'],
+                    'email': ['Missing data for required field.'],
+                    'organisation_id': ['Missing data for required field.'],
+                }},
+                {'line': 6, 'errors': {'_schema': ['Invalid JSON.']}},
+            ]
+        )
+        self.assertEqual(
+            self.db_session.query(User.last_name).filter(User.email == 'holly@example.com').scalar(), 'Gennero'
+        )
+
+    def test_email_of_rejected_organisation_row_is_not_reserved(self):
+        rows = [
+            {'first_name': 'Hans', 'last_name': 'Gruber', 'email': 'hans@example.com',
+             'organisation_id': self.organisation.id + 1},
+            {'first_name': 'Hans', 'last_name': 'Gruber', 'email': 'hans@example.com',
+             'organisation_id': self.organisation.id},
+            {'first_name': 'Karl', 'last_name': 'Vreski', 'email': 'hans@example.com',
+             'organisation_id': self.organisation.id + 1},
+        ]
+        content = '\n'.join(json.dumps(row) for row in rows)
+
+        (imported, rejected), report = self.import_users(content.encode(), 'ndjson')
+
+        self.assertEqual((imported, rejected), (1, 2))
+        missing_organisation = [f'Organisation with given ID ({self.organisation.id + 1}) does not exist']
+        self.assertListEqual(
+            sorted(report, key=lambda item: item['line']),
+            [
+                {'line': 1, 'errors': {'organisation_id': missing_organisation}},
+                {'line': 3, 'errors': {
+                    'email': ['User email hans@example.com already exists'],
+                    'organisation_id': missing_organisation,
+                }},
+            ]
+        )
+        self.assertEqual(
+            self.db_session.query(User.last_name).filter(User.email == 'hans@example.com').scalar(), 'Gruber'
+        )
+
+    def test_import_csv(self):
+        content = (
+            'first_name,last_name,email,organisation_id\n'
+            f'Holly,Gennero,holly@example.com,{self.organisation.id}\n'
+            f'Hans,Gruber,hans@example.com,{self.organisation.id}\n'
+        )
+
+        (imported, rejected), report = self.import_users(content.encode(), 'csv')
+
+        self.assertEqual((imported, rejected), (2, 0))
+        self.assertListEqual(report, [])
+        self.assertEqual(self.db_session.query(User).count(), 3)
@@ -1,6 +1,7 @@
 import sqlalchemy
 
 from marshmallow.exceptions import ValidationError
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from core.db.session import session_manager
 from users.models import User
@@ -25,3 +26,21 @@ def validate_unique_user_email(email):
 
         if exists:
             raise ValidationError(f'User email {email} already exists')
+
+
+def get_existing_user_emails(db_session, emails):
+    """
+    Find which of provided emails were already used by other Users, with a single query.
+
+    Args:
+        db_session (Session): DB Session object
+        emails (iterable): Emails to check
+
+    Returns:
+        (set): Emails already used
+    """
+    existing = db_session.query(User.email).filter(
+        User.email == sqlalchemy.any_(sqlalchemy.literal(list(emails), ARRAY(User.email.type)))
+    )
+
+    return {email for email, in existing}